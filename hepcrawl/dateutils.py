@@ -17,6 +17,7 @@ import time
 
 from datetime import date as real_date
 from datetime import datetime as real_datetime
+from datetime import timedelta
 import dateutil.parser as dparser
 
 
@@ -204,3 +205,43 @@ def format_year(raw_date):
         year = 0
 
     return year
+
+
+def split_date_range(from_date, until_date, windows):
+    """Split an inclusive range of days into consecutive windows.
+
+    Args:
+        from_date (str): first day of the range, as ``%Y-%m-%d``.
+        until_date (str): last day of the range, as ``%Y-%m-%d``.
+        windows (int): number of windows wanted, ranges shorter than
+            ``windows`` days are split in one window per day.
+
+    Returns:
+        list: ``(from_date, until_date)`` tuples of inclusive,
+        non-overlapping windows covering the whole range, as ``%Y-%m-%d``.
+
+    Raises:
+        ValueError: if the range is empty or ``windows`` is not positive.
+    """
+    first_day = strptime(from_date[:10], '%Y-%m-%d').date()
+    last_day = strptime(until_date[:10], '%Y-%m-%d').date()
+    days = (last_day - first_day).days + 1
+    if days < 1:
+        raise ValueError(
+            'Empty date range {} to {}.'.format(from_date, until_date)
+        )
+    if windows < 1:
+        raise ValueError('Cannot split in {} windows.'.format(windows))
+
+    windows = min(windows, days)
+    date_windows = []
+    window_start = 0
+    for window in range(windows):
+        window_end = days * (window + 1) // windows
+        date_windows.append((
+            (first_day + timedelta(days=window_start)).isoformat(),
+            (first_day + timedelta(days=window_end - 1)).isoformat(),
+        ))
+        window_start = window_end
+
+    return date_windows
@@ -9,14 +9,95 @@
 
 """Additional downloaders."""
 
+import logging
 
-from scrapy.http import Response
+from scrapy.core.downloader.handlers.http11 import HTTP11DownloadHandler
+from twisted.internet import reactor
+from twisted.internet.task import deferLater
 
 
-class DummyDownloadHandler(object):
-    def __init__(self, *args, **kwargs):
-        pass
+LOGGER = logging.getLogger(__name__)
+
+
+class OAIPMHDownloadHandler(object):
+    """Download handler for the ``oaipmh+http`` and ``oaipmh+https`` schemes.
+
+    The requests are sent through the regular non-blocking HTTP download
+    handler, so OAI-PMH pages are fetched by the Twisted reactor like any
+    other request and are subject to the usual concurrency settings.
+
+    OAI-PMH servers answer ``503 Service Unavailable`` with a ``Retry-After``
+    header to throttle harvesters, the request is then retried after the
+    given delay without blocking the reactor. The ``503`` responses are only
+    retried here: the last one gets ``dont_retry`` in the meta of the request,
+    so that the ``RetryMiddleware`` of Scrapy does not retry it again. The
+    other errors are still retried by the middleware.
+
+    Settings:
+
+    * ``OAIPMH_MAX_RETRIES``: how many times a ``503`` response is retried.
+    * ``OAIPMH_DEFAULT_RETRY_AFTER``: delay in seconds used when the server
+      does not send a valid ``Retry-After`` header.
+    """
+    scheme_prefix = 'oaipmh+'
+
+    def __init__(self, settings, clock=reactor):
+        self.http_handler = HTTP11DownloadHandler(settings)
+        self.max_retries = settings.getint('OAIPMH_MAX_RETRIES', 5)
+        self.default_retry_after = settings.getint(
+            'OAIPMH_DEFAULT_RETRY_AFTER',
+            60,
+        )
+        self.clock = clock
 
     def download_request(self, request, spider):
-        url = request.url
-        return Response(url, request=request)
+        http_request = request.replace(
+            url=request.url[len(self.scheme_prefix):],
+        )
+        return self._download(http_request, request, spider, retries=0)
+
+    def _download(self, http_request, request, spider, retries):
+        deferred = self.http_handler.download_request(http_request, spider)
+        deferred.addCallback(
+            self._handle_response,
+            http_request,
+            request,
+            spider,
+            retries,
+        )
+        return deferred
+
+    def _handle_response(self, response, http_request, request, spider, retries):
+        if response.status == 503 and retries < self.max_retries:
+            retry_after = self.get_retry_after(response)
+            LOGGER.warning(
+                'HTTP 503 for %s, retrying after %s seconds (%s/%s).',
+                http_request,
+                retry_after,
+                retries + 1,
+                self.max_retries,
+            )
+            return deferLater(
+                self.clock,
+                retry_after,
+                self._download,
+                http_request,
+                request,
+                spider,
+                retries + 1,
+            )
+
+        if response.status == 503:
+            # already retried above
+            request.meta['dont_retry'] = True
+        return response.replace(url=request.url)
+
+    def get_retry_after(self, response):
+        retry_after = response.headers.get('Retry-After')
+        try:
+            return int(retry_after)
+        except (TypeError, ValueError):
+            return self.default_retry_after
+
+    def close(self):
+        return self.http_handler.close()
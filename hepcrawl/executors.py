@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Parsing of records in a pool of processes.
+
+Parsing is CPU bound and runs by default in the thread of the Twisted
+reactor, which then can't download anything else meanwhile, and a crawl
+uses a single core. With ``PARSING_PROCESSES`` set, the spiders submit the
+raw records to a :class:`ParsingExecutor` instead, and get back deferreds
+firing with the parsed items. A record whose worker died or took longer than
+``PARSING_TIMEOUT`` seconds gets an item holding the error instead.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import logging
+import multiprocessing
+import traceback
+
+import six
+from scrapy import Request, signals
+from six.moves import cPickle as pickle
+from twisted.internet import defer, reactor
+from twisted.python.failure import Failure
+
+from .utils import ParsedItem
+
+LOGGER = logging.getLogger(__name__)
+
+
+def parse_in_worker(func, raw_record, record_format, file_name, kwargs):
+    """Parse a record, capturing the errors in the returned item.
+
+    Args:
+        func (function): module level function parsing the raw record into
+            a :class:`hepcrawl.utils.ParsedItem`.
+        raw_record (str): the record, as downloaded.
+        record_format (str): format of the parsed records.
+        file_name (str): name of the file of the record, if any.
+        kwargs (dict): extra arguments of ``func``.
+
+    Returns:
+        hepcrawl.utils.ParsedItem: the parsed item, or an item holding the
+            error if the parsing failed.
+    """
+    try:
+        return func(raw_record, **kwargs)
+    except Exception as err:
+        return _error_item(err, raw_record, record_format, file_name)
+
+
+class ParsingTimeout(Exception):
+    """Error raised when the parsing of a record does not finish in time."""
+
+
+def _error_item(err, raw_record, record_format, file_name, formatted_traceback=None):
+    """Item holding the error being handled, or the given one."""
+    return ParsedItem.from_exception(
+        record_format=record_format,
+        exception=repr(err),
+        traceback=formatted_traceback or traceback.format_exc(),
+        source_data=raw_record,
+        file_name=file_name,
+    )
+
+
+def _parse_pickled(payload):
+    """Parse a record pickled by :meth:`ParsingExecutor.parse` in a worker.
+
+    The item is pickled here instead of by the pool, so that an item that
+    can't be pickled is replaced by an item holding the error. Otherwise the
+    pool would only report the error to an ``error_callback``, which Python 2
+    does not have.
+
+    Returns:
+        bytes: the pickled :class:`hepcrawl.utils.ParsedItem`.
+    """
+    func, raw_record, record_format, file_name, kwargs = pickle.loads(payload)
+    item = parse_in_worker(func, raw_record, record_format, file_name, kwargs)
+    try:
+        return pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+    except Exception as err:
+        return pickle.dumps(
+            _error_item(err, raw_record, record_format, file_name),
+            pickle.HIGHEST_PROTOCOL,
+        )
+
+
+class ParsingExecutor(object):
+    """Pool of processes parsing records.
+
+    Args:
+        processes (int): number of worker processes, with ``0`` the records
+            are parsed right away in the calling thread.
+        timeout (float): seconds after which a record that is not parsed yet
+            gets an item holding a :class:`ParsingTimeout`, e.g. because its
+            worker died. With ``None`` the records are waited for forever.
+    """
+    def __init__(self, processes=0, timeout=None):
+        self.processes = processes
+        self.timeout = timeout
+        self._pool = None
+        # deferred of every record submitted to the pool -> its timeout call
+        # and the arguments of its error item
+        self._pending = {}
+        self._failed_tasks = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        executor = cls(
+            processes=crawler.settings.getint('PARSING_PROCESSES', 0),
+            timeout=crawler.settings.getfloat('PARSING_TIMEOUT', 0) or None,
+        )
+        crawler.signals.connect(executor.close, signal=signals.spider_closed)
+        return executor
+
+    def __bool__(self):
+        return self.processes > 0
+
+    __nonzero__ = __bool__
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            # spawn the workers, forking the threads of the reactor is unsafe
+            context = getattr(multiprocessing, 'get_context', None)
+            pool_class = context('spawn').Pool if context else multiprocessing.Pool
+            self._pool = pool_class(self.processes)
+            LOGGER.info('Parsing records in %s processes.', self.processes)
+        return self._pool
+
+    def parse(self, func, raw_record, record_format='hep', file_name=None, **kwargs):
+        """Parse a record.
+
+        Args:
+            func (function): module level function parsing the raw record
+                into a :class:`hepcrawl.utils.ParsedItem`, it must be
+                importable by the worker processes.
+            raw_record (str): the record, as downloaded.
+            record_format (str): format of the parsed records.
+            file_name (str): name of the file of the record, if any.
+            **kwargs: extra arguments of ``func``, they must be picklable.
+
+        Returns:
+            Union[hepcrawl.utils.ParsedItem, twisted.internet.defer.Deferred]:
+                the parsed item when the executor has no processes, otherwise
+                a deferred firing with it. The errors of the workers, their
+                death and timeouts are captured with
+                :meth:`hepcrawl.utils.ParsedItem.from_exception`.
+        """
+        if not self.processes:
+            return func(raw_record, **kwargs)
+
+        try:
+            payload = pickle.dumps(
+                (func, raw_record, record_format, file_name, kwargs),
+                pickle.HIGHEST_PROTOCOL,
+            )
+        except Exception as err:
+            return defer.succeed(
+                _error_item(err, raw_record, record_format, file_name)
+            )
+
+        deferred = defer.Deferred()
+        timeout_call = None
+        if self.timeout:
+            timeout_call = reactor.callLater(
+                self.timeout,
+                self._fail,
+                deferred,
+                ParsingTimeout(
+                    'Record not parsed after %s seconds.' % self.timeout
+                ),
+            )
+        self._pending[deferred] = (
+            timeout_call,
+            (raw_record, record_format, file_name),
+        )
+
+        def on_result(result):
+            try:
+                item = pickle.loads(result)
+            except Exception as err:
+                item = _error_item(err, raw_record, record_format, file_name)
+            reactor.callFromThread(self._finish, deferred, item)
+
+        def on_error(err):
+            reactor.callFromThread(self._fail, deferred, err)
+
+        kwargs = {'callback': on_result}
+        if not six.PY2:
+            # the pool of Python 2 has no error_callback, its errors are only
+            # caught by the timeout
+            kwargs['error_callback'] = on_error
+        self.pool.apply_async(_parse_pickled, (payload,), **kwargs)
+        return deferred
+
+    def _finish(self, deferred, item):
+        """Fire the deferred of a record, unless it already failed."""
+        if deferred not in self._pending:
+            return
+
+        timeout_call, _ = self._pending.pop(deferred)
+        if timeout_call is not None and timeout_call.active():
+            timeout_call.cancel()
+        deferred.callback(item)
+
+    def _fail(self, deferred, err):
+        """Fire the deferred of a record with an item holding the error."""
+        if deferred not in self._pending:
+            return
+
+        _, error_item_args = self._pending[deferred]
+        self._failed_tasks += 1
+        formatted_traceback = ''.join(
+            traceback.format_exception_only(type(err), err)
+        )
+        self._finish(
+            deferred,
+            _error_item(
+                err,
+                *error_item_args,
+                formatted_traceback=formatted_traceback
+            ),
+        )
+
+    def close(self):
+        if self._pool is not None:
+            if self._pending or self._failed_tasks:
+                # the pool would wait forever for the tasks of dead workers
+                self._pool.terminate()
+            else:
+                self._pool.close()
+            self._pool.join()
+            self._pool = None
+        # the records of dead workers, or answered after the reactor stopped
+        for deferred in list(self._pending):
+            self._fail(deferred, ParsingTimeout('Parsing pool closed.'))
+
+
+def gather_results(results, crawl=None):
+    """Wait for the deferreds in the output of a spider callback.
+
+    Scrapy accepts a deferred as output of a callback, but not in the
+    iterable it returns. The output is consumed right away, and the
+    requests are passed to ``crawl`` if given, so that they are downloaded
+    while the records are parsed.
+
+    Note:
+
+        The requests passed to ``crawl`` go straight to the engine: unlike
+        the outputs of the iterable, they skip the ``process_spider_output``
+        of the spider middlewares, e.g. the offsite and depth ones. It is
+        only meant for requests these middlewares have nothing to do with,
+        like the OAI-PMH requests, which stay on the endpoint of the spider
+        and are throttled by ``OAIPMH_CONCURRENT_REQUESTS``. Without
+        ``crawl``, the requests are returned in the iterable like the other
+        outputs, once all the records are parsed.
+
+    Args:
+        results (iterable): output of a spider callback, with deferreds
+            returned by :meth:`ParsingExecutor.parse`.
+        crawl (callable): function scheduling a request, bypassing the
+            spider middlewares.
+
+    Returns:
+        twisted.internet.defer.Deferred: a deferred firing with an iterable
+            on the results of the deferreds and the other outputs. If the
+            callback raised an exception, it is raised at the end of the
+            iteration, like for a callback yielding its outputs.
+    """
+    outputs = []
+    error = None
+    try:
+        for result in results:
+            if crawl is not None and isinstance(result, Request):
+                crawl(result)
+            elif isinstance(result, defer.Deferred):
+                outputs.append(result)
+            else:
+                outputs.append(defer.succeed(result))
+    except Exception:
+        error = Failure()
+
+    def iterate(values):
+        for value in values:
+            yield value
+        if error is not None:
+            error.raiseException()
+
+    return defer.gatherResults(outputs).addCallback(iterate)
@@ -14,6 +14,7 @@ from __future__ import absolute_import, division, print_function
 import datetime
 
 from ..utils import get_first
+from ..xpaths import extract, select
 
 
 class Jats(object):
@@ -27,29 +28,29 @@ class Jats(object):
             year = int(get_first(year, 1))
             return datetime.date(day=day, month=month, year=year).isoformat()
 
-        if node.xpath(".//date[@date-type='published']"):
+        if select(node, ".//date[@date-type='published']"):
             return format_date(
-                day=node.xpath(".//date[@date-type='published']/day/text()").extract(),
-                month=node.xpath(".//date[@date-type='published']/month/text()").extract(),
-                year=node.xpath(".//date[@date-type='published']/year/text()").extract(),
+                day=extract(node, ".//date[@date-type='published']/day/text()"),
+                month=extract(node, ".//date[@date-type='published']/month/text()"),
+                year=extract(node, ".//date[@date-type='published']/year/text()"),
             )
-        elif node.xpath(".//pub-date[@pub-type='ppub']"):
+        elif select(node, ".//pub-date[@pub-type='ppub']"):
             return format_date(
-                day=node.xpath(".//pub-date[@pub-type='ppub']/day/text()").extract(),
-                month=node.xpath(".//pub-date[@pub-type='ppub']/month/text()").extract(),
-                year=node.xpath(".//pub-date[@pub-type='ppub']/year/text()").extract(),
+                day=extract(node, ".//pub-date[@pub-type='ppub']/day/text()"),
+                month=extract(node, ".//pub-date[@pub-type='ppub']/month/text()"),
+                year=extract(node, ".//pub-date[@pub-type='ppub']/year/text()"),
             )
-        elif node.xpath(".//pub-date[@pub-type='epub']"):
+        elif select(node, ".//pub-date[@pub-type='epub']"):
             return format_date(
-                day=node.xpath(".//pub-date[@pub-type='epub']/day/text()").extract(),
-                month=node.xpath(".//pub-date[@pub-type='epub']/month/text()").extract(),
-                year=node.xpath(".//pub-date[@pub-type='epub']/year/text()").extract(),
+                day=extract(node, ".//pub-date[@pub-type='epub']/day/text()"),
+                month=extract(node, ".//pub-date[@pub-type='epub']/month/text()"),
+                year=extract(node, ".//pub-date[@pub-type='epub']/year/text()"),
             )
-        elif node.xpath(".//pub-date"):
+        elif select(node, ".//pub-date"):
             return format_date(
-                day=node.xpath(".//pub-date/day/text()").extract(),
-                month=node.xpath(".//pub-date/month/text()").extract(),
-                year=node.xpath(".//pub-date/year/text()").extract(),
+                day=extract(node, ".//pub-date/day/text()"),
+                month=extract(node, ".//pub-date/month/text()"),
+                year=extract(node, ".//pub-date/year/text()"),
             )
         else:
             # In the worst case we return today
@@ -59,25 +60,25 @@ class Jats(object):
         """Return tuple of keywords, PACS from node."""
         free_keywords = []
         classification_numbers = []
-        for group in node.xpath('.//kwd-group'):
-            if "pacs" in group.xpath('@kwd-group-type').extract():
-                for keyword in group.xpath('kwd/text()').extract():
+        for group in select(node, './/kwd-group'):
+            if "pacs" in extract(group, '@kwd-group-type'):
+                for keyword in extract(group, 'kwd/text()'):
                     classification_numbers.append(keyword)
             else:
-                for keyword in group.xpath('kwd').extract():
+                for keyword in extract(group, 'kwd'):
                     free_keywords.append(keyword)
         return free_keywords, classification_numbers
 
     def _get_authors(self, node):
         authors = []
-        for contrib in node.xpath(".//contrib[@contrib-type='author']"):
-            surname = contrib.xpath("string-name/surname/text()").extract()
-            given_names = contrib.xpath("string-name/given-names/text()").extract()
-            email = contrib.xpath("email/text()").extract()
-            affiliations = contrib.xpath('aff')
-            reffered_id = contrib.xpath("xref[@ref-type='aff']/@rid").extract()
+        for contrib in select(node, ".//contrib[@contrib-type='author']"):
+            surname = extract(contrib, "string-name/surname/text()")
+            given_names = extract(contrib, "string-name/given-names/text()")
+            email = extract(contrib, "email/text()")
+            affiliations = select(contrib, 'aff')
+            reffered_id = extract(contrib, "xref[@ref-type='aff']/@rid")
             if reffered_id:
-                affiliations += node.xpath(".//aff[@id='{0}']".format(
+                affiliations += select(node, ".//aff[@id='{0}']".format(
                     get_first(reffered_id))
                 )
             affiliations = [
@@ -11,6 +11,8 @@
 
 from __future__ import absolute_import, division, print_function
 
+from ..xpaths import extract, extract_first, select
+
 
 class NLM(object):
     """Special extractions for NLM formats."""
@@ -19,11 +21,11 @@ class NLM(object):
     def get_authors(node):
         """Get the authors."""
         authors = []
-        for author in node.xpath("./AuthorList//Author"):
-            surname = author.xpath("./LastName/text()").extract_first()
-            firstname = author.xpath("./FirstName/text()").extract_first()
-            middlename = author.xpath("./MiddleName/text()").extract_first()
-            affiliations = author.xpath(".//Affiliation/text()").extract()
+        for author in select(node, "./AuthorList//Author"):
+            surname = extract_first(author, "./LastName/text()")
+            firstname = extract_first(author, "./FirstName/text()")
+            middlename = extract_first(author, "./MiddleName/text()")
+            affiliations = extract(author, ".//Affiliation/text()")
 
             if not surname:
                 surname = ""
@@ -57,20 +59,24 @@ class NLM(object):
     @staticmethod
     def get_dois(node):
         """Get DOI."""
-        dois = node.xpath(
-            ".//ArticleIdList/ArticleId[@IdType='doi']/text()").extract()
+        dois = extract(
+            node,
+            ".//ArticleIdList/ArticleId[@IdType='doi']/text()",
+        )
         if not dois:
-            dois = node.xpath(
-                ".//ELocationID[@EIdType='doi']/text()").extract()
+            dois = extract(
+                node,
+                ".//ELocationID[@EIdType='doi']/text()",
+            )
 
         return dois
 
     @staticmethod
     def get_date_published(node):
         """Publication date."""
-        year = node.xpath(".//Journal/PubDate/Year/text()").extract_first()
-        month = node.xpath(".//Journal/PubDate/Month/text()").extract_first()
-        day = node.xpath(".//Journal/PubDate/Day/text()").extract_first()
+        year = extract_first(node, ".//Journal/PubDate/Year/text()")
+        month = extract_first(node, ".//Journal/PubDate/Month/text()")
+        day = extract_first(node, ".//Journal/PubDate/Day/text()")
 
         date_published = ""
         if year:
@@ -97,7 +103,7 @@ class NLM(object):
                 * revised
                 * ecollection
         """
-        pubstatus = node.xpath(".//Journal/PubDate/@PubStatus").extract_first()
+        pubstatus = extract_first(node, ".//Journal/PubDate/@PubStatus")
 
         return pubstatus
 
@@ -137,15 +143,15 @@ class NLM(object):
                 * Video-Audio Media
                 * Webcasts
         """
-        pubtype = node.xpath(".//PublicationType/text()").extract_first()
+        pubtype = extract_first(node, ".//PublicationType/text()")
         return pubtype
 
     @staticmethod
     def get_page_numbers(node):
         """Get page numbers and number of pages."""
 
-        fpage = node.xpath(".//FirstPage/text()").extract_first()
-        lpage = node.xpath(".//LastPage/text()").extract_first()
+        fpage = extract_first(node, ".//FirstPage/text()")
+        lpage = extract_first(node, ".//LastPage/text()")
         if fpage and lpage:
             page_nr = str(int(lpage) - int(fpage) + 1)
         else:
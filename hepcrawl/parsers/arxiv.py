@@ -19,6 +19,7 @@ from inspire_schemas.api import LiteratureBuilder
 from inspire_schemas.utils import classify_field, normalize_arxiv_category
 from inspire_utils.dedupers import dedupe_list
 from inspire_utils.helpers import maybe_int
+from lxml import etree
 from pylatexenc.latex2text import (
     EnvironmentTextSpec,
     LatexNodes2Text,
@@ -27,7 +28,14 @@ from pylatexenc.latex2text import (
 )
 
 from ..mappings import CONFERENCE_WORDS, THESIS_WORDS
-from ..utils import coll_cleanforthe, get_node, split_fullname
+from ..utils import (
+    LRUCache,
+    cached_property,
+    coll_cleanforthe,
+    get_node,
+    split_fullname,
+)
+from ..xpaths import extract, extract_first, select
 
 RE_CONFERENCE = re.compile(
     r'\b(%s)\b' % '|'.join(
@@ -45,6 +53,11 @@ RE_PAGES = re.compile(r'(?i)(\d+)\s*pages?\b')
 
 RE_DOIS = re.compile(r'[,;\s]+(?=\s*10[.]\d{4,})')
 
+# characters and specials without which pylatexenc leaves a string unchanged
+RE_LATEX = re.compile(r"[\\$%{}&~]|--|``|''|[!?]`")
+
+ARXIV_NAMESPACE = 'http://arxiv.org/OAI/arXiv/'
+
 
 def _handle_sqrt(node, l2tobj):
     arg = l2tobj.nodelist_to_text(node.nodeargd.argnlist)
@@ -89,6 +102,7 @@ class ArxivParser(object):
         keep_braced_groups=True,
         keep_braced_groups_minlen=2,
     )
+    latex_cache = LRUCache(max_size=4096)
 
     def __init__(self, arxiv_record, source=None):
         self.root = self.get_root_node(arxiv_record)
@@ -139,7 +153,7 @@ class ArxivParser(object):
         Returns:
             tuple: a tuple of (authors, collaborations, warning)
         """
-        author_selectors = node.xpath('.//authors//author')
+        author_selectors = select(node, './/arXiv:authors//arXiv:author')
 
         # take 'for the' out of the general phrases and dont use it in
         # affiliations
@@ -233,26 +247,26 @@ class ArxivParser(object):
     @staticmethod
     def _get_author_names_and_affiliations(author_node):
         forenames = u' '.join(
-            author_node.xpath('.//forenames//text()').extract()
+            extract(author_node, './/arXiv:forenames//text()')
         )
-        keyname = u' '.join(author_node.xpath('.//keyname//text()').extract())
-        affiliations = author_node.xpath('.//affiliation//text()').extract()
+        keyname = u' '.join(extract(author_node, './/arXiv:keyname//text()'))
+        affiliations = extract(author_node, './/arXiv:affiliation//text()')
 
         return forenames, keyname, affiliations
 
-    @property
+    @cached_property
     def preprint_date(self):
-        preprint_date = self.root.xpath('.//created/text()').extract_first()
+        preprint_date = extract_first(self.root, './/arXiv:created/text()')
 
         return preprint_date
 
-    @property
+    @cached_property
     def abstract(self):
-        abstract = self.root.xpath('.//abstract/text()').extract_first()
+        abstract = extract_first(self.root, './/arXiv:abstract/text()')
         long_text_fixed = self.fix_long_text(abstract)
         return self.latex_to_unicode(long_text_fixed)
 
-    @property
+    @cached_property
     def authors(self):
         authors, _, _ = self.authors_and_collaborations
         parsed_authors = [self.builder.make_author(
@@ -260,15 +274,15 @@ class ArxivParser(object):
 
         return parsed_authors
 
-    @property
+    @cached_property
     def collaborations(self):
         _, collaborations, _ = self.authors_and_collaborations
 
         return collaborations
 
-    @property
+    @cached_property
     def dois(self):
-        doi_values = self.root.xpath('.//doi/text()').extract()
+        doi_values = extract(self.root, './/arXiv:doi/text()')
         doi_values_splitted = chain.from_iterable([re.split(RE_DOIS, doi) for doi in doi_values])
         dois = [
             {'doi': value, 'material': 'publication'} for value in doi_values_splitted
@@ -276,27 +290,29 @@ class ArxivParser(object):
 
         return dois
 
-    @property
+    @cached_property
     def licenses(self):
-        licenses = self.root.xpath('.//license/text()').extract()
+        licenses = extract(self.root, './/arXiv:license/text()')
         return [{'url': license, 'material': self.material} for license in licenses]
 
     @property
     def material(self):
         return 'preprint'
 
-    @property
-    def number_of_pages(self):
-        comments = '; '.join(self.root.xpath('.//comments/text()').extract())
+    @cached_property
+    def comments(self):
+        return '; '.join(extract(self.root, './/arXiv:comments/text()'))
 
-        found_pages = RE_PAGES.search(comments)
+    @cached_property
+    def number_of_pages(self):
+        found_pages = RE_PAGES.search(self.comments)
         if found_pages:
             pages = found_pages.group(1)
             return maybe_int(pages)
 
         return None
 
-    @property
+    @cached_property
     def publication_info(self):
         publication_info = {
             'material': 'publication',
@@ -305,13 +321,13 @@ class ArxivParser(object):
 
         return publication_info
 
-    @property
+    @cached_property
     def pubinfo_freetext(self):
-        return self.root.xpath('.//journal-ref/text()').extract_first()
+        return extract_first(self.root, './/arXiv:journal-ref/text()')
 
-    @property
+    @cached_property
     def title(self):
-        long_text_fixed = self.fix_long_text(self.root.xpath('.//title/text()').extract_first())
+        long_text_fixed = self.fix_long_text(extract_first(self.root, './/arXiv:title/text()'))
         return self.latex_to_unicode(long_text_fixed)
 
     @staticmethod
@@ -322,6 +338,12 @@ class ArxivParser(object):
     def get_root_node(arxiv_record):
         """Get a selector on the root ``article`` node of the record.
 
+        The ``arXiv`` prefix is bound to the arXiv namespace on the selector.
+        Records harvested from arXiv are in that namespace and are used as
+        they are, so that a record already parsed by the OAI-PMH spider is
+        not copied or parsed again. The elements of records without it, e.g.
+        parsed as HTML, are moved to the arXiv namespace first.
+
         This can be overridden in case some preprocessing needs to be done on
         the XML.
 
@@ -336,51 +358,54 @@ class ArxivParser(object):
             root = get_node(arxiv_record)
         else:
             root = arxiv_record
-        root.remove_namespaces()
+
+        if next(root.root.iter('{%s}*' % ARXIV_NAMESPACE), None) is None:
+            for element in root.root.iter('*'):
+                element.tag = '{%s}%s' % (
+                    ARXIV_NAMESPACE,
+                    etree.QName(element).localname,
+                )
+        root.register_namespace('arXiv', ARXIV_NAMESPACE)
 
         return root
 
-    @property
+    @cached_property
     def public_note(self):
-        comments = '; '.join(self.root.xpath('.//comments/text()').extract())
-
-        return self.latex_to_unicode(comments)
+        return self.latex_to_unicode(self.comments)
 
-    @property
+    @cached_property
     def private_note(self):
         _, _, warning = self.authors_and_collaborations
 
         return warning
 
-    @property
+    @cached_property
     def report_numbers(self):
-        report_numbers = self.root.xpath('.//report-no/text()').extract()
+        report_numbers = extract(self.root, './/arXiv:report-no/text()')
         rns = []
         for rn in report_numbers:
             rns.extend(rn.split(', '))
 
         return rns
 
-    @property
+    @cached_property
     def arxiv_eprint(self):
-        return self.root.xpath('.//id/text()').extract_first()
+        return extract_first(self.root, './/arXiv:id/text()')
 
-    @property
+    @cached_property
     def arxiv_categories(self):
-        categories = self.root.xpath('.//categories/text()').extract_first(default='[]')
+        categories = extract_first(self.root, './/arXiv:categories/text()', default='[]')
         categories = categories.split()
         categories_without_old = [normalize_arxiv_category(arxiv_cat) for arxiv_cat in categories]
 
         return dedupe_list(categories_without_old)
 
-    @property
+    @cached_property
     def document_type(self):
-        comments = '; '.join(self.root.xpath('.//comments/text()').extract())
-
         doctype = 'article'
-        if RE_THESIS.search(comments):
+        if RE_THESIS.search(self.comments):
             doctype = 'thesis'
-        elif RE_CONFERENCE.search(comments):
+        elif RE_CONFERENCE.search(self.comments):
             doctype = 'conference paper'
 
         return doctype
@@ -389,15 +414,32 @@ class ArxivParser(object):
     def source(self):
         return 'arXiv'
 
-    @property
+    @cached_property
     def authors_and_collaborations(self):
-        if not hasattr(self, '_authors_and_collaborations'):
-            self._authors_and_collaborations = self._get_authors_and_collaborations(self.root)
-        return self._authors_and_collaborations
+        return self._get_authors_and_collaborations(self.root)
 
     @classmethod
     def latex_to_unicode(cls, latex_string):
+        """Convert the LaTeX of a string to unicode.
+
+        Strings without LaTeX are returned without running pylatexenc, the
+        conversions of the others are kept in :attr:`latex_cache`, as the
+        same strings, e.g. comments, come back in many records.
+        """
+        if isinstance(latex_string, six.string_types) and \
+                not RE_LATEX.search(latex_string):
+            if not latex_string.strip():
+                return u''
+            return latex_string.replace("  ", " ")
+
+        try:
+            return cls.latex_cache[latex_string]
+        except KeyError:
+            pass
+
         try:
-            return cls._l2t.latex_to_text(latex_string).replace("  "," ")
+            text = cls._l2t.latex_to_text(latex_string).replace("  "," ")
         except Exception as e:
-            return latex_string
+            text = latex_string
+        cls.latex_cache[latex_string] = text
+        return text
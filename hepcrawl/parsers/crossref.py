@@ -15,7 +15,8 @@ from inspire_schemas.api import LiteratureBuilder, ReferenceBuilder
 from inspire_utils.date import PartialDate
 from inspire_utils.helpers import force_list
 from inspire_utils.record import get_value
-from inspire_utils.dedupers import dedupe_list_of_dicts
+
+from ..utils import add_references, dedupe_list_of_dicts
 
 """Document types for the crossref objects have been extracted
 from the following link: https://api.crossref.org/v1/types
@@ -67,8 +68,7 @@ class CrossrefParser(object):
         self.builder.add_abstract(self.abstract)
         for doi in self.dois:
             self.builder.add_doi(**doi)
-        for reference in self.references:
-            self.builder.add_reference(reference)
+        add_references(self.builder, self.references)
         self.builder.add_imprint_date(self.imprints)
         for author in self.authors:
             self.builder.add_author(author)
@@ -293,12 +293,11 @@ class CrossrefParser(object):
                 the references in the record
         """
         ref_keys = self.record.get("reference")
-        reference_list = list(
+        return dedupe_list_of_dicts(
             itertools.chain.from_iterable(
                 self.get_reference(key) for key in force_list(ref_keys)
             )
         )
-        return dedupe_list_of_dicts(reference_list)
 
     def get_reference(self, ref_key):
         """Extract one reference.
@@ -19,7 +19,31 @@ from inspire_schemas.utils import split_page_artid
 from inspire_utils.date import PartialDate
 from inspire_utils.helpers import maybe_int, remove_tags
 
-from ..utils import get_first, get_node
+from ..utils import add_references, cached_property, get_first, get_node
+from ..xpaths import (
+    extract,
+    extract_first,
+    register_namespaces,
+    select,
+    strip_namespaces,
+)
+
+NAMESPACES = {
+    "bam": "http://vtw.elsevier.com/data/voc/ns/bam-vtw-1/",
+    "bk": "http://www.elsevier.com/xml/bk/schema",
+    "ce": "http://www.elsevier.com/xml/common/schema",
+    "cja": "http://www.elsevier.com/xml/cja/schema",
+    "cp": "http://vtw.elsevier.com/data/ns/properties/Copyright-1/",
+    "dct": "http://purl.org/dc/terms/",
+    "doc": "http://www.elsevier.com/xml/document/schema",
+    "dp": "http://www.elsevier.com/xml/common/doc-properties/schema",
+    "ja": "http://www.elsevier.com/xml/ja/schema",
+    "oa": "http://vtw.elsevier.com/data/ns/properties/OpenAccess-1/",
+    "prism": "http://prismstandard.org/namespaces/basic/2.0/",
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "sa": "http://www.elsevier.com/xml/common/struct-aff/schema",
+    "sb": "http://www.elsevier.com/xml/common/struct-bib/schema",
+}
 
 DOCTYPE_MAPPING = {
     "abs": "abstract",
@@ -133,12 +157,11 @@ class ElsevierParser(object):
             self.builder.add_imprint_date(
                 self.publication_date.dumps()
             )
-        for reference in self.references:
-            self.builder.add_reference(reference)
+        add_references(self.builder, self.references)
 
         return self.builder.record
 
-    @property
+    @cached_property
     def references(self):
         """Extract a Elsevier record into an Inspire HEP references record.
 
@@ -146,7 +169,7 @@ class ElsevierParser(object):
             List[dict]: an array of reference schema records, representing
                 the references in the record
         """
-        ref_nodes = self.root.xpath(".//bib-reference")
+        ref_nodes = select(self.root, ".//ce:bib-reference")
         return list(
             itertools.chain.from_iterable(
                 self.get_reference_iter(node) for node in ref_nodes
@@ -163,62 +186,75 @@ class ElsevierParser(object):
         'allowed_trees': ['math'],
     }
 
-    @property
+    @cached_property
     def abstract(self):
-        abstract_nodes = self.root.xpath(".//head/abstract[not(@graphical)]/abstract-sec/simple-para")
+        abstract_nodes = select(
+            self.root,
+            ".//*[self::ja:head or self::cja:head]"
+            "/ce:abstract[not(@graphical)]/ce:abstract-sec/ce:simple-para",
+        )
         if not abstract_nodes:
-            abstract_nodes = self.root.xpath(
-                ".//simple-head/abstract[not(@graphical)]/abstract-sec/simple-para"
+            abstract_nodes = select(
+                self.root,
+                ".//ja:simple-head/ce:abstract[not(@graphical)]/ce:abstract-sec/ce:simple-para",
             )
 
         if not abstract_nodes:
             return
 
         abstract_paragraphs = [remove_tags(
-            abstract_node, **self.remove_tags_config_abstract
+            strip_namespaces(abstract_node), **self.remove_tags_config_abstract
         ).strip("/ \n") for abstract_node in abstract_nodes]
         abstract = ' '.join(abstract_paragraphs)
         return abstract
 
-    @property
+    @cached_property
     def article_type(self):
         """Return a article type mapped from abbreviation."""
-        abbrv_doctype = self.root.xpath(".//@docsubtype").extract_first()
+        abbrv_doctype = extract_first(self.root, ".//@docsubtype")
         article_type = DOCTYPE_MAPPING.get(abbrv_doctype)
         return article_type
 
-    @property
+    @cached_property
     def artid(self):
-        artid = self.root.xpath("string(./*/item-info/aid[1])").extract_first()
+        artid = extract_first(
+            self.root,
+            "string(./*/*[self::ja:item-info or self::cja:item-info]"
+            "/*[self::ja:aid or self::cja:aid][1])",
+        )
         return artid
 
-    @property
+    @cached_property
     def authors(self):
-        author_nodes = self.root.xpath("./*/head/author-group")
+        author_nodes = select(self.root, "./*/*[self::ja:head or self::cja:head]/ce:author-group")
         if not author_nodes:
-            author_nodes = self.root.xpath("./*/simple-head/author-group")
+            author_nodes = select(self.root, "./*/ja:simple-head/ce:author-group")
+        affiliations_by_id = self.get_affiliations_by_id(self.root)
         all_authors = []
         for author_group in author_nodes:
+            group_affiliations = self.get_group_affiliations(author_group)
             authors = [
-                self.get_author(author, author_group)
-                for author in author_group.xpath("./author")
+                self.get_author(author, group_affiliations, affiliations_by_id)
+                for author in select(author_group, "./ce:author")
             ]
             all_authors.extend(authors)
         return all_authors
 
-    @property
+    @cached_property
     def collaborations(self):
-        collaborations = self.root.xpath(
-            "./*/head/author-group//collaboration/text/text()"
-        ).extract()
+        collaborations = extract(
+            self.root,
+            "./*/*[self::ja:head or self::cja:head]/ce:author-group//ce:collaboration/ce:text/text()",
+        )
         if not collaborations:
-            collaborations = self.root.xpath(
-                "./*/simple-head/author-group//collaboration/text/text()"
-            ).extract()
+            collaborations = extract(
+                self.root,
+                "./*/ja:simple-head/ce:author-group//ce:collaboration/ce:text/text()",
+            )
 
         return collaborations
 
-    @property
+    @cached_property
     def copyright(self):
         copyright = {
             "holder": self.copyright_holder,
@@ -229,115 +265,138 @@ class ElsevierParser(object):
 
         return copyright
 
-    @property
+    @cached_property
     def copyright_holder(self):
-        copyright_holder = self.root.xpath(
-            "string(./*/item-info/copyright[@type][1])"
-        ).extract_first()
+        copyright_holder = extract_first(
+            self.root,
+            "string(./*/*[self::ja:item-info or self::cja:item-info]/ce:copyright[@type][1])",
+        )
         if not copyright_holder:
-            copyright_type = self.root.xpath(
-                "./*/item-info/copyright/@type"
-            ).extract_first()
+            copyright_type = extract_first(
+                self.root,
+                "./*/*[self::ja:item-info or self::cja:item-info]/ce:copyright/@type",
+            )
             copyright_holder = COPYRIGHT_MAPPING.get(copyright_type)
 
         return copyright_holder
 
-    @property
+    @cached_property
     def copyright_statement(self):
-        copyright_statement = self.root.xpath(
-            "string(./RDF/Description/copyright[1])"
-        ).extract_first()
+        copyright_statement = extract_first(
+            self.root,
+            "string(./rdf:RDF/rdf:Description/prism:copyright[1])",
+        )
         if not copyright_statement:
-            copyright_statement = self.root.xpath(
-                "string(./*/item-info/copyright[@type][1])"
-            ).extract_first()
+            copyright_statement = extract_first(
+                self.root,
+                "string(./*/*[self::ja:item-info or self::cja:item-info]/ce:copyright[@type][1])",
+            )
 
         return copyright_statement
 
-    @property
+    @cached_property
     def copyright_year(self):
-        copyright_year = self.root.xpath(
-            "./*/item-info/copyright[@type]/@year"
-        ).extract_first()
+        copyright_year = extract_first(
+            self.root,
+            "./*/*[self::ja:item-info or self::cja:item-info]/ce:copyright[@type]/@year",
+        )
 
         return maybe_int(copyright_year)
 
-    @property
+    @cached_property
     def dois(self):
-        rdf_doi = self.root.xpath("string(./RDF/Description/doi[1])").extract_first()
+        rdf_doi = extract_first(self.root, "string(./rdf:RDF/rdf:Description/prism:doi[1])")
         result = [{"doi": rdf_doi, "material": self.material}]
-        simple_article_publication_doi = self.root.xpath("string(.//simple-article/item-info/document-thread/refers-to-document/doi)").extract_first()
+        simple_article_publication_doi = extract_first(
+            self.root,
+            "string(.//ja:simple-article/ja:item-info/ce:document-thread"
+            "/ce:refers-to-document/ce:doi)",
+        )
         if simple_article_publication_doi:
             result.append({"doi": simple_article_publication_doi, "material": "publication"})
         return result
 
-    @property
+    @cached_property
     def document_type(self):
         doctype = None
-        if self.root.xpath(
-            "./*[contains(name(),'article') or self::book-review]"
+        if select(
+            self.root,
+            "./*[contains(local-name(), 'article') or local-name() = 'book-review']",
         ):
             doctype = "article"
-        elif self.root.xpath("./*[self::book or self::simple-book]"):
+        elif select(self.root, "./*[local-name() = 'book' or local-name() = 'simple-book']"):
             doctype = "book"
-        elif self.root.xpath("./book-chapter"):
+        elif select(self.root, "./*[local-name() = 'book-chapter']"):
             doctype = "book chapter"
         if self.is_conference_paper:
             doctype = "conference paper"
         if doctype:
             return doctype
 
-    @property
+    @cached_property
     def is_conference_paper(self):
         """Decide whether the article is a conference paper."""
-        if self.root.xpath("./conference-info"):
+        if select(self.root, "./*[local-name() = 'conference-info']"):
             return True
-        journal_issue = self.root.xpath(
-            "string(./RDF/Description/issueName[1])"
-        ).extract_first()
+        journal_issue = extract_first(
+            self.root,
+            "string(./rdf:RDF/rdf:Description/prism:issueName[1])",
+        )
         if journal_issue:
             is_conference = re.findall(r"proceedings|proc.", journal_issue.lower())
             return bool(is_conference)
         return False
 
-    @property
+    @cached_property
     def journal_title(self):
-        jid = self.root.xpath("string(./*/item-info/jid[1])").extract_first(default="")
-        publication = self.root.xpath(
-            "string(./RDF/Description/publicationName[1])"
-        ).extract_first(default=jid)
+        jid = extract_first(
+            self.root,
+            "string(./*/*[self::ja:item-info or self::cja:item-info]"
+            "/*[self::ja:jid or self::cja:jid][1])",
+            default="",
+        )
+        publication = extract_first(
+            self.root,
+            "string(./rdf:RDF/rdf:Description/prism:publicationName[1])",
+            default=jid,
+        )
         publication = re.sub(" [S|s]ection", "", publication).replace(",", "").strip()
         return publication
 
-    @property
+    @cached_property
     def journal_issue(self):
-        journal_issue = self.root.xpath(
-            "string(./serial-issue/issue-info/issue-first[1])"
-        ).extract_first()
+        journal_issue = extract_first(
+            self.root,
+            "string(./*[local-name() = 'serial-issue']/*[local-name() = 'issue-info']"
+            "/*[local-name() = 'issue-first'][1])",
+        )
 
         return journal_issue
 
-    @property
+    @cached_property
     def journal_volume(self):
-        journal_volume = self.root.xpath(
-            "string(./RDF/Description/volume[1])"
-        ).extract_first()
+        journal_volume = extract_first(
+            self.root,
+            "string(./rdf:RDF/rdf:Description/prism:volume[1])",
+        )
 
         return journal_volume
 
-    @property
+    @cached_property
     def keywords(self):
-        keywords = self.root.xpath(
-            "./*/head/keywords[not(@abr)]/keyword/text/text()"
-        ).getall()
+        keywords = extract(
+            self.root,
+            "./*/*[self::ja:head or self::cja:head]/ce:keywords[not(@abr)]/ce:keyword/ce:text/text()",
+        )
         if not keywords:
-            keywords = self.root.xpath(
-                "./*/simple-head/keywords[not(@abr)]/keyword/text/text()"
-            ).getall()
+            keywords = extract(
+                self.root,
+                "./*/ja:simple-head/ce:keywords[not(@abr)]/ce:keyword/ce:text/text()",
+            )
 
         return keywords
 
-    @property
+    @cached_property
     def license(self):
         license = {
             "license": self.license_statement,
@@ -347,23 +406,25 @@ class ElsevierParser(object):
 
         return license
 
-    @property
+    @cached_property
     def license_statement(self):
-        license_statement = self.root.xpath(
-            "string(./RDF/Description/licenseLine[1])"
-        ).extract_first()
+        license_statement = extract_first(
+            self.root,
+            "string(./rdf:RDF/rdf:Description/cp:licenseLine[1])",
+        )
 
         return license_statement
 
-    @property
+    @cached_property
     def license_url(self):
-        license_url = self.root.xpath(
-            "string(./RDF/Description/openAccessInformation/userLicense[1])"
-        ).extract_first()
+        license_url = extract_first(
+            self.root,
+            "string(./rdf:RDF/rdf:Description/oa:openAccessInformation/oa:userLicense[1])",
+        )
 
         return license_url
 
-    @property
+    @cached_property
     def material(self):
         if self.article_type in (
             "erratum",
@@ -380,34 +441,38 @@ class ElsevierParser(object):
 
         return material
 
-    @property
+    @cached_property
     def page_start(self):
-        page_start = self.root.xpath(
-            "string(./RDF/Description/startingPage[1])"
-        ).extract_first()
+        page_start = extract_first(
+            self.root,
+            "string(./rdf:RDF/rdf:Description/prism:startingPage[1])",
+        )
         return page_start
 
-    @property
+    @cached_property
     def page_end(self):
-        page_end = self.root.xpath(
-            "string(./RDF/Description/endingPage[1])"
-        ).extract_first()
+        page_end = extract_first(
+            self.root,
+            "string(./rdf:RDF/rdf:Description/prism:endingPage[1])",
+        )
         return page_end
 
-    @property
+    @cached_property
     def imprints_date(self):
-        imprints_date = self.root.xpath(
-            "string(./RDF/Description/availableOnlineInformation/availableOnline)"
-        ).extract_first()
+        imprints_date = extract_first(
+            self.root,
+            "string(./rdf:RDF/rdf:Description/dp:availableOnlineInformation/bam:availableOnline)",
+        )
         if imprints_date:
             return PartialDate.parse(imprints_date).dumps()
 
-    @property
+    @cached_property
     def publication_date(self):
         publication_date = None
-        publication_date_string = self.root.xpath(
-            "string(./RDF/Description/coverDisplayDate[1])"
-        ).extract_first()
+        publication_date_string = extract_first(
+            self.root,
+            "string(./rdf:RDF/rdf:Description/prism:coverDisplayDate[1])",
+        )
         if publication_date_string:
             try:
                 publication_date = PartialDate.parse(publication_date_string)
@@ -419,7 +484,7 @@ class ElsevierParser(object):
                 publication_date = PartialDate.parse(publication_date)
         return publication_date
 
-    @property
+    @cached_property
     def publication_info(self):
         publication_info = {
             "artid": self.artid,
@@ -434,74 +499,94 @@ class ElsevierParser(object):
 
         return publication_info
 
-    @property
+    @cached_property
     def publisher(self):
-        publisher = self.root.xpath("string(./RDF/Description/publisher[1])").extract_first(
-            "Elsevier B.V."
+        publisher = extract_first(
+            self.root,
+            "string(./rdf:RDF/rdf:Description/dct:publisher[1])",
+            default="Elsevier B.V.",
         )
 
         return publisher
 
-    @property
+    @cached_property
     def subtitle(self):
-        subtitle = self.root.xpath("string(./*/head/subtitle[1])").extract_first()
+        subtitle = extract_first(
+            self.root,
+            "string(./*/*[self::ja:head or self::cja:head]/ce:subtitle[1])",
+        )
         if not subtitle:
-            subtitle = self.root.xpath(
-                "string(./*/simple-head/subtitle[1])"
-            ).extract_first()
+            subtitle = extract_first(
+                self.root,
+                "string(./*/ja:simple-head/ce:subtitle[1])",
+            )
         return subtitle
 
-    @property
+    @cached_property
     def title(self):
-        title = self.root.xpath("./*/head/title[1]").extract_first()
+        title = select(self.root, "./*/*[self::ja:head or self::cja:head]/ce:title[1]")
         if not title:
-            title = self.root.xpath(
-                "./*/simple-head/title[1]"
-            ).extract_first()
+            title = select(self.root, "./*/ja:simple-head/ce:title[1]")
+        title = strip_namespaces(title[0]).extract() if title else None
         return remove_tags(title, **self.remove_tags_config_title).strip("\n") if title else None
 
-    @property
+    @cached_property
     def year(self):
         if self.publication_date:
             return self.publication_date.year
 
-    def get_author_affiliations(self, author_node, author_group_node):
-        """Extract an author's affiliations."""
-        ref_ids = author_node.xpath(".//@refid[contains(., 'af')]").extract()
-        group_affs = author_group_node.xpath("string(./affiliation/textfn[1])").getall()
-        if ref_ids:
-            affiliations = self._find_affiliations_by_id(author_group_node, ref_ids)
-        else:
-            affiliations = filter(None, group_affs)
+    @staticmethod
+    def get_affiliations_by_id(root):
+        """Index the affiliations of the record by their ids.
+
+        Affiliations should be standardized later.
+
+        Returns:
+            dict: the text of the first affiliation with each id.
+        """
+        affiliations = {}
+        for affiliation in select(root, "//ce:affiliation[@id]"):
+            affiliations.setdefault(
+                extract_first(affiliation, "@id"),
+                extract_first(affiliation, "string(./ce:textfn[1])"),
+            )
         return affiliations
 
     @staticmethod
-    def _find_affiliations_by_id(author_group, ref_ids):
-        """Return affiliations with given ids.
+    def get_group_affiliations(author_group_node):
+        """Extract the affiliations of an author group.
 
-        Affiliations should be standardized later.
+        Returns:
+            List[str]: the non-empty affiliations, which are the ones of the
+                authors of the group not referring to specific affiliations.
         """
-        affiliations_by_id = []
-        for aff_id in ref_ids:
-            affiliation = author_group.xpath(
-                "string(//affiliation[@id='{}']/textfn[1])".format(aff_id)
-            ).extract_first()
-            affiliations_by_id.append(affiliation)
+        return [
+            affiliation for affiliation in extract(
+                author_group_node, "string(./ce:affiliation/ce:textfn[1])"
+            )
+            if affiliation
+        ]
 
-        return affiliations_by_id
+    @staticmethod
+    def get_author_affiliations(author_node, group_affiliations, affiliations_by_id):
+        """Extract an author's affiliations."""
+        ref_ids = extract(author_node, ".//@refid[contains(., 'af')]")
+        if ref_ids:
+            return [affiliations_by_id.get(ref_id, u'') for ref_id in ref_ids]
+        return group_affiliations
 
     def get_author_emails(self, author_node):
         """Extract an author's email addresses."""
-        emails = author_node.xpath('string(./e-address[@type="email"][1])').getall()
+        emails = extract(author_node, 'string(./ce:e-address[@type="email"][1])')
 
         return emails
 
     @staticmethod
     def get_author_name(author_node):
         """Extract an author's name."""
-        surname = author_node.xpath("string(./surname[1])").extract_first()
-        given_names = author_node.xpath("string(./given-name[1])").extract_first()
-        suffix = author_node.xpath("string(.//suffix[1])").extract_first()
+        surname = extract_first(author_node, "string(./ce:surname[1])")
+        given_names = extract_first(author_node, "string(./ce:given-name[1])")
+        suffix = extract_first(author_node, "string(.//ce:suffix[1])")
         author_name = ", ".join(el for el in (surname, given_names, suffix) if el)
 
         return author_name
@@ -510,6 +595,10 @@ class ElsevierParser(object):
     def get_root_node(elsevier_record):
         """Get a selector on the root ``article`` node of the record.
 
+        The prefixes of :data:`NAMESPACES`, or the ones declared by the
+        record, are registered on the selector, see
+        :func:`hepcrawl.xpaths.register_namespaces`.
+
         This can be overridden in case some preprocessing needs to be done on
         the XML.
 
@@ -524,23 +613,28 @@ class ElsevierParser(object):
             root = get_node(elsevier_record)
         else:
             root = elsevier_record
-        root.remove_namespaces()
 
-        return root
+        return register_namespaces(root, NAMESPACES)
 
-    def get_author(self, author_node, author_group_node):
+    def get_author(self, author_node, group_affiliations, affiliations_by_id):
         """Extract one author.
 
         Args:
             author_node(scrapy.selector.Selector): a selector on a single
                 author, e.g. a ``<contrib contrib-type="author">``.
+            group_affiliations(List[str]): the affiliations of the author
+                group, see :meth:`get_group_affiliations`.
+            affiliations_by_id(dict): the affiliations of the record, see
+                :meth:`get_affiliations_by_id`.
 
         Returns:
             dict: the parsed author, conforming to the Inspire schema.
         """
         author_name = self.get_author_name(author_node)
         emails = self.get_author_emails(author_node)
-        affiliations = self.get_author_affiliations(author_node, author_group_node)
+        affiliations = self.get_author_affiliations(
+            author_node, group_affiliations, affiliations_by_id
+        )
 
         return self.builder.make_author(
             author_name, raw_affiliations=affiliations, emails=emails
@@ -556,11 +650,11 @@ class ElsevierParser(object):
         Returns:
             List[str]: list of names
         """
-        authors = ref_node.xpath("./contribution/authors/author")
+        authors = select(ref_node, "./sb:contribution/sb:authors/sb:author")
         authors_names = []
         for author in authors:
-            given_names = author.xpath("string(./given-name[1])").extract_first(default="")
-            last_names = author.xpath("string(./surname[1])").extract_first(default="")
+            given_names = extract_first(author, "string(./ce:given-name[1])", default="")
+            last_names = extract_first(author, "string(./ce:surname[1])", default="")
             authors_names.append(" ".join([given_names, last_names]).strip())
         return authors_names
 
@@ -574,22 +668,25 @@ class ElsevierParser(object):
         Returns:
             List[str]: list of names
         """
-        editors = ref_node.xpath(".//editors/authors/author")
+        editors = select(ref_node, ".//sb:editors/sb:authors/sb:author")
         editors_names = []
         for editor in editors:
-            given_names = editor.xpath("string(./given-name[1])").extract_first(default="")
-            last_names = editor.xpath("string(./surname[1])").extract_first(default="")
+            given_names = extract_first(editor, "string(./ce:given-name[1])", default="")
+            last_names = extract_first(editor, "string(./ce:surname[1])", default="")
             editors_names.append(" ".join([given_names, last_names]).strip())
         return editors_names
 
     @staticmethod
     def get_reference_artid(ref_node):
-        return ref_node.xpath("string(.//article-number[1])").extract_first()
+        return extract_first(
+            ref_node,
+            "string(.//*[self::sb:article-number or self::ce:article-number][1])",
+        )
 
     @staticmethod
     def get_reference_pages(ref_node):
-        first_page = ref_node.xpath("string(.//pages/first-page[1])").extract_first()
-        last_page = ref_node.xpath("string(.//pages/last-page[1])").extract_first()
+        first_page = extract_first(ref_node, "string(.//sb:pages/sb:first-page[1])")
+        last_page = extract_first(ref_node, "string(.//sb:pages/sb:last-page[1])")
         return first_page, last_page
 
     def get_reference_iter(self, ref_node):
@@ -604,41 +701,40 @@ class ElsevierParser(object):
                 :class:`inspire_schemas.api.ReferenceBuilder`
         """
         # handle also unstructured refs
-        for citation_node in ref_node.xpath("./reference|./other-ref"):
+        for citation_node in select(ref_node, "./sb:reference|./ce:other-ref"):
             builder = ReferenceBuilder()
 
             builder.add_raw_reference(
-                ref_node.extract().strip(),
+                strip_namespaces(ref_node).extract().strip(),
                 source=self.builder.source,
                 ref_format="Elsevier",
             )
 
             fields = [
-                (("string(.//series/title/maintitle[1])"), builder.set_journal_title,),
+                ("string(.//sb:series/sb:title/sb:maintitle[1])", builder.set_journal_title),
                 (
-                    "string(.//title[parent::edited-book|parent::book]/maintitle[1])",
+                    "string(.//sb:title[parent::sb:edited-book|parent::sb:book]/sb:maintitle[1])",
                     builder.add_parent_title,
                 ),
-                ("string(./publisher/name[1])", builder.set_publisher),
-                ("string(.//volume-nr[1])", builder.set_journal_volume),
-                ("string(.//issue-nr[1])", builder.set_journal_issue),
-                ("string(.//date[1])", builder.set_year),
-                ("string(.//inter-ref[1])", builder.add_url),
-                ("string(.//doi[1])", builder.add_uid),
+                ("string(./sb:publisher/sb:name[1])", builder.set_publisher),
+                ("string(.//sb:volume-nr[1])", builder.set_journal_volume),
+                ("string(.//sb:issue-nr[1])", builder.set_journal_issue),
+                ("string(.//sb:date[1])", builder.set_year),
+                ("string(.//ce:inter-ref[1])", builder.add_url),
+                ("string(.//ce:doi[1])", builder.add_uid),
                 (
-                    'string(pub-id[@pub-id-type="other"]'
+                    'string(*[local-name() = "pub-id"][@pub-id-type="other"]'
                     '[contains(preceding-sibling::text(),"Report No")][1])',
                     builder.add_report_number,
                 ),
-                ("string(./title/maintitle[1])", builder.add_title),
+                ("string(./sb:title/sb:maintitle[1])", builder.add_title),
             ]
             for xpath, field_handler in fields:
-                value = citation_node.xpath(xpath).extract_first()
-                citation_node.xpath(xpath)
+                value = extract_first(citation_node, xpath)
                 if value:
                     field_handler(value)
 
-            label_value = ref_node.xpath("string(./label[1])").extract_first()
+            label_value = extract_first(ref_node, "string(./ce:label[1])")
             builder.set_label(label_value.strip("[]"))
 
             pages = self.get_reference_pages(citation_node)
@@ -650,7 +746,7 @@ class ElsevierParser(object):
 
             remainder = (
                 remove_tags(
-                    citation_node,
+                    strip_namespaces(citation_node),
                     strip="self::authors"
                     "|self::article-number"
                     "|self::volume-nr"
@@ -21,8 +21,19 @@ from inspire_schemas.utils import split_page_artid
 from inspire_utils.date import PartialDate
 from inspire_utils.helpers import maybe_int, remove_tags
 
-from ..utils import get_node
-
+from ..utils import add_references, cached_property, get_node
+from ..xpaths import (
+    extract,
+    extract_first,
+    register_namespaces,
+    select,
+    strip_namespaces,
+)
+
+NAMESPACES = {
+    'mml': 'http://www.w3.org/1998/Math/MathML',
+    'xlink': 'http://www.w3.org/1999/xlink',
+}
 
 JOURNAL_TITLES_MAPPING = {
     "Physics": "APS Physics"
@@ -70,12 +81,11 @@ class JatsParser(object):
         self.builder.add_imprint_date(
             self.publication_date.dumps() if self.publication_date else None
         )
-        for reference in self.references:
-            self.builder.add_reference(reference)
+        add_references(self.builder, self.references)
 
         return self.builder.record
 
-    @property
+    @cached_property
     def references(self):
         """Extract a JATS record into an Inspire HEP references record.
 
@@ -83,7 +93,7 @@ class JatsParser(object):
             List[dict]: an array of reference schema records, representing
                 the references in the record
         """
-        ref_nodes = self.root.xpath('./back/ref-list/ref')
+        ref_nodes = select(self.root, './back/ref-list/ref')
         return list(
             itertools.chain.from_iterable(
                 self.get_reference(node) for node in ref_nodes
@@ -100,49 +110,56 @@ class JatsParser(object):
         'allowed_trees': ['math'],
     }
 
-    @property
+    @cached_property
     def abstract(self):
-        abstract_nodes = self.root.xpath('./front//abstract[1]')
+        abstract_nodes = select(self.root, './front//abstract[1]')
 
         if not abstract_nodes:
             return
 
-        abstract = remove_tags(abstract_nodes[0], **self.remove_tags_config_abstract).strip()
+        abstract = remove_tags(
+            strip_namespaces(abstract_nodes[0]),
+            **self.remove_tags_config_abstract
+        ).strip()
         return abstract
 
-    @property
+    @cached_property
     def article_type(self):
-        article_type = self.root.xpath('./@article-type').extract_first()
+        article_type = extract_first(self.root, './@article-type')
 
         return article_type
 
-    @property
+    @cached_property
     def artid(self):
-        artid = self.root.xpath('./front/article-meta//elocation-id//text()').extract_first()
+        artid = extract_first(self.root, './front/article-meta//elocation-id//text()')
 
         return artid
 
-    @property
+    @cached_property
     def authors(self):
-        author_nodes = self.root.xpath('./front//contrib[@contrib-type="author"]')
-        authors = [self.get_author(author) for author in author_nodes]
+        author_nodes = select(self.root, './front//contrib[@contrib-type="author"]')
+        affiliations_by_id = self.get_affiliations_by_id(self.root)
+        authors = [
+            self.get_author(author, affiliations_by_id) for author in author_nodes
+        ]
 
         return authors
 
-    @property
+    @cached_property
     def collaborations(self):
-        collab_nodes = self.root.xpath(
+        collab_nodes = select(
+            self.root,
             './front//collab |'
             './front//contrib[@contrib-type="collaboration"] |'
-            './front//on-behalf-of'
+            './front//on-behalf-of',
         )
         collaborations = set(
-            collab.xpath('string(.)').extract_first() for collab in collab_nodes
+            extract_first(collab, 'string(.)') for collab in collab_nodes
         )
 
         return collaborations
 
-    @property
+    @cached_property
     def copyright(self):
         copyright = {
             'holder': self.copyright_holder,
@@ -153,41 +170,42 @@ class JatsParser(object):
 
         return copyright
 
-    @property
+    @cached_property
     def copyright_holder(self):
-        copyright_holder = self.root.xpath('./front//copyright-holder/text()').extract_first()
+        copyright_holder = extract_first(self.root, './front//copyright-holder/text()')
 
         return copyright_holder
 
-    @property
+    @cached_property
     def copyright_statement(self):
-        copyright_statement = self.root.xpath('./front//copyright-statement/text()').extract_first()
+        copyright_statement = extract_first(self.root, './front//copyright-statement/text()')
 
         return copyright_statement
 
-    @property
+    @cached_property
     def copyright_year(self):
-        copyright_year = self.root.xpath('./front//copyright-year/text()').extract_first()
+        copyright_year = extract_first(self.root, './front//copyright-year/text()')
 
         return maybe_int(copyright_year)
 
-    @property
+    @cached_property
     def dois(self):
-        doi_values = self.root.xpath('./front/article-meta//article-id[@pub-id-type="doi"]/text()').extract()
+        doi_values = extract(self.root, './front/article-meta//article-id[@pub-id-type="doi"]/text()')
         dois = [
             {'doi': value, 'material': self.material} for value in doi_values
         ]
 
         if self.material != 'publication':
-            doi_values = self.root.xpath(
-                './front/article-meta//related-article[@ext-link-type="doi"]/@href'
-            ).extract()
+            doi_values = extract(
+                self.root,
+                './front/article-meta//related-article[@ext-link-type="doi"]/@xlink:href',
+            )
             related_dois = ({'doi': value} for value in doi_values)
             dois.extend(related_dois)
 
         return dois
 
-    @property
+    @cached_property
     def document_type(self):
         if self.is_conference_paper:
             document_type = 'conference paper'
@@ -196,42 +214,43 @@ class JatsParser(object):
 
         return document_type
 
-    @property
+    @cached_property
     def is_conference_paper(self):
         """Decide whether the article is a conference paper."""
-        conference_node = self.root.xpath('./front//conference').extract_first()
+        conference_node = extract_first(self.root, './front//conference')
 
         return bool(conference_node)
 
-    @property
+    @cached_property
     def journal_title(self):
-        journal_title = self.root.xpath(
+        journal_title = extract_first(
+            self.root,
             './front/journal-meta//abbrev-journal-title/text() |'
-            './front/journal-meta//journal-title/text()'
-        ).extract_first()
+            './front/journal-meta//journal-title/text()',
+        )
 
         return JOURNAL_TITLES_MAPPING.get(journal_title) or journal_title
 
-    @property
+    @cached_property
     def journal_issue(self):
-        journal_issue = self.root.xpath('./front/article-meta/issue/text()').extract_first()
+        journal_issue = extract_first(self.root, './front/article-meta/issue/text()')
 
         return journal_issue
 
-    @property
+    @cached_property
     def journal_volume(self):
-        journal_volume = self.root.xpath('./front/article-meta/volume/text()').extract_first()
+        journal_volume = extract_first(self.root, './front/article-meta/volume/text()')
 
         return journal_volume
 
-    @property
+    @cached_property
     def keywords(self):
-        keyword_groups = self.root.xpath('./front//kwd-group')
+        keyword_groups = select(self.root, './front//kwd-group')
         keywords = itertools.chain.from_iterable(self.get_keywords(group) for group in keyword_groups)
 
-        return keywords
+        return list(keywords)
 
-    @property
+    @cached_property
     def license(self):
         license = {
             'license': self.license_statement,
@@ -241,24 +260,24 @@ class JatsParser(object):
 
         return license
 
-    @property
+    @cached_property
     def license_statement(self):
-        license_statement = self.root.xpath('string(./front/article-meta//license)').extract_first().strip()
+        license_statement = extract_first(self.root, 'string(./front/article-meta//license)').strip()
 
         return license_statement
 
-    @property
+    @cached_property
     def license_url(self):
         url_nodes = (
             './front/article-meta//license_ref/text() |'
-            './front/article-meta//license/@href |'
-            './front/article-meta//license//ext-link/@href'
+            './front/article-meta//license/@xlink:href |'
+            './front/article-meta//license//ext-link/@xlink:href'
         )
-        license_url = self.root.xpath(url_nodes).extract_first()
+        license_url = extract_first(self.root, url_nodes)
 
         return license_url
 
-    @property
+    @cached_property
     def material(self):
         if self.article_type.startswith('correc'):
             material = 'erratum'
@@ -269,31 +288,32 @@ class JatsParser(object):
 
         return material
 
-    @property
+    @cached_property
     def number_of_pages(self):
-        number_of_pages = maybe_int(self.root.xpath('./front/article-meta//page-count/@count').extract_first())
+        number_of_pages = maybe_int(extract_first(self.root, './front/article-meta//page-count/@count'))
 
         return number_of_pages
 
-    @property
+    @cached_property
     def page_start(self):
-        page_start = self.root.xpath('./front/article-meta/fpage/text()').extract_first()
+        page_start = extract_first(self.root, './front/article-meta/fpage/text()')
 
         return page_start
 
-    @property
+    @cached_property
     def page_end(self):
-        page_end = self.root.xpath('./front/article-meta/lpage/text()').extract_first()
+        page_end = extract_first(self.root, './front/article-meta/lpage/text()')
 
         return page_end
 
-    @property
+    @cached_property
     def publication_date(self):
-        date_nodes = self.root.xpath(
+        date_nodes = select(
+            self.root,
             './front//pub-date[@pub-type="ppub"] |'
             './front//pub-date[@pub-type="epub"] |'
             './front//pub-date[starts-with(@date-type,"pub")] |'
-            './front//date[starts-with(@date-type,"pub")]'
+            './front//date[starts-with(@date-type,"pub")]',
         )
 
         if date_nodes:
@@ -303,7 +323,7 @@ class JatsParser(object):
 
             return publication_date
 
-    @property
+    @cached_property
     def publication_info(self):
         publication_info = {
             'artid': self.artid,
@@ -318,63 +338,65 @@ class JatsParser(object):
 
         return publication_info
 
-    @property
+    @cached_property
     def publisher(self):
-        publisher = self.root.xpath('./front//publisher-name/text()').extract_first()
+        publisher = extract_first(self.root, './front//publisher-name/text()')
 
         return publisher
 
-    @property
+    @cached_property
     def subtitle(self):
-        subtitle = self.root.xpath('string(./front//subtitle)').extract_first()
+        subtitle = extract_first(self.root, 'string(./front//subtitle)')
 
         return subtitle
 
-    @property
+    @cached_property
     def title(self):
-        title = self.root.xpath('./front//article-title').extract_first()
+        title = select(self.root, './front//article-title')
+        title = strip_namespaces(title[0]).extract() if title else None
         return remove_tags(title, **self.remove_tags_config_title)
 
-    def get_affiliation(self, id_):
-        """Get the affiliation with the specified id.
+    @staticmethod
+    def get_affiliations_by_id(root):
+        """Index the affiliations of the record by their ids.
 
         Args:
-            id_(str): the value of the ``id`` attribute of the affiliation.
+            root(scrapy.selector.Selector): a selector on the root of the
+                record.
 
         Returns:
-            Optional[str]: the affiliation with that id or ``None`` if there is
-                no match.
+            dict: for every id, the affiliation of the first ``aff`` with
+                that id under the ``value`` key, and the emails of all of
+                them under the ``emails`` key.
         """
-        affiliation_node = self.root.xpath("//aff[@id=$id_]", id_=id_)
-        if affiliation_node:
-            affiliation = remove_tags(
-                affiliation_node[0], strip="self::label | self::email"
-            ).strip()
-            return affiliation
-
-    def get_emails_from_refs(self, id_):
-        """Get the emails from the node with the specified id.
-
-        Args:
-            id_(str): the value of the ``id`` attribute of the node.
+        affiliations = {}
+        for affiliation_node in select(root, '//aff[@id]'):
+            id_ = extract_first(affiliation_node, '@id')
+            emails = extract(affiliation_node, './email/text()')
+            if id_ in affiliations:
+                affiliations[id_]['emails'].extend(emails)
+                continue
+            affiliations[id_] = {
+                'value': remove_tags(
+                    affiliation_node, strip="self::label | self::email"
+                ).strip(),
+                'emails': emails,
+            }
 
-        Returns:
-            List[str]: the emails from the node with that id or [] if none found.
-        """
-        email_nodes = self.root.xpath('//aff[@id=$id_]/email/text()', id_=id_)
-        return email_nodes.extract()
+        return affiliations
 
-    @property
+    @cached_property
     def year(self):
         not_online = (
             'not(starts-with(@publication-format, "elec"))'
             ' and not(starts-with(@publication-format, "online")'
         )
-        date_nodes = self.root.xpath(
+        date_nodes = select(
+            self.root,
             './front//pub-date[@pub-type="ppub"] |'
             './front//pub-date[starts-with(@date-type,"pub") and $not_online] |'
             './front//date[starts-with(@date-type,"pub") and $not_online]',
-            not_online=not_online
+            not_online=not_online,
         )
 
         if date_nodes:
@@ -384,39 +406,45 @@ class JatsParser(object):
 
             return year
 
-    def get_author_affiliations(self, author_node):
+    @staticmethod
+    def get_author_affiliations(author_node, affiliations_by_id):
         """Extract an author's affiliations."""
-        raw_referred_ids = author_node.xpath('.//xref[@ref-type="aff"]/@rid').extract()
+        raw_referred_ids = extract(author_node, './/xref[@ref-type="aff"]/@rid')
         # Sometimes the rid might have more than one ID (e.g. rid="id0 id1")
-        referred_ids = set()
+        referred_ids = []
         for raw_referred_id in raw_referred_ids:
-            referred_ids.update(set(raw_referred_id.split(' ')))
+            referred_ids.extend(
+                rid for rid in raw_referred_id.split(' ')
+                if rid not in referred_ids
+            )
 
         affiliations = [
-            self.get_affiliation(rid) for rid in referred_ids
-            if self.get_affiliation(rid)
+            affiliations_by_id[rid]['value'] for rid in referred_ids
+            if rid in affiliations_by_id and affiliations_by_id[rid]['value']
         ]
 
         return affiliations
 
-    def get_author_emails(self, author_node):
+    @staticmethod
+    def get_author_emails(author_node, affiliations_by_id):
         """Extract an author's email addresses."""
-        emails = author_node.xpath('.//email/text()').extract()
-        referred_ids = author_node.xpath('.//xref[@ref-type="aff"]/@rid').extract()
+        emails = extract(author_node, './/email/text()')
+        referred_ids = extract(author_node, './/xref[@ref-type="aff"]/@rid')
         for referred_id in referred_ids:
-            emails.extend(self.get_emails_from_refs(referred_id))
+            if referred_id in affiliations_by_id:
+                emails.extend(affiliations_by_id[referred_id]['emails'])
 
         return emails
 
     @staticmethod
     def get_author_name(author_node):
         """Extract an author's name."""
-        surname = author_node.xpath('.//surname/text()').extract_first()
+        surname = extract_first(author_node, './/surname/text()')
         if not surname:
             # the author name is unstructured
-            author_name = author_node.xpath('string(./string-name)').extract_first()
-        given_names = author_node.xpath('.//given-names/text()').extract_first()
-        suffix = author_node.xpath('.//suffix/text()').extract_first()
+            author_name = extract_first(author_node, 'string(./string-name)')
+        given_names = extract_first(author_node, './/given-names/text()')
+        suffix = extract_first(author_node, './/suffix/text()')
         author_name = ', '.join(el for el in (surname, given_names, suffix) if el)
 
         return author_name
@@ -453,19 +481,19 @@ class JatsParser(object):
         Returns:
             PartialDate: the parsed date.
         """
-        iso_string = date_node.xpath('./@iso-8601-date').extract_first(default="")
+        iso_string = extract_first(date_node, './@iso-8601-date', default="")
         iso_date = self._get_iso_date(iso_string)
         if iso_date:
             return iso_date
-        year = date_node.xpath('string(./year)').extract_first()
-        month = date_node.xpath('string(./month)').extract_first()
-        day = date_node.xpath('string(./day)').extract_first()
+        year = extract_first(date_node, 'string(./year)')
+        month = extract_first(date_node, 'string(./month)')
+        day = extract_first(date_node, 'string(./day)')
 
         date_from_parts = self._get_date_from_parts(year, month, day)
         if date_from_parts:
             return date_from_parts
 
-        string_date = date_node.xpath('string(./string-date)').extract_first()
+        string_date = extract_first(date_node, 'string(./string-date)')
         try:
             parsed_date = PartialDate.parse(string_date)
         except ValueError:
@@ -477,10 +505,10 @@ class JatsParser(object):
     def get_keywords(group_node):
         """Extract keywords from a keyword group."""
         schema = None
-        if 'pacs' in group_node.xpath('@kwd-group-type').extract_first(default='').lower():
+        if 'pacs' in extract_first(group_node, '@kwd-group-type', default='').lower():
             schema = 'PACS'
 
-        keywords = (kwd.xpath('string(.)').extract_first() for kwd in group_node.xpath('.//kwd'))
+        keywords = (extract_first(kwd, 'string(.)') for kwd in select(group_node, './/kwd'))
         keyword_dicts = ({'keyword': keyword, 'schema': schema} for keyword in keywords)
 
         return keyword_dicts
@@ -489,6 +517,11 @@ class JatsParser(object):
     def get_root_node(jats_record):
         """Get a selector on the root ``article`` node of the record.
 
+        The JATS elements have no namespace, the prefixes of
+        :data:`NAMESPACES` are registered on the selector for the MathML
+        elements and XLink attributes, see
+        :func:`hepcrawl.xpaths.register_namespaces`.
+
         This can be overridden in case some preprocessing needs to be done on
         the XML.
 
@@ -503,23 +536,24 @@ class JatsParser(object):
             root = get_node(jats_record)
         else:
             root = jats_record
-        root.remove_namespaces()
 
-        return root
+        return register_namespaces(root, NAMESPACES)
 
-    def get_author(self, author_node):
+    def get_author(self, author_node, affiliations_by_id):
         """Extract one author.
 
         Args:
             author_node(scrapy.selector.Selector): a selector on a single
                 author, e.g. a ``<contrib contrib-type="author">``.
+            affiliations_by_id(dict): the affiliations of the record, see
+                :meth:`get_affiliations_by_id`.
 
         Returns:
             dict: the parsed author, conforming to the Inspire schema.
         """
         author_name = self.get_author_name(author_node)
-        emails = self.get_author_emails(author_node)
-        affiliations = self.get_author_affiliations(author_node)
+        emails = self.get_author_emails(author_node, affiliations_by_id)
+        affiliations = self.get_author_affiliations(author_node, affiliations_by_id)
         orcid = self.get_orcid(author_node)
         author_ids = [("ORCID", orcid)] if orcid else []
         return self.builder.make_author(
@@ -531,7 +565,7 @@ class JatsParser(object):
 
     @staticmethod
     def get_orcid(author_node):
-        orcid = author_node.xpath('./contrib-id[@contrib-id-type="orcid"]/text()').extract_first()
+        orcid = extract_first(author_node, './contrib-id[@contrib-id-type="orcid"]/text()')
         if orcid:
             return normalize_orcid(orcid)
 
@@ -546,10 +580,11 @@ class JatsParser(object):
         Returns:
             List[str]: list of names
         """
-        return ref_node.xpath(
+        return extract(
+            ref_node,
             './person-group[@person-group-type=$role]/string-name/text()',
-            role=role
-        ).extract()
+            role=role,
+        )
 
     def get_reference(self, ref_node):
         """Extract one reference.
@@ -562,11 +597,11 @@ class JatsParser(object):
             dict: the parsed reference, as generated by
                 :class:`inspire_schemas.api.ReferenceBuilder`
         """
-        for citation_node in ref_node.xpath('./mixed-citation'):
+        for citation_node in select(ref_node, './mixed-citation'):
             builder = ReferenceBuilder()
 
             builder.add_raw_reference(
-                ref_node.extract().strip(),
+                strip_namespaces(ref_node).extract().strip(),
                 source=self.builder.source,
                 ref_format='JATS'
             )
@@ -599,8 +634,7 @@ class JatsParser(object):
             ]
 
             for xpath, field_handler in fields:
-                value = citation_node.xpath(xpath).extract_first()
-                citation_node.xpath(xpath)
+                value = extract_first(citation_node, xpath)
                 if value:
                     field_handler(value)
 
@@ -628,7 +662,7 @@ class JatsParser(object):
             for author in self.get_reference_authors(citation_node, 'author'):
                 builder.add_author(author, 'author')
 
-            page_range = citation_node.xpath('./page-range/text()').extract_first()
+            page_range = extract_first(citation_node, './page-range/text()')
             if page_range:
                 page_artid = split_page_artid(page_range)
                 builder.set_page_artid(*page_artid)
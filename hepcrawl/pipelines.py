@@ -30,6 +30,7 @@ import logstash
 
 from .api import CrawlResult
 from .settings import FILES_STORE
+from .signals import results_checkpoint
 from .utils import RecordFile
 
 logger = logging.getLogger(__name__)
@@ -110,6 +111,15 @@ class InspireAPIPushPipeline(object):
         self.spider_name = None
         self.scrape_job = None
 
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls()
+        crawler.signals.connect(
+            pipeline.push_results,
+            signal=results_checkpoint,
+        )
+        return pipeline
+
     def open_spider(self, spider):
         self.results_data = []
         self.spider_name = spider.name
@@ -178,9 +188,10 @@ class InspireAPIPushPipeline(object):
         )
         return crawl_result
 
-    def _prepare_payload(self, spider):
-        """Return payload for push."""
-        payload_list = [
+    @staticmethod
+    def _results_payload(results_data, spider):
+        """Return the payload pushing the given results, one per result."""
+        return [
             dict(
                 job_id=os.environ["SCRAPY_JOB"],
                 results_uri=os.environ["SCRAPY_FEED_URI"],
@@ -189,13 +200,22 @@ class InspireAPIPushPipeline(object):
                 log_file=None,
                 spider_name=spider.name,
             )
-            for result in self.results_data
+            for result in results_data
         ]
+
+    @staticmethod
+    def _error_payload(err):
+        """Return the payload of an error registered by the spider."""
+        error = {"exception": str(err["exception"]), "sender": str(err["sender"])}
+        if err.get("traceback"):
+            error["traceback"] = err["traceback"]
+        return error
+
+    def _prepare_payload(self, spider):
+        """Return payload for push."""
+        payload_list = self._results_payload(self.results_data, spider)
         if spider.state.get("errors"):
-            errors = [
-                {"exception": str(err["exception"]), "sender": str(err["sender"])}
-                for err in spider.state["errors"]
-            ]
+            errors = [self._error_payload(err) for err in spider.state["errors"]]
             payload_list.append(
                 dict(
                     job_id=os.environ["SCRAPY_JOB"],
@@ -233,18 +253,36 @@ class InspireAPIPushPipeline(object):
         if "errors" in spider.state:
             del spider.state["errors"]
 
-    def close_spider(self, spider):
-        """Post results to HTTP API."""
+    def push_results(self, spider):
+        """Push the results processed so far and forget them.
+
+        Called on the :data:`hepcrawl.signals.results_checkpoint` signal,
+        before the spider saves its progress. The errors are only pushed
+        when the spider closes.
+
+        Args:
+            spider (StatefulSpider): the current spider.
+        """
+        results_data, self.results_data = self.results_data, []
+        if "SCRAPY_JOB" in os.environ:
+            self._push(self._results_payload(results_data, spider), spider)
+
+    def _push(self, payload_list, spider):
+        """Post the payloads to the HTTP API."""
         api_mapping = spider.settings["API_PIPELINE_TASK_ENDPOINT_MAPPING"]
         task_endpoint = api_mapping.get(
             spider.name, spider.settings["API_PIPELINE_TASK_ENDPOINT_DEFAULT"]
         )
         api_url = os.path.join(spider.settings["API_PIPELINE_URL"], task_endpoint)
-        if api_url and "SCRAPY_JOB" in os.environ:
-            for payload in self._prepare_payload(spider):
-                json_data = {"kwargs": payload}
+        for payload in payload_list:
+            json_data = {"kwargs": payload}
+
+            requests.post(api_url, json=json_data).raise_for_status()
 
-                requests.post(api_url, json=json_data)
+    def close_spider(self, spider):
+        """Post results to HTTP API."""
+        if "SCRAPY_JOB" in os.environ:
+            self._push(self._prepare_payload(spider), spider)
 
         self._cleanup(spider)
 
@@ -278,6 +316,44 @@ class InspireCeleryPushPipeline(InspireAPIPushPipeline):
         )
         super(InspireCeleryPushPipeline, self).open_spider(spider=spider)
 
+    def _push(self, payload_list, spider):
+        """Send the payloads as celery tasks."""
+        task_endpoint = spider.settings["API_PIPELINE_TASK_ENDPOINT_MAPPING"].get(
+            spider.name,
+            spider.settings["API_PIPELINE_TASK_ENDPOINT_DEFAULT"],
+        )
+        for kwargs in payload_list:
+            res = self.celery.send_task(task_endpoint, kwargs=kwargs)
+            celery_task_info_payload = {
+                "celery_task_id": res.id,
+                "scrapy_job_id": os.environ.get("SCRAPY_JOB"),
+            }
+            logger.info(
+                "Sent celery task %s", pprint.pformat(celery_task_info_payload)
+            )
+
+            logger.info(
+                "Sent celery task: \n %s",
+                pprint.pformat(
+                    dict(
+                        spider=self.spider_name,
+                        scrapy_job=self.scrape_job,
+                        kwargs=kwargs,
+                        celery_task_id=res.id,
+                    )
+                ),
+            )
+
+            LOGGER.info(
+                "Sending task.",
+                extra=dict(
+                    spider=self.spider_name,
+                    scrapy_job=self.scrape_job,
+                    kwargs=kwargs,
+                    celery_task_id=res.id,
+                ),
+            )
+
     def close_spider(self, spider):
         """Post results to BROKER API."""
         from celery.utils.log import get_task_logger
@@ -317,37 +393,7 @@ class InspireCeleryPushPipeline(InspireAPIPushPipeline):
                 ),
             )
 
-            for kwargs in self._prepare_payload(spider):
-                res = self.celery.send_task(task_endpoint, kwargs=kwargs)
-                celery_task_info_payload = {
-                    "celery_task_id": res.id,
-                    "scrapy_job_id": os.environ.get("SCRAPY_JOB"),
-                }
-                logger.info(
-                    "Sent celery task %s", pprint.pformat(celery_task_info_payload)
-                )
-
-                logger.info(
-                    "Sent celery task: \n %s",
-                    pprint.pformat(
-                        dict(
-                            spider=self.spider_name,
-                            scrapy_job=self.scrape_job,
-                            kwargs=kwargs,
-                            celery_task_id=res.id,
-                        )
-                    ),
-                )
-
-                LOGGER.info(
-                    "Sending task.",
-                    extra=dict(
-                        spider=self.spider_name,
-                        scrapy_job=self.scrape_job,
-                        kwargs=kwargs,
-                        celery_task_id=res.id,
-                    ),
-                )
+            self._push(self._prepare_payload(spider), spider)
 
             logger.info(
                 "Finish Processing. \n %s",
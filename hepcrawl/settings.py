@@ -81,10 +81,56 @@ SPIDER_MIDDLEWARES = {
 # Configure custom downloaders
 # See https://doc.scrapy.org/en/0.20/topics/settings.html#download-handlers
 DOWNLOAD_HANDLERS = {
-    'oaipmh+http': 'hepcrawl.downloaders.DummyDownloadHandler',
-    'oaipmh+https': 'hepcrawl.downloaders.DummyDownloadHandler',
+    'oaipmh+http': 'hepcrawl.downloaders.OAIPMHDownloadHandler',
+    'oaipmh+https': 'hepcrawl.downloaders.OAIPMHDownloadHandler',
 }
 
+# OAI-PMH harvesting settings
+# ===========================
+# How many times a 503 answer is retried, honouring its Retry-After header
+OAIPMH_MAX_RETRIES = 5
+# Delay (in seconds) used when a 503 answer has no valid Retry-After header
+OAIPMH_DEFAULT_RETRY_AFTER = 60
+# How many OAI-PMH requests a spider keeps in flight (sets are harvested
+# concurrently up to this limit)
+OAIPMH_CONCURRENT_REQUESTS = 4
+# How many pages of a set are requested ahead of the page being parsed
+# (0 waits for all the records of a page before requesting the next one)
+OAIPMH_PREFETCH_PAGES = 1
+# Index of the harvested identifiers used to skip records repeated across
+# sets: 'set' keeps them all in memory, 'bloom' uses a fixed size Bloom filter
+OAIPMH_IDENTIFIER_INDEX = 'set'
+# Expected number of records and false positive rate of the Bloom filter
+OAIPMH_IDENTIFIER_INDEX_CAPACITY = 5000000
+OAIPMH_IDENTIFIER_INDEX_ERROR_RATE = 0.001
+# What to do with identifiers found in the Bloom filter: 'skip' them, or
+# 'verify' them against an exact index stored on disk
+OAIPMH_IDENTIFIER_INDEX_FALSE_POSITIVES = 'verify'
+# Whether the datestamps of the harvested records are stored in every mode,
+# they are always stored in changed_only mode which needs them
+OAIPMH_DATESTAMPS_INDEX = False
+
+# Number of processes parsing the records of the spiders supporting it, e.g.
+# arXiv and CDS (0 parses them in the crawling process)
+PARSING_PROCESSES = 0
+# Seconds after which a record not parsed yet by the processes counts as
+# failed, e.g. because its process died (0 waits forever)
+PARSING_TIMEOUT = 300
+
+# Elsevier harvesting settings
+# ============================
+# Size of the parts of the multipart uploads to S3 of the Elsevier packages,
+# smaller files are uploaded at once
+S3_MULTIPART_CHUNKSIZE = 16 * 1024 * 1024
+# Number of parts of a multipart upload sent in parallel
+S3_MULTIPART_CONCURRENCY = 4
+# File where the keys of the packages bucket are cached between runs (by
+# default the bucket is listed on every run)
+ELSEVIER_PACKAGES_CACHE_PATH = os.environ.get('APP_ELSEVIER_PACKAGES_CACHE_PATH')
+# How long (in seconds) the cached keys are used before listing the bucket
+# again
+ELSEVIER_PACKAGES_CACHE_TTL = 24 * 60 * 60
+
 # Enable or disable downloader middlewares
 # See http://scrapy.readthedocs.org/en/latest/topics/downloader-middleware.html
 DOWNLOADER_MIDDLEWARES = {
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Signals sent by the hepcrawl spiders, in addition to the Scrapy ones.
+
+See: https://doc.scrapy.org/en/latest/topics/signals.html
+"""
+
+from __future__ import absolute_import, division, print_function
+
+
+results_checkpoint = object()
+"""Sent by a spider before it saves the progress of a harvest, with the
+``spider`` argument. The push pipelines then push the results they processed
+so far, the spider only saves its progress if none of the handlers raised.
+"""
@@ -28,6 +28,18 @@ class ArxivSpider(OAIPMHSpider):
 
             $ scrapy crawl arXiv \\
                 -a "sets=physics:hep-th" -a "from_date=2017-12-13"
+
+        Sharding a backfill in date windows::
+
+            $ scrapy crawl arXiv \\
+                -a "sets=physics:hep-th" -a "from_date=2010-01-01" \\
+                -a "shards=12"
+
+        Harvesting one of these windows per job, with a fixed until date::
+
+            $ scrapy crawl arXiv \\
+                -a "sets=physics:hep-th" -a "from_date=2010-01-01" \\
+                -a "until_date=2021-12-31" -a "shards=12" -a "shard=0"
     """
     name = 'arXiv'
     source = 'arXiv'
@@ -40,6 +52,9 @@ class ArxivSpider(OAIPMHSpider):
             sets=None,
             from_date=None,
             until_date=None,
+            shards=None,
+            shard=None,
+            changed_only=False,
             **kwargs
     ):
         super(ArxivSpider, self).__init__(
@@ -48,6 +63,9 @@ class ArxivSpider(OAIPMHSpider):
             sets=sets,
             from_date=from_date,
             until_date=until_date,
+            shards=shards,
+            shard=shard,
+            changed_only=changed_only,
             **kwargs
         )
 
@@ -57,12 +75,10 @@ class ArxivSpider(OAIPMHSpider):
 
     def parse_record(self, selector):
         """Parse an arXiv XML exported file into a HEP record."""
-        parser = ArxivParser(selector, source=self.source)
+        return parse_arxiv_record(selector, source=self.source)
 
-        return ParsedItem(
-            record=parser.parse(),
-            record_format='hep',
-        )
+    def get_record_parser(self):
+        return parse_arxiv_record, {'source': self.source}
 
 
 
@@ -73,6 +89,10 @@ class ArxivSpiderSingle(OAIPMHSpider):
         Using OAI-PMH service::
 
             $ scrapy crawl arXiv_single -a "identifier=oai:arXiv.org:1401.2122"
+
+        Fetching several records in one job::
+
+            $ scrapy crawl arXiv_single -a "identifiers_file=/path/to/identifiers.txt"
     """
     name = 'arXiv_single'
     source = 'arXiv'
@@ -83,12 +103,14 @@ class ArxivSpiderSingle(OAIPMHSpider):
             url='http://export.arxiv.org/oai2',
             format='arXiv',
             identifier=None,
+            identifiers_file=None,
             **kwargs
     ):
         super(ArxivSpiderSingle, self).__init__(
             url=url,
             format=format,
             identifier=identifier,
+            identifiers_file=identifiers_file,
             **kwargs
         )
 
@@ -98,9 +120,25 @@ class ArxivSpiderSingle(OAIPMHSpider):
 
     def parse_record(self, selector):
         """Parse an arXiv XML exported file into a HEP record."""
-        parser = ArxivParser(selector, source=self.source)
+        return parse_arxiv_record(selector, source=self.source)
 
-        return ParsedItem(
-            record=parser.parse(),
-            record_format='hep',
-        )
+    def get_record_parser(self):
+        return parse_arxiv_record, {'source': self.source}
+
+
+def parse_arxiv_record(record, source):
+    """Parse an arXiv record into a HEP record.
+
+    Args:
+        record (Union[str, scrapy.selector.Selector]): the arXiv metadata.
+        source (str): source of the record.
+
+    Returns:
+        hepcrawl.utils.ParsedItem: the parsed record.
+    """
+    parser = ArxivParser(record, source=source)
+
+    return ParsedItem(
+        record=parser.parse(),
+        record_format='hep',
+    )
@@ -45,6 +45,9 @@ class CDSSpider(OAIPMHSpider):
         sets=None,
         from_date=None,
         until_date=None,
+        shards=None,
+        shard=None,
+        changed_only=False,
         **kwargs
     ):
         super(CDSSpider, self).__init__(
@@ -53,6 +56,9 @@ class CDSSpider(OAIPMHSpider):
             sets=sets,
             from_date=from_date,
             until_date=until_date,
+            shards=shards,
+            shard=shard,
+            changed_only=changed_only,
             **kwargs
         )
 
@@ -62,14 +68,18 @@ class CDSSpider(OAIPMHSpider):
 
     def parse_record(self, selector):
         """Parse a CDS MARCXML record into a HEP record."""
-        selector.remove_namespaces()
-        marcxml_record = _get_marcxml_record(selector)
-
-        return _parsed_item_from_marcxml(
-            marcxml_record=marcxml_record,
-            settings=self.settings
+        return parse_cds_record(
+            selector,
+            marc_to_hep_settings=self.settings.getdict('MARC_TO_HEP_SETTINGS', {}),
         )
 
+    def get_record_parser(self):
+        return parse_cds_record, {
+            'marc_to_hep_settings': self.settings.getdict(
+                'MARC_TO_HEP_SETTINGS', {},
+            ),
+        }
+
 
 class CDSSpiderSingle(OAIPMHSpider):
     """Spider for fetching a single record from CERN Document Server OAI-PMH.
@@ -78,6 +88,10 @@ class CDSSpiderSingle(OAIPMHSpider):
         Using OAI-PMH service::
 
             $ scrapy crawl CDS_single -a "identifier=oai:cds.cern.ch:123"
+
+        Fetching several records in one job::
+
+            $ scrapy crawl CDS_single -a "identifiers_file=/path/to/identifiers.txt"
     """
     name = 'CDS_single'
     source = 'CDS'
@@ -88,12 +102,14 @@ class CDSSpiderSingle(OAIPMHSpider):
         url='http://cds.cern.ch/oai2d',
         format='marcxml',
         identifier=None,
+        identifiers_file=None,
         **kwargs
     ):
         super(CDSSpiderSingle, self).__init__(
             url=url,
             format=format,
             identifier=identifier,
+            identifiers_file=identifiers_file,
             **kwargs
         )
 
@@ -103,27 +119,50 @@ class CDSSpiderSingle(OAIPMHSpider):
 
     def parse_record(self, selector):
         """Parse a CDS MARCXML record into a HEP record."""
-        selector.remove_namespaces()
-        marcxml_record = _get_marcxml_record(selector)
-
-        return _parsed_item_from_marcxml(
-            marcxml_record=marcxml_record,
-            settings=self.settings
+        return parse_cds_record(
+            selector,
+            marc_to_hep_settings=self.settings.getdict('MARC_TO_HEP_SETTINGS', {}),
         )
 
+    def get_record_parser(self):
+        return parse_cds_record, {
+            'marc_to_hep_settings': self.settings.getdict(
+                'MARC_TO_HEP_SETTINGS', {},
+            ),
+        }
+
 
 def _get_marcxml_record(root):
     return root.xpath('.//record').extract_first()
 
 
+def parse_cds_record(record, marc_to_hep_settings):
+    """Parse a CDS OAI-PMH record into a HEP record.
+
+    Args:
+        record (Union[str, scrapy.selector.Selector]): the OAI-PMH record.
+        marc_to_hep_settings (dict): configuration of the conversion.
+
+    Returns:
+        hepcrawl.utils.ParsedItem: the parsed record.
+    """
+    if not isinstance(record, Selector):
+        record = Selector(text=record, type='xml')
+    record.remove_namespaces()
+    marcxml_record = _get_marcxml_record(record)
+
+    return _parsed_item_from_marcxml(
+        marcxml_record=marcxml_record,
+        marc_to_hep_settings=marc_to_hep_settings,
+    )
+
+
 def _parsed_item_from_marcxml(
         marcxml_record,
-        settings
+        marc_to_hep_settings
 ):
     app = Flask('hepcrawl')
-    app.config.update(
-        settings.getdict('MARC_TO_HEP_SETTINGS', {})
-    )
+    app.config.update(marc_to_hep_settings)
 
     with app.app_context():
         try:
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Compact indexes of the identifiers of harvested records."""
+
+from __future__ import absolute_import, division, print_function
+
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import struct
+import tempfile
+from errno import EEXIST as FILE_EXISTS
+
+from six.moves import intern, range
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class IdentifierSet(object):
+    """Exact index of identifiers, kept in memory as interned strings."""
+
+    def __init__(self):
+        self._identifiers = set()
+
+    def __contains__(self, identifier):
+        return identifier in self._identifiers
+
+    def __len__(self):
+        return len(self._identifiers)
+
+    def add(self, identifier):
+        if isinstance(identifier, str):
+            identifier = intern(identifier)
+        self._identifiers.add(identifier)
+
+    def close(self):
+        self._identifiers.clear()
+
+
+class BloomFilterIndex(object):
+    """Probabilistic index of identifiers with a fixed memory footprint.
+
+    A Bloom filter never misses an identifier that was added, but can report
+    an identifier that was never added as present with a probability of
+    ``error_rate`` once ``capacity`` identifiers were added.
+
+    Args:
+        capacity (int): expected number of identifiers.
+        error_rate (float): acceptable false positive probability.
+        false_positives (str): how to handle identifiers found in the filter:
+
+            * ``skip``: consider them as duplicates, a record can then be
+              wrongly skipped with a probability of ``error_rate``.
+            * ``verify``: check them against an exact index stored on disk,
+              only the identifiers found in the filter are looked up.
+
+        path (str): file of the on-disk index when ``false_positives`` is
+            ``verify``, defaults to a temporary file removed on close.
+    """
+    FALSE_POSITIVES = ('skip', 'verify')
+
+    def __init__(self, capacity, error_rate, false_positives='verify', path=None):
+        if false_positives not in self.FALSE_POSITIVES:
+            raise ValueError(
+                'Unknown false positives handling {}, expected one of '
+                '{}.'.format(false_positives, ', '.join(self.FALSE_POSITIVES))
+            )
+        self.bits = int(math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        ))
+        self.hashes = max(1, int(round(self.bits / capacity * math.log(2))))
+        self._filter = bytearray((self.bits + 7) // 8)
+        self._count = 0
+        self.false_positives = false_positives
+        self._path = None
+        self._db = None
+        if false_positives == 'verify':
+            if path is None:
+                fd, path = tempfile.mkstemp(suffix='.sqlite')
+                os.close(fd)
+                self._path = path
+            self._db = sqlite3.connect(path)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS identifiers '
+                '(identifier TEXT PRIMARY KEY)'
+            )
+
+    def _positions(self, identifier):
+        digest = hashlib.sha1(identifier.encode('utf-8')).digest()
+        first, second = struct.unpack('<QQ', digest[:16])
+        for number in range(self.hashes):
+            yield (first + number * second) % self.bits
+
+    def _in_filter(self, identifier):
+        return all(
+            self._filter[position // 8] & (1 << position % 8)
+            for position in self._positions(identifier)
+        )
+
+    def __contains__(self, identifier):
+        if not self._in_filter(identifier):
+            return False
+        if self._db is None:
+            return True
+
+        found = self._db.execute(
+            'SELECT 1 FROM identifiers WHERE identifier = ?',
+            (identifier,),
+        ).fetchone()
+        if not found:
+            LOGGER.debug('Bloom filter false positive for %s', identifier)
+        return bool(found)
+
+    def __len__(self):
+        return self._count
+
+    def add(self, identifier):
+        for position in self._positions(identifier):
+            self._filter[position // 8] |= 1 << position % 8
+        self._count += 1
+        if self._db is not None:
+            self._db.execute(
+                'INSERT OR IGNORE INTO identifiers VALUES (?)',
+                (identifier,),
+            )
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._path is not None:
+            os.remove(self._path)
+            self._path = None
+
+
+def make_identifier_index(settings):
+    """Create the identifier index configured in the settings.
+
+    Settings:
+
+    * ``OAIPMH_IDENTIFIER_INDEX``: ``set`` for an exact in-memory index or
+      ``bloom`` for a :class:`BloomFilterIndex`.
+    * ``OAIPMH_IDENTIFIER_INDEX_CAPACITY``: expected number of records of the
+      Bloom filter.
+    * ``OAIPMH_IDENTIFIER_INDEX_ERROR_RATE``: false positive probability of
+      the Bloom filter.
+    * ``OAIPMH_IDENTIFIER_INDEX_FALSE_POSITIVES``: ``skip`` or ``verify``,
+      see :class:`BloomFilterIndex`.
+
+    Args:
+        settings (scrapy.settings.Settings): settings of the spider.
+
+    Returns:
+        the identifier index.
+    """
+    kind = settings.get('OAIPMH_IDENTIFIER_INDEX', 'set')
+    if kind == 'set':
+        return IdentifierSet()
+    if kind == 'bloom':
+        return BloomFilterIndex(
+            capacity=settings.getint(
+                'OAIPMH_IDENTIFIER_INDEX_CAPACITY',
+                5000000,
+            ),
+            error_rate=settings.getfloat(
+                'OAIPMH_IDENTIFIER_INDEX_ERROR_RATE',
+                0.001,
+            ),
+            false_positives=settings.get(
+                'OAIPMH_IDENTIFIER_INDEX_FALSE_POSITIVES',
+                'verify',
+            ),
+        )
+
+    raise ValueError('Unknown identifier index {}.'.format(kind))
+
+
+class DatestampIndex(object):
+    """Persistent index of the OAI datestamps of harvested records.
+
+    Args:
+        path (str): sqlite file storing the index, created if needed.
+        commit_every (int): number of updates written in one transaction,
+            the updates not committed yet are lost if the process crashes.
+    """
+
+    def __init__(self, path, commit_every=1000):
+        try:
+            os.makedirs(os.path.dirname(path))
+        except OSError as exc:
+            if exc.errno != FILE_EXISTS:
+                raise
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS datestamps '
+            '(identifier TEXT PRIMARY KEY, datestamp TEXT)'
+        )
+        self.commit_every = commit_every
+        self._uncommitted = 0
+
+    def get(self, identifier):
+        row = self._db.execute(
+            'SELECT datestamp FROM datestamps WHERE identifier = ?',
+            (identifier,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM datestamps').fetchone()[0]
+
+    def changed(self, identifier, datestamp):
+        """Whether a record is new or its datestamp changed."""
+        return self.get(identifier) != datestamp
+
+    def __setitem__(self, identifier, datestamp):
+        self._db.execute(
+            'INSERT OR REPLACE INTO datestamps VALUES (?, ?)',
+            (identifier, datestamp),
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self._db.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
@@ -63,6 +63,22 @@ class LastRunStoreSpider(StatefulSpider):
         file_name = hashlib.sha1(self.make_file_fingerprint(set_).encode('utf-8')).hexdigest() + '.json'
         return path.join(lasts_run_path, self.name, file_name)
 
+    def _checkpoint_file_path(self, set_, name='checkpoint'):
+        """Render a path to a file where the harvest progress is stored.
+
+        The checkpoint lives next to the last run file of the same set.
+
+        Args:
+            set_ (string): OAI set being harvested
+            name (string): name of the checkpoint, for sets whose progress
+                is stored in several files
+
+        Returns:
+            string: path to the checkpoint file
+        """
+        last_run_file_path = self._last_run_file_path(set_)
+        return u'{}.{}.json'.format(path.splitext(last_run_file_path)[0], name)
+
     def _load_last_run(self, set_):
         """Return stored last run information
 
@@ -86,12 +102,13 @@ class LastRunStoreSpider(StatefulSpider):
                 raise NoLastRunToLoad(file_path, set_)
             raise
 
-    def save_run(self, started_at, set_):
+    def save_run(self, started_at, set_, last_datestamp=None):
         """Store last run information
 
         Args:
             started_at (datetime.datetime)
             set_ (string): set being harvested
+            last_datestamp (string): latest datestamp of the harvested records
 
         Raises:
             IOError: if writing the file is unsuccessful
@@ -105,6 +122,7 @@ class LastRunStoreSpider(StatefulSpider):
             'format': self.format,
             'last_run_started_at': started_at.isoformat(),
             'last_run_finished_at': datetime.utcnow().isoformat(),
+            'last_record_datestamp': last_datestamp,
         }
         file_path = self._last_run_file_path(set_)
         LOGGER.info("Last run file saved to {}".format(file_path))
@@ -116,11 +134,41 @@ class LastRunStoreSpider(StatefulSpider):
         with open(file_path, 'w') as f:
             json.dump(last_run_info, f, indent=4)
 
-    def resume_from(self, set_):
+    def last_record_datestamp(self, set_):
+        """Return the latest datestamp of the records of the last run
+
+        Args:
+            set_ (string): set to load the last run information for
+
+        Returns:
+            string: the datestamp or None if unknown
+        """
+        try:
+            return self._load_last_run(set_).get('last_record_datestamp')
+        except NoLastRunToLoad:
+            return None
+
+    def resume_from(self, set_, precise=False):
+        """Return the date to resume the harvest of a set from
+
+        Args:
+            set_ (string): set being harvested
+            precise (bool): resume from the latest datestamp of the records
+                of the last run, if it is finer than a day. Otherwise the
+                harvest resumes from the day the last run ended.
+
+        Returns:
+            string: the date or None if the set was never harvested
+        """
         try:
             last_run = self._load_last_run(set_)
-            resume_at = last_run['until_date'] or last_run['last_run_finished_at']
-            date_parsed = dateparser.parse(resume_at)
-            return date_parsed.strftime('%Y-%m-%d')
         except NoLastRunToLoad:
             return None
+
+        last_datestamp = last_run.get('last_record_datestamp')
+        if precise and last_datestamp and 'T' in last_datestamp:
+            return last_datestamp
+
+        resume_at = last_run['until_date'] or last_run['last_run_finished_at']
+        date_parsed = dateparser.parse(resume_at)
+        return date_parsed.strftime('%Y-%m-%d')
@@ -10,22 +10,54 @@
 """Generic spider for OAI-PMH servers."""
 
 import abc
+import hashlib
+import json
 import logging
+import os
+import sys
+from collections import deque
 from datetime import datetime
-from six import string_types
+from errno import EEXIST as FILE_EXISTS, ENOENT as NO_SUCH_FILE_OR_DIR
+from six import reraise, string_types
 
-from sickle import Sickle
-from sickle.oaiexceptions import NoRecordsMatch
+from lxml import etree
+from six.moves.urllib.parse import urlencode
+from sickle import oaiexceptions
+from sickle.models import Header, OAIItem, Record
+from sickle.oaiexceptions import (
+    BadResumptionToken,
+    IdDoesNotExist,
+    NoRecordsMatch,
+)
 
-from scrapy.http import Request, XmlResponse
+from scrapy import signals
+from scrapy.http import Request
+from scrapy.item import BaseItem
 from scrapy.selector import Selector
+from scrapy.utils.misc import arg_to_iter
+from twisted.internet import defer
+from twisted.python.failure import Failure
 
+from .identifier_index import DatestampIndex, make_identifier_index
 from .lastrunstore_spider import LastRunStoreSpider
+from ...dateutils import split_date_range
+from ...executors import ParsingExecutor, gather_results
+from ...signals import results_checkpoint
 from ...utils import strict_kwargs
 
 
 LOGGER = logging.getLogger(__name__)
 
+OAI_NAMESPACE = '{http://www.openarchives.org/OAI/2.0/}'
+
+SECONDS_GRANULARITY = 'YYYY-MM-DDThh:mm:ssZ'
+
+OAI_XML_PARSER = etree.XMLParser(
+    remove_blank_text=True,
+    recover=True,
+    resolve_entities=False,
+)
+
 
 class NoLastRunToLoad(Exception):
     """Error raised when there was a problem with loading the last_runs file"""
@@ -36,14 +68,100 @@ class NoLastRunToLoad(Exception):
         )
 
 
+class OAIRecord(Record):
+    """A sickle record that converts its metadata to a dictionary only when
+    it is accessed.
+
+    Args:
+        record_element (lxml.etree._Element): the ``record`` element.
+        strip_ns (bool): whether to remove the namespaces from the element
+            names of the metadata dictionary.
+    """
+    def __init__(self, record_element, strip_ns=True):
+        OAIItem.__init__(self, record_element, strip_ns=strip_ns)
+        self.header = Header(
+            self.xml.find('.//' + self._oai_namespace + 'header')
+        )
+        self.deleted = self.header.deleted
+        self._metadata = None
+
+    @property
+    def metadata(self):
+        if self._metadata is None and not self.deleted:
+            self._metadata = self.get_metadata()
+        return self._metadata
+
+
 class OAIPMHSpider(LastRunStoreSpider):
     """
     Implements a spider for the OAI-PMH protocol by using the Python sickle
     library.
 
     In case of successful harvest (OAI-PMH crawling) the spider will remember
-    the initial starting date and will use it as `from_date` argument on the
-    next harvest.
+    the latest datestamp of the harvested records and will use it as
+    `from_date` argument on the next harvest, if the server supports
+    datestamps with a granularity of seconds (see the ``Identify`` verb).
+    Otherwise the next harvest starts from the day the previous one ended.
+
+    The records are handed to :meth:`parse_record` as selectors on the
+    elements of the parsed OAI-PMH response, they are not serialized and
+    parsed again.
+
+    The OAI-PMH verbs are issued as regular Scrapy requests on the
+    ``oaipmh+http`` scheme (see
+    :class:`hepcrawl.downloaders.OAIPMHDownloadHandler`), so harvesting does
+    not block the reactor.
+
+    Sets are harvested one page at a time: the records of a page are handed
+    to the pipelines and the resumption token is fed back as a follow-up
+    request for the next page. The token of the next page is stored in a
+    checkpoint file next to the last run file. If the harvest of a set is
+    interrupted, the next harvest of the same set with the same parameters
+    resumes from that checkpoint.
+
+    The next page of a set is requested while the records of the current page
+    are parsed, up to ``OAIPMH_PREFETCH_PAGES`` pages ahead of the oldest page
+    being parsed. The checkpoint only moves past a page once it and all the
+    pages before it are parsed and their records went through the pipelines,
+    which are then asked to push the results they hold (see
+    :data:`hepcrawl.signals.results_checkpoint`). The ``completeListSize`` and
+    ``cursor`` of
+    the resumption tokens are exposed in the ``oaipmh/complete_list_size/*``
+    and ``oaipmh/cursor/*`` stats.
+
+    All sets are harvested concurrently, the number of OAI-PMH requests in
+    flight at the same time is limited by the ``OAIPMH_CONCURRENT_REQUESTS``
+    setting. The last run of every set is saved as soon as all of its
+    requests succeeded and their records went through the pipelines,
+    independently of the other sets.
+
+    Large backfills can be sharded with the ``shards`` argument: the
+    ``from_date``..``until_date`` range of every set is split in as many
+    date windows, harvested concurrently as separate harvests with their own
+    checkpoints. Passing ``shard`` as well harvests only the window with this
+    index, so that the windows can be harvested by separate jobs. These jobs
+    must compute the same windows, ``until_date`` is therefore required with
+    ``shard`` instead of defaulting to the day the job runs. A marker file is
+    stored for every harvested window and the last run of the set is only
+    saved once all of its windows are harvested.
+
+    Records can also be fetched by identifier with ``GetRecord``: the
+    ``identifier`` argument takes one identifier or a comma separated list of
+    them, and ``identifiers_file`` a file with one identifier per line. The
+    records are fetched concurrently, with the same
+    ``OAIPMH_CONCURRENT_REQUESTS`` limit.
+
+    With ``changed_only``, sets are listed with ``ListIdentifiers`` and only
+    the records that are new or whose datestamp changed since they were last
+    harvested are fetched with ``GetRecord``, the deleted records are
+    skipped. The datestamps of the records harvested in this mode, or in any
+    mode with the ``OAIPMH_DATESTAMPS_INDEX`` setting, are kept in a sqlite
+    index next to the last run files. They are only stored once the records
+    are parsed without errors and went through the pipelines, the other
+    records are fetched again by the next harvest. As long as this index is
+    empty, e.g. on the first run, the sets are harvested with ``ListRecords``
+    instead of one ``GetRecord`` per record. As listing identifiers is cheap,
+    no checkpoint is stored in this mode.
     """
     __metaclass__ = abc.ABCMeta
     name = 'OAI-PMH'
@@ -57,26 +175,148 @@ class OAIPMHSpider(LastRunStoreSpider):
         identifier=None,
         from_date=None,
         until_date=None,
+        shards=None,
+        shard=None,
+        changed_only=False,
+        identifiers_file=None,
         **kwargs
     ):
         super(OAIPMHSpider, self).__init__(**kwargs)
         self.url = url
         self.format = format
-        self.identifier = identifier
+        self.identifiers = self._get_identifiers(identifier, identifiers_file)
         if isinstance(sets, string_types):
             sets = sets.split(',')
         self.sets = sets
         self.from_date = from_date
         self.until_date = until_date
-        self._crawled_records = {}
+        self.shards = int(shards) if shards else None
+        self.shard = int(shard) if shard is not None else None
+        if self.shard is not None and not until_date:
+            raise ValueError(
+                'The until_date argument is required with shard, so that '
+                'the jobs harvesting the other shards get the same windows.'
+            )
+        self.changed_only = str(changed_only).lower() in ('1', 'true', 'yes')
+        # still set if the first harvest lists the records instead
+        self._changed_only_requested = self.changed_only
+        self.granularity = None
+        self._identifier_index = None
+        self._datestamp_index = None
+        self._parsing_executor = None
+        self._harvests = {}
+        self._queued_requests = deque()
+        self._active_requests = 0
+        self._push_failed = False
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(OAIPMHSpider, cls).from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(
+            spider.request_dropped,
+            signal=signals.request_dropped,
+        )
+        crawler.signals.connect(
+            spider.item_delivered,
+            signal=signals.item_scraped,
+        )
+        crawler.signals.connect(
+            spider.item_delivered,
+            signal=signals.item_dropped,
+        )
+        crawler.signals.connect(
+            spider.item_failed,
+            signal=signals.item_error,
+        )
+        return spider
+
+    @property
+    def _crawled_records(self):
+        """Index of the identifiers of the records harvested so far, used to
+        skip records repeated across sets (see
+        :func:`hepcrawl.spiders.common.identifier_index.make_identifier_index`).
+        """
+        if self._identifier_index is None:
+            self._identifier_index = make_identifier_index(self.settings)
+        return self._identifier_index
+
+    @property
+    def _datestamps(self):
+        """Persistent index of the datestamps of the harvested records, used
+        to find the changed records in ``changed_only`` mode."""
+        if self._datestamp_index is None:
+            file_name = hashlib.sha1(
+                u'{}?metadataPrefix={}'.format(self.url, self.format)
+                .encode('utf-8')
+            ).hexdigest() + '.datestamps.sqlite'
+            self._datestamp_index = DatestampIndex(os.path.join(
+                self.settings['LAST_RUNS_PATH'],
+                self.name,
+                file_name,
+            ))
+        return self._datestamp_index
+
+    @property
+    def _keeps_datestamps(self):
+        return (
+            self._changed_only_requested or
+            self.settings.getbool('OAIPMH_DATESTAMPS_INDEX', False)
+        )
+
+    @property
+    def parsing_executor(self):
+        """Pool of processes parsing the records, with the
+        ``PARSING_PROCESSES`` setting (see :meth:`get_record_parser`)."""
+        if self._parsing_executor is None:
+            crawler = getattr(self, 'crawler', None)
+            if crawler is None:
+                self._parsing_executor = ParsingExecutor()
+            else:
+                self._parsing_executor = ParsingExecutor.from_crawler(crawler)
+        return self._parsing_executor
+
+    @staticmethod
+    def _get_identifiers(identifier=None, identifiers_file=None):
+        """Collect the identifiers of the records to fetch.
+
+        Args:
+            identifier (Union[str, list]): an identifier, a comma separated
+                list of identifiers or a list of identifiers.
+            identifiers_file (str): path to a file with one identifier per
+                line, blank lines are ignored.
+
+        Returns:
+            list: the identifiers, without repetitions.
+        """
+        if isinstance(identifier, string_types):
+            identifier = identifier.split(',')
+        identifiers = list(identifier or [])
+        if identifiers_file:
+            with open(identifiers_file) as f:
+                identifiers.extend(f)
+
+        unique_identifiers = []
+        seen = set()
+        for identifier in identifiers:
+            identifier = identifier.strip()
+            if identifier and identifier not in seen:
+                seen.add(identifier)
+                unique_identifiers.append(identifier)
+        return unique_identifiers
 
     def start_requests(self):
-        if self.identifier:
+        if self.identifiers:
             return self.start_requests_single(
                 self.url,
                 self.format,
-                self.identifier,
+                self.identifiers,
+            )
+        if self.changed_only and not self._datestamps:
+            LOGGER.info(
+                'No datestamps of harvested records yet, listing the records '
+                'instead of their identifiers.'
             )
+            self.changed_only = False
         return self.start_requests_sets(
             self.url,
             self.format,
@@ -85,18 +325,40 @@ class OAIPMHSpider(LastRunStoreSpider):
             self.until_date,
         )
 
-    def start_requests_single(self, url, format, identifier):
+    def start_requests_single(self, url, format, identifiers):
+        if isinstance(identifiers, string_types):
+            identifiers = [identifiers]
+
         LOGGER.info(
-            u"Starting harvesting of single record {} at {} with "
-            u"metadataPrefix={}.".format(identifier, url, format)
+            u"Starting harvesting of {} single records at {} with "
+            u"metadataPrefix={}.".format(len(identifiers), url, format)
         )
 
-        request = Request('oaipmh+%s' % url, self.parse)
-        request.meta['identifier'] = identifier
-        yield request
+        for identifier in identifiers:
+            self._start_harvest(identifier)
+            request = self._oai_request(
+                url,
+                {
+                    'verb': 'GetRecord',
+                    'metadataPrefix': format,
+                    'identifier': identifier,
+                },
+            )
+            request.meta['harvest'] = identifier
+            request.meta['identifier'] = identifier
+            for request in self._schedule(request):
+                yield request
 
     def start_requests_sets(self, url, format, sets=None, from_date=None, until_date=None):
         started_at = datetime.utcnow()
+        start_sets = {
+            'url': url,
+            'format': format,
+            'sets': sets,
+            'from_date': from_date,
+            'until_date': until_date,
+            'started_at': started_at,
+        }
 
         LOGGER.info(
             u"Starting harvesting of {url} with sets={sets} and "
@@ -118,37 +380,550 @@ class OAIPMHSpider(LastRunStoreSpider):
             )
             return
 
+        if not from_date and any(
+            self._has_precise_last_run(oai_set) for oai_set in sets
+        ):
+            request = Request(
+                u'oaipmh+{}?verb=Identify'.format(url),
+                callback=self.parse_identify,
+                errback=self.identify_failed,
+            )
+            request.meta['crawl_once'] = False
+            request.meta['start_sets'] = start_sets
+            yield request
+            return
+
+        for request in self._start_sets(**start_sets):
+            yield request
+
+    def _has_precise_last_run(self, set_):
+        return 'T' in (self.last_record_datestamp(set_) or '')
+
+    def parse_identify(self, response):
+        """Get the datestamp granularity of the server before resuming the
+        harvest of the sets."""
+        try:
+            root = self._get_oai_root(response)
+        except (etree.XMLSyntaxError, oaiexceptions.OAIError) as err:
+            LOGGER.warning(
+                'Cannot get the granularity, resuming from the last day: %s',
+                err,
+            )
+        else:
+            self.granularity = root.findtext(
+                './/' + OAI_NAMESPACE + 'granularity'
+            )
+            LOGGER.info('Datestamp granularity is %s', self.granularity)
+
+        return self._start_sets(**response.meta['start_sets'])
+
+    def identify_failed(self, failure):
+        LOGGER.warning(
+            'Identify failed, resuming from the last day: %s',
+            failure.value,
+        )
+        return self._start_sets(**failure.request.meta['start_sets'])
+
+    def _start_sets(self, url, format, sets, from_date, until_date, started_at):
         for oai_set in sets:
-            from_date = from_date or self.resume_from(set_=oai_set)
+            set_from_date = from_date or self.resume_from(
+                set_=oai_set,
+                precise=self.granularity == SECONDS_GRANULARITY,
+            )
 
             LOGGER.info(
                 u"Starting harvesting of set={oai_set} from "
                 "{from_date}".format(
                     oai_set=oai_set,
-                    from_date=from_date,
+                    from_date=set_from_date,
+                )
+            )
+
+            set_until_date = until_date
+            if (
+                set_from_date and 'T' in set_from_date and
+                until_date and 'T' not in until_date
+            ):
+                # both dates must have the same granularity
+                set_until_date = until_date + 'T23:59:59Z'
+            params = {
+                'metadataPrefix': format,
+                'set': oai_set,
+                'from': set_from_date,
+                'until': set_until_date,
+            }
+            windows = self._harvest_windows(set_from_date, until_date)
+            for index, window in enumerate(windows or [None]):
+                if self.shard is not None and index != self.shard:
+                    continue
+                if window and self._window_harvested(oai_set, window):
+                    LOGGER.info(
+                        'Skipping already harvested window %s of set %s.',
+                        window,
+                        oai_set,
+                    )
+                    continue
+
+                if window:
+                    window_params = dict(params)
+                    window_params['from'], window_params['until'] = window
+                else:
+                    window_params = params
+                self._start_harvest(
+                    self._harvest_key(oai_set, window),
+                    set_=oai_set,
+                    started_at=started_at,
+                    window=window,
+                    windows=windows,
+                )
+                request = self._resumed_list_request(
+                    params=window_params,
+                    set_=oai_set,
+                    window=window,
                 )
+                for request in self._schedule(request):
+                    yield request
+
+            if windows and all(
+                self._window_harvested(oai_set, window) for window in windows
+            ):
+                self._windows_completed(oai_set, windows, started_at)
+
+    def _harvest_windows(self, from_date, until_date):
+        """Split the harvest of a set in date windows.
+
+        Args:
+            from_date (str): start of the harvest.
+            until_date (str): end of the harvest, defaults to today.
+
+        Returns:
+            list: the ``(from_date, until_date)`` windows to harvest, or
+                None if the harvest is not sharded.
+        """
+        if not self.shards:
+            return None
+        if not from_date:
+            LOGGER.warning(
+                'Cannot shard a harvest without from date, harvesting the '
+                'whole set at once.'
+            )
+            return None
+
+        until_date = until_date or datetime.utcnow().strftime('%Y-%m-%d')
+        return split_date_range(from_date, until_date, self.shards)
+
+    @staticmethod
+    def _harvest_key(set_, window=None):
+        if not window:
+            return set_
+        return u'{} {}..{}'.format(set_, *window)
+
+    def _oai_request(self, url, params):
+        """Create a request for an OAI-PMH verb.
+
+        Args:
+            url (str): url of the OAI-PMH endpoint.
+            params (dict): OAI-PMH arguments, ``None`` values are left out.
+
+        Returns:
+            scrapy.http.Request: the request, to be downloaded by
+                :class:`hepcrawl.downloaders.OAIPMHDownloadHandler`.
+        """
+        query = urlencode(sorted(
+            (key, value) for key, value in params.items() if value is not None
+        ))
+        request = Request(
+            'oaipmh+%s?%s' % (url, query),
+            callback=self.parse,
+            errback=self.harvest_failed,
+            # the slot of the request is only freed once it is answered,
+            # it must not be dropped as a duplicate
+            dont_filter=True,
+        )
+        request.meta['crawl_once'] = False
+        return request
+
+    def _start_harvest(
+        self,
+        key,
+        set_=None,
+        started_at=None,
+        window=None,
+        windows=None,
+    ):
+        """Register a harvest, i.e. a group of requests that has to succeed
+        as a whole.
+
+        Args:
+            key (str): key of the harvest, stored as ``harvest`` in the meta of
+                its requests.
+            set_ (str): set harvested, its last run is saved once all the
+                requests of the harvest succeeded.
+            started_at (datetime.datetime): start of the harvest.
+            window (tuple): ``(from_date, until_date)`` harvested, if the
+                harvest of the set is sharded.
+            windows (list): all the windows of the set, its last run is saved
+                once all of them are harvested.
+        """
+        self._harvests[key] = {
+            'set': set_,
+            'started_at': started_at,
+            'last_datestamp': None,
+            'window': window,
+            'windows': windows,
+            'pending': 0,
+            'failed': False,
+            'parsing_pages': set(),
+            'parsed_pages': {},
+            'checkpoint_page': None,
+        }
+
+    def _schedule(self, request):
+        """Send an OAI-PMH request, or queue it if too many are in flight.
+
+        Args:
+            request (scrapy.http.Request): request of a registered harvest.
+
+        Returns:
+            list: the requests that can be sent right away.
+        """
+        self._harvests[request.meta['harvest']]['pending'] += 1
+        self._queued_requests.append(request)
+        return self._dequeue_requests()
+
+    def _dequeue_requests(self):
+        concurrent_requests = self.settings.getint(
+            'OAIPMH_CONCURRENT_REQUESTS',
+            4,
+        )
+        requests = []
+        while (
+            self._queued_requests and
+            self._active_requests < concurrent_requests
+        ):
+            self._active_requests += 1
+            requests.append(self._queued_requests.popleft())
+        return requests
+
+    def request_dropped(self, request, spider):
+        """Free the slot of an OAI-PMH request dropped by the scheduler, the
+        harvest of the request won't save its last run."""
+        key = request.meta.get('harvest')
+        if spider is not self or key not in self._harvests:
+            return
+
+        LOGGER.warning('Request %s of harvest %s dropped.', request, key)
+        self._active_requests -= 1
+        self._harvests[key]['failed'] = True
+        for next_request in self._end_harvest_request(key):
+            self._crawl(next_request)
+
+    def _follow_harvest(self, meta, results):
+        """Keep track of the requests of a harvest.
+
+        Frees the slot of the request that got an answer, schedules the
+        follow-up requests and completes the harvest when its last request
+        got processed.
+
+        Args:
+            meta (dict): meta of the request that got an answer.
+            results (iterable): output of the callback.
+
+        Yields:
+            the output of the callback and the requests that can be sent.
+        """
+        self._active_requests -= 1
+        harvest = self._harvests[meta['harvest']]
+        try:
+            for result in arg_to_iter(results):
+                if isinstance(result, Request) and 'harvest' in result.meta:
+                    for request in self._schedule(result):
+                        yield request
+                else:
+                    self._expect_delivery(meta, result)
+                    yield result
+        except Exception:
+            exc_info = sys.exc_info()
+            harvest['failed'] = True
+            for request in self._end_harvest_request(meta['harvest']):
+                yield request
+            reraise(*exc_info)
+
+        deliveries = self._deliveries(meta)
+        if deliveries['pending']:
+            # the harvest can only complete once the records went through
+            # the pipelines
+            self._when_delivered(meta).addCallback(
+                self._outputs_delivered,
+                meta['harvest'],
             )
+            return
 
-            request = Request('oaipmh+%s' % url, self.parse)
-            request.meta['set'] = oai_set
-            request.meta['from_date'] = from_date
+        if deliveries['failed']:
+            harvest['failed'] = True
+        for request in self._end_harvest_request(meta['harvest']):
             yield request
 
-            now = datetime.utcnow()
-            self.save_run(started_at=started_at, set_=oai_set)
+    def _outputs_delivered(self, delivered, key):
+        if not delivered:
+            self._harvests[key]['failed'] = True
+        for request in self._end_harvest_request(key):
+            self._crawl(request)
 
-            LOGGER.info(
-                "Harvesting of set %s completed. Next time will resume from %s"
-                % (
+    @property
+    def _tracks_deliveries(self):
+        """Whether the items go through the pipelines of a running crawl,
+        which report them with the ``item_*`` signals. Otherwise, e.g. when
+        the callbacks are called directly, the items count as delivered as
+        soon as they are output."""
+        crawler = getattr(self, 'crawler', None)
+        return getattr(crawler, 'engine', None) is not None
+
+    @staticmethod
+    def _deliveries(meta):
+        return meta.setdefault(
+            'deliveries',
+            {'pending': 0, 'failed': False, 'waiting': []},
+        )
+
+    def _expect_delivery(self, meta, output):
+        """Count an output of the callback of a request that has to go
+        through the pipelines before the progress of its harvest is saved.
+
+        Args:
+            meta (dict): meta of the request.
+            output: item, or deferred firing with it, output by the callback.
+        """
+        deliveries = self._deliveries(meta)
+        if isinstance(output, defer.Deferred):
+            deliveries['pending'] += 1
+            output.addCallback(self._output_parsed, meta)
+        elif self._tracks_deliveries and isinstance(output, (BaseItem, dict)):
+            deliveries['pending'] += 1
+
+    def _output_parsed(self, output, meta):
+        if not (self._tracks_deliveries and isinstance(output, (BaseItem, dict))):
+            self._delivered(meta)
+        return output
+
+    def _when_delivered(self, meta):
+        """Wait for the outputs of a callback to go through the pipelines.
+
+        The deferreds fire in the order they were requested.
+
+        Args:
+            meta (dict): meta of the request of the callback.
+
+        Returns:
+            twisted.internet.defer.Deferred: a deferred firing with False if
+                a pipeline failed on one of the outputs, True otherwise.
+        """
+        deliveries = self._deliveries(meta)
+        if not deliveries['pending']:
+            return defer.succeed(not deliveries['failed'])
+
+        deferred = defer.Deferred()
+        deliveries['waiting'].append(deferred)
+        return deferred
+
+    def _delivered(self, meta):
+        deliveries = meta['deliveries']
+        deliveries['pending'] -= 1
+        if deliveries['pending']:
+            return
+
+        waiting, deliveries['waiting'] = deliveries['waiting'], []
+        for deferred in waiting:
+            deferred.callback(not deliveries['failed'])
+
+    def item_delivered(self, item, response, spider):
+        """Count an item that went through the pipelines, or got dropped by
+        one of them."""
+        if spider is self and 'deliveries' in response.meta:
+            self._delivered(response.meta)
+
+    def item_failed(self, item, response, spider, failure):
+        """Count an item a pipeline failed on, its harvest won't save its
+        progress."""
+        if spider is self and 'deliveries' in response.meta:
+            response.meta['deliveries']['failed'] = True
+            self._delivered(response.meta)
+
+    def _push_results(self):
+        """Ask the pipelines to push the results they hold, before saving
+        the progress of a harvest.
+
+        Once a push failed, the results it held are lost for all the
+        harvests, none of them saves its progress anymore.
+
+        Returns:
+            bool: whether the pipelines pushed all the results so far.
+        """
+        crawler = getattr(self, 'crawler', None)
+        if crawler is None or self._push_failed:
+            return not self._push_failed
+
+        responses = crawler.signals.send_catch_log(
+            results_checkpoint,
+            spider=self,
+        )
+        self._push_failed = any(
+            isinstance(response, Failure) for _, response in responses
+        )
+        return not self._push_failed
+
+    def _end_harvest_request(self, key):
+        harvest = self._harvests[key]
+        harvest['pending'] -= 1
+        if harvest['pending'] == 0:
+            del self._harvests[key]
+            if harvest['set'] and not harvest['failed']:
+                self._harvest_completed(harvest)
+            elif harvest['failed']:
+                LOGGER.warning(
+                    'Harvesting of %s failed, last run not saved.',
+                    key,
+                )
+
+        return self._dequeue_requests()
+
+    def _harvest_completed(self, harvest):
+        oai_set = harvest['set']
+        if not self._push_results():
+            LOGGER.warning(
+                'Results of set %s not pushed, last run not saved.',
+                oai_set,
+            )
+            return
+
+        window = harvest['window']
+        if window:
+            self._save_window_harvested(
+                oai_set,
+                window,
+                harvest['last_datestamp'],
+            )
+            if not all(
+                self._window_harvested(oai_set, other_window)
+                for other_window in harvest['windows']
+            ):
+                LOGGER.info(
+                    'Harvesting of window %s of set %s completed, waiting '
+                    'for the other windows.',
+                    window,
                     oai_set,
-                    until_date or now.strftime('%Y-%m-%d')
                 )
+                return
+            self._windows_completed(
+                oai_set,
+                harvest['windows'],
+                harvest['started_at'],
             )
+            return
+
+        self._set_completed(
+            oai_set,
+            harvest['started_at'],
+            harvest['last_datestamp'],
+        )
 
+    def _windows_completed(self, set_, windows, started_at):
+        last_datestamps = [
+            self._load_window_marker(set_, window).get('last_datestamp')
+            for window in windows
+        ]
+        self._set_completed(
+            set_,
+            started_at,
+            max(last_datestamps, key=lambda datestamp: datestamp or ''),
+        )
+        for window in windows:
+            self._clear_checkpoint(set_, name=self._window_marker_name(window))
+
+    def _set_completed(self, set_, started_at, last_datestamp=None):
+        self.save_run(
+            started_at=started_at,
+            set_=set_,
+            last_datestamp=last_datestamp,
+        )
         LOGGER.info(
-            "Harvesting completed, harvested %s records.",
-            len(self._crawled_records),
+            "Harvesting of set %s completed. Next time will resume from %s"
+            % (
+                set_,
+                self.resume_from(
+                    set_,
+                    precise=self.granularity == SECONDS_GRANULARITY,
+                ),
+            )
+        )
+
+    def _list_request(
+        self,
+        params,
+        set_,
+        resumption_token=None,
+        page=0,
+        window=None,
+    ):
+        """Create a request for a ``ListRecords`` page of a set, or a
+        ``ListIdentifiers`` page in ``changed_only`` mode.
+
+        Args:
+            params (dict): ``ListRecords`` arguments of the harvest.
+            set_ (str): set being harvested.
+            resumption_token (str): if given, the request continues the
+                harvest from this resumption token.
+            page (int): number of pages of the set already harvested.
+            window (tuple): date window harvested, if the harvest is sharded.
+
+        Returns:
+            scrapy.http.Request: the request.
+        """
+        verb = 'ListIdentifiers' if self.changed_only else 'ListRecords'
+        if resumption_token:
+            verb_params = {
+                'verb': verb,
+                'resumptionToken': resumption_token,
+            }
+        else:
+            verb_params = dict(params, verb=verb)
+
+        request = self._oai_request(self.url, verb_params)
+        request.meta['harvest'] = self._harvest_key(set_, window)
+        request.meta['set'] = set_
+        request.meta['window'] = window
+        request.meta['params'] = params
+        request.meta['page'] = page
+        request.meta['resumed'] = False
+        return request
+
+    def _resumed_list_request(self, params, set_, window=None):
+        """Create the first ``ListRecords`` request of a set.
+
+        If a checkpoint was stored for the same set and parameters, the
+        request resumes the harvest from it.
+        """
+        if self.changed_only:
+            return self._list_request(params, set_, window=window)
+
+        checkpoint = self._load_checkpoint(set_, params, window=window)
+        if not checkpoint:
+            return self._list_request(params, set_, window=window)
+
+        LOGGER.info(
+            'Resuming harvest for params %s from page %s',
+            params,
+            checkpoint['page'] + 1,
         )
+        request = self._list_request(
+            params,
+            set_,
+            resumption_token=checkpoint['resumption_token'],
+            page=checkpoint['page'],
+            window=window,
+        )
+        request.meta['resumed'] = True
+        return request
 
     @abc.abstractmethod
     def parse_record(self, record):
@@ -161,6 +936,20 @@ class OAIPMHSpider(LastRunStoreSpider):
         """
         raise NotImplementedError()
 
+    def get_record_parser(self):
+        """
+        This method can be reimplemented to parse the records in the
+        processes of :attr:`parsing_executor`.
+
+        Returns:
+            Optional[Tuple[function, dict]]: a module level function parsing
+                the record, as a string, into a
+                :class:`hepcrawl.utils.ParsedItem`, and its other arguments.
+                With ``None``, the records are parsed with
+                :meth:`parse_record`.
+        """
+        return None
+
     @abc.abstractmethod
     def get_record_identifier(self, record):
         """
@@ -173,65 +962,564 @@ class OAIPMHSpider(LastRunStoreSpider):
         raise NotImplementedError()
 
     def parse(self, response):
-        if response.meta.get('identifier'):
-            return self.parse_single(response)
-        return self.parse_list(response)
+        if response.meta.get('datestamp'):
+            results = self.parse_changed_record(response)
+        elif response.meta.get('identifier'):
+            results = self.parse_single(response)
+        else:
+            results = self.parse_list(response)
+        results = self._follow_harvest(response.meta, results)
+        if self.parsing_executor:
+            return gather_results(results, crawl=self._crawl)
+        return results
+
+    def _crawl(self, request):
+        """Schedule an OAI-PMH request outside of the output of a callback,
+        it skips the ``process_spider_output`` of the spider middlewares (see
+        :func:`hepcrawl.executors.gather_results`)."""
+        self.crawler.engine.crawl(request, self)
+
+    def harvest_failed(self, failure):
+        """Errback of the OAI-PMH requests, the harvest of the failed request
+        won't save its last run."""
+        def reraise_failure():
+            failure.raiseException()
+            yield
+
+        return self._follow_harvest(failure.request.meta, reraise_failure())
 
     def parse_single(self, response):
-        sickle = Sickle(self.url)
-        params = {
-            'metadataPrefix': self.format,
-            'identifier': response.meta['identifier'],
-        }
-        record = sickle.GetRecord(**params)
-        self._crawled_records[params['identifier']] = record
-        response = XmlResponse(self.url, encoding='utf-8', body=record.raw)
-        selector = Selector(response, type='xml')
-        return self.parse_record(selector)
+        root = self._get_oai_root(response)
+        record = OAIRecord(root.find('.//' + OAI_NAMESPACE + 'record'))
+        self._crawled_records.add(response.meta['identifier'])
+        return self.parse_record(Selector(root=record.xml, type='xml'))
 
     def parse_list(self, response):
-        sickle = Sickle(self.url)
-        params = {
-            'metadataPrefix': self.format,
-            'set': response.meta['set'],
-            'from': response.meta['from_date'],
-            'until': self.until_date,
-        }
+        oai_set = response.meta['set']
+        window = response.meta.get('window')
+        params = response.meta['params']
         try:
-            records = sickle.ListRecords(**params)
+            root = self._get_oai_root(response)
         except NoRecordsMatch as err:
             LOGGER.warning(err)
-            raise StopIteration()
+            root = None
+        except BadResumptionToken as err:
+            if not response.meta['resumed']:
+                raise
+            LOGGER.warning(
+                'Cannot resume harvest for params %s, restarting: %s',
+                params,
+                err,
+            )
+            self._clear_checkpoint(oai_set, window=window)
+            harvest = self._harvests[response.meta['harvest']]
+            harvest['parsed_pages'].clear()
+            harvest['checkpoint_page'] = None
+            yield self._list_request(
+                params=params,
+                set_=oai_set,
+                window=window,
+            )
+            return
 
-        # Avoid timing out the resumption token
-        # TODO: implemente a storage-based solution, to be able to handle large
-        #       amounts of records.
-        records = list(records)
-        LOGGER.info(
-            'Harvested %s record for params %s',
-            len(records),
+        if root is None:
+            self._clear_checkpoint(oai_set, window=window)
+            return
+
+        harvest = self._harvests[response.meta['harvest']]
+        page = response.meta['page'] + 1
+        if harvest['checkpoint_page'] is None:
+            harvest['checkpoint_page'] = page - 1
+        harvest['parsing_pages'].add(page)
+
+        resumption_token = self._get_resumption_token(
+            response.meta['harvest'],
+            root,
+        )
+        next_request = None
+        if resumption_token:
+            next_request = self._list_request(
+                params=params,
+                set_=oai_set,
+                resumption_token=resumption_token,
+                page=page,
+                window=window,
+            )
+        prefetch_pages = self.settings.getint('OAIPMH_PREFETCH_PAGES', 1)
+        if next_request and page - min(harvest['parsing_pages']) < prefetch_pages:
+            # download the next page while the records of this one are
+            # parsed and go through the pipelines
+            yield next_request
+            next_request = None
+
+        # before parse_record gets a chance to modify the records
+        self._update_last_datestamp(response.meta['harvest'], root)
+        datestamps = {}
+        if self.changed_only:
+            results = self._changed_record_requests(root, response.meta)
+        else:
+            results = self._parse_list_records(root, datestamps)
+        for result in results:
+            yield result
+
+        LOGGER.info('Harvested page %s for params %s', page, params)
+        self._when_delivered(response.meta).addCallback(
+            self._save_datestamps,
+            datestamps,
+        )
+        # the checkpoint moves past the page once its records went through
+        # the pipelines. This happens before the harvest can complete in
+        # _follow_harvest, which waits for them after this.
+        self._when_delivered(response.meta).addCallback(
+            self._page_parsed,
+            harvest,
+            page,
+            resumption_token,
             params,
         )
-        for record in records:
-            rec_identifier = self.get_record_identifier(record)
-            if rec_identifier in self._crawled_records:
-                # avoid cross-set repeated records
-                LOGGER.info('Skipping duplicated record %s', rec_identifier)
+
+        if next_request:
+            yield next_request
+
+    def _get_resumption_token(self, key, root):
+        """Get the resumption token of a page and record the progress of the
+        harvest in the stats.
+
+        Args:
+            key (str): key of the harvest.
+            root (lxml.etree._Element): the ``ListRecords`` or
+                ``ListIdentifiers`` response.
+
+        Returns:
+            str: the resumption token, or None on the last page.
+        """
+        token = root.find('.//' + OAI_NAMESPACE + 'resumptionToken')
+        if token is None:
+            return None
+
+        stats = getattr(getattr(self, 'crawler', None), 'stats', None)
+        complete_list_size = token.get('completeListSize')
+        cursor = token.get('cursor')
+        if stats and complete_list_size and complete_list_size.isdigit():
+            stats.set_value(
+                'oaipmh/complete_list_size/{}'.format(key),
+                int(complete_list_size),
+            )
+        if stats and cursor and cursor.isdigit():
+            stats.max_value('oaipmh/cursor/{}'.format(key), int(cursor))
+        if complete_list_size and cursor:
+            LOGGER.info(
+                'Harvest %s at record %s of %s.',
+                key,
+                cursor,
+                complete_list_size,
+            )
+
+        return token.text
+
+    def _page_parsed(self, delivered, harvest, page, resumption_token, params):
+        """Store the checkpoint of a harvest once the records of a page went
+        through the pipelines.
+
+        With prefetching, pages can finish out of order, the checkpoint is
+        only moved past the pages whose preceding pages are all parsed.
+
+        Args:
+            delivered (bool): whether the pipelines processed all the
+                records of the page, otherwise the checkpoint can't move past
+                it anymore.
+            harvest (dict): the harvest.
+            page (int): number of the page.
+            resumption_token (str): token of the next page, None for the last
+                page.
+            params (dict): ``ListRecords`` arguments of the harvest.
+        """
+        harvest['parsing_pages'].discard(page)
+        if not delivered:
+            LOGGER.warning(
+                'Records of page %s for params %s not delivered, checkpoint '
+                'not saved.',
+                page,
+                params,
+            )
+            return
+
+        harvest['parsed_pages'][page] = resumption_token
+        checkpoint_page = harvest['checkpoint_page']
+        if checkpoint_page + 1 not in harvest['parsed_pages']:
+            return
+
+        while checkpoint_page + 1 in harvest['parsed_pages']:
+            checkpoint_page += 1
+            resumption_token = harvest['parsed_pages'].pop(checkpoint_page)
+        harvest['checkpoint_page'] = checkpoint_page
+
+        if not resumption_token:
+            self._clear_checkpoint(harvest['set'], window=harvest['window'])
+        elif self.changed_only:
+            return
+        elif not self._push_results():
+            LOGGER.warning(
+                'Results of page %s for params %s not pushed, checkpoint not '
+                'saved.',
+                checkpoint_page,
+                params,
+            )
+        else:
+            self._save_checkpoint(
+                set_=harvest['set'],
+                params=params,
+                resumption_token=resumption_token,
+                page=checkpoint_page,
+                window=harvest['window'],
+            )
+
+    @staticmethod
+    def _get_oai_root(response):
+        """Parse an OAI-PMH response.
+
+        Args:
+            response (scrapy.http.Response): the response of the server.
+
+        Returns:
+            lxml.etree._Element: the root ``OAI-PMH`` element.
+
+        Raises:
+            sickle.oaiexceptions.OAIError: if the server returned an OAI-PMH
+                error, e.g. ``NoRecordsMatch``.
+        """
+        root = etree.fromstring(response.body, parser=OAI_XML_PARSER)
+        error = root.find('.//' + OAI_NAMESPACE + 'error')
+        if error is not None:
+            code = error.attrib.get('code', 'UNKNOWN')
+            description = error.text or ''
+            exception_class = getattr(
+                oaiexceptions,
+                code[0].upper() + code[1:],
+                oaiexceptions.OAIError,
+            )
+            raise exception_class(description)
+
+        return root
+
+    def _update_last_datestamp(self, key, root):
+        """Keep track of the latest datestamp of the records of a harvest.
+
+        Args:
+            key (str): key of the harvest.
+            root (lxml.etree._Element): a ``ListRecords`` or
+                ``ListIdentifiers`` response of the harvest.
+        """
+        harvest = self._harvests[key]
+        datestamps = root.iterfind('.//' + OAI_NAMESPACE + 'datestamp')
+        for datestamp in datestamps:
+            if datestamp.text > (harvest['last_datestamp'] or ''):
+                harvest['last_datestamp'] = datestamp.text
+
+    def _parse_list_records(self, root, datestamps):
+        """Parse the records of a ``ListRecords`` page.
+
+        Args:
+            root (lxml.etree._Element): the ``ListRecords`` response.
+            datestamps (dict): filled with the datestamps of the records
+                parsed without errors, by identifier.
+
+        Yields:
+            the parsed items, or deferreds firing with them.
+        """
+        records = root.iterfind('.//' + OAI_NAMESPACE + 'record')
+        for record in (OAIRecord(element) for element in records):
+            parsed_item = self._parse_list_record(record)
+            if parsed_item is None:
                 continue
+            if not record.deleted and self._keeps_datestamps:
+                # for the next harvests in changed_only mode
+                parsed_item = self._keep_datestamp(
+                    parsed_item,
+                    datestamps,
+                    record.header.identifier,
+                    record.header.datestamp,
+                )
+            yield parsed_item
+
+    @staticmethod
+    def _keep_datestamp(parsed_item, datestamps, identifier, datestamp):
+        """Keep the datestamp of a record if it is parsed without errors.
+
+        Args:
+            parsed_item: the parsed item, or a deferred firing with it.
+            datestamps (dict): datestamps of the records, by identifier.
+            identifier (str): identifier of the record.
+            datestamp (str): datestamp of the record.
+
+        Returns:
+            the parsed item, or the deferred firing with it.
+        """
+        def keep(item):
+            if item is not None and not (
+                isinstance(item, dict) and item.get('exception')
+            ):
+                datestamps[identifier] = datestamp
+            return item
+
+        if isinstance(parsed_item, defer.Deferred):
+            return parsed_item.addCallback(keep)
+        return keep(parsed_item)
+
+    def _save_datestamps(self, delivered, datestamps):
+        """Store the datestamps of records that went through the pipelines,
+        unless a pipeline failed on one of them."""
+        if delivered:
+            for identifier, datestamp in datestamps.items():
+                self._datestamps[identifier] = datestamp
+        return delivered
+
+    def _changed_record_requests(self, root, meta):
+        """Create the ``GetRecord`` requests of a ``ListIdentifiers`` page.
+
+        Args:
+            root (lxml.etree._Element): the ``ListIdentifiers`` response.
+            meta (dict): meta of the ``ListIdentifiers`` request.
+
+        Yields:
+            scrapy.http.Request: a request for every record that is new or
+                changed since it was last harvested, and not deleted.
+        """
+        headers = root.iterfind('.//' + OAI_NAMESPACE + 'header')
+        for header in (Header(element) for element in headers):
+            if header.deleted:
+                LOGGER.info('Skipping deleted record %s', header.identifier)
+                continue
+            if header.identifier in self._crawled_records:
+                LOGGER.info('Skipping duplicated record %s', header.identifier)
+                continue
+            if not self._datestamps.changed(header.identifier, header.datestamp):
+                LOGGER.debug('Skipping unchanged record %s', header.identifier)
+                continue
+
+            self._crawled_records.add(header.identifier)
+            request = self._oai_request(
+                self.url,
+                {
+                    'verb': 'GetRecord',
+                    'metadataPrefix': self.format,
+                    'identifier': header.identifier,
+                },
+            )
+            request.meta['harvest'] = meta['harvest']
+            request.meta['identifier'] = header.identifier
+            request.meta['datestamp'] = header.datestamp
+            yield request
+
+    def parse_changed_record(self, response):
+        """Parse a record fetched in ``changed_only`` mode and store its
+        datestamp once it went through the pipelines."""
+        try:
+            root = self._get_oai_root(response)
+        except IdDoesNotExist as err:
+            LOGGER.warning(
+                'Record %s disappeared: %s',
+                response.meta['identifier'],
+                err,
+            )
+            return
+
+        record = OAIRecord(root.find('.//' + OAI_NAMESPACE + 'record'))
+        datestamps = {}
+        parsed_item = self._keep_datestamp(
+            self._parse_record(record),
+            datestamps,
+            response.meta['identifier'],
+            response.meta['datestamp'],
+        )
+        if parsed_item is not None:
+            yield parsed_item
+
+        self._when_delivered(response.meta).addCallback(
+            self._save_datestamps,
+            datestamps,
+        )
+
+    def _parse_list_record(self, record):
+        rec_identifier = self.get_record_identifier(record)
+        if rec_identifier in self._crawled_records:
+            # avoid cross-set repeated records
+            LOGGER.info('Skipping duplicated record %s', rec_identifier)
+            return
+
+        LOGGER.debug(
+            'Not skipping non-duplicated record %s',
+            rec_identifier,
+        )
+
+        self._crawled_records.add(rec_identifier)
+        return self._parse_record(record)
+
+    def _parse_record(self, record):
+        record_parser = self.get_record_parser()
+        if record_parser and self.parsing_executor:
+            func, kwargs = record_parser
+            return self.parsing_executor.parse(
+                func,
+                etree.tostring(record.xml, encoding='unicode'),
+                **kwargs
+            )
+
+        selector = Selector(root=record.xml, type='xml')
+
+        try:
+            return self.parse_record(selector)
+        except Exception as err:
+            LOGGER.error(err)
 
-            LOGGER.debug(
-                'Not skipping non-duplicated record %s',
-                rec_identifier,
+    @staticmethod
+    def _checkpoint_name(window=None):
+        if not window:
+            return 'checkpoint'
+        return u'checkpoint.{}_{}'.format(*window)
+
+    @staticmethod
+    def _window_marker_name(window):
+        return u'window.{}_{}'.format(*window)
+
+    def _load_checkpoint(self, set_, params, window=None):
+        """Return the stored harvest progress of a set.
+
+        Args:
+            set_ (string): set to load the checkpoint for.
+            params (dict): ``ListRecords`` arguments of the current harvest,
+                a checkpoint written for different arguments is ignored.
+            window (tuple): date window harvested, if the harvest is sharded.
+
+        Returns:
+            dict: the checkpoint or None if there is nothing to resume.
+        """
+        file_path = self._checkpoint_file_path(
+            set_,
+            name=self._checkpoint_name(window),
+        )
+        try:
+            with open(file_path) as f:
+                checkpoint = json.load(f)
+        except IOError as exc:
+            if exc.errno == NO_SUCH_FILE_OR_DIR:
+                return None
+            raise
+
+        if checkpoint.get('params') != params:
+            LOGGER.info(
+                'Ignoring checkpoint %s for different params %s',
+                file_path,
+                checkpoint.get('params'),
             )
+            return None
+
+        LOGGER.info('Checkpoint file loaded: {}'.format(repr(checkpoint)))
+        return checkpoint
+
+    def _save_checkpoint(
+        self,
+        set_,
+        params,
+        resumption_token,
+        page,
+        window=None,
+    ):
+        """Store the harvest progress of a set.
+
+        The file is replaced atomically, so that a crash while writing leaves
+        the previous checkpoint intact.
+
+        Args:
+            set_ (string): set being harvested.
+            params (dict): ``ListRecords`` arguments of the harvest.
+            resumption_token (string): token of the next page to harvest.
+            page (int): number of pages harvested so far.
+            window (tuple): date window harvested, if the harvest is sharded.
+        """
+        checkpoint = {
+            'spider': self.name,
+            'url': self.url,
+            'set': set_,
+            'params': params,
+            'resumption_token': resumption_token,
+            'page': page,
+            'saved_at': datetime.utcnow().isoformat(),
+        }
+        self._write_checkpoint(
+            checkpoint,
+            self._checkpoint_file_path(
+                set_,
+                name=self._checkpoint_name(window),
+            ),
+        )
+
+    def _save_window_harvested(self, set_, window, last_datestamp=None):
+        """Mark a date window of a set as harvested.
+
+        Args:
+            set_ (string): set being harvested.
+            window (tuple): ``(from_date, until_date)`` harvested.
+            last_datestamp (string): latest datestamp of the records of the
+                window.
+        """
+        marker = {
+            'spider': self.name,
+            'url': self.url,
+            'set': set_,
+            'window': window,
+            'last_datestamp': last_datestamp,
+            'harvested_at': datetime.utcnow().isoformat(),
+        }
+        self._write_checkpoint(
+            marker,
+            self._checkpoint_file_path(
+                set_,
+                name=self._window_marker_name(window),
+            ),
+        )
 
-            self._crawled_records[rec_identifier] = record
-            response = XmlResponse(self.url, encoding='utf-8', body=record.raw)
-            selector = Selector(response, type='xml')
+    def _load_window_marker(self, set_, window):
+        with open(self._checkpoint_file_path(
+            set_,
+            name=self._window_marker_name(window),
+        )) as f:
+            return json.load(f)
 
-            try:
-                yield self.parse_record(selector)
-            except Exception as err:
-                LOGGER.error(err)
+    def _window_harvested(self, set_, window):
+        return os.path.exists(self._checkpoint_file_path(
+            set_,
+            name=self._window_marker_name(window),
+        ))
+
+    @staticmethod
+    def _write_checkpoint(checkpoint, file_path):
+        try:
+            os.makedirs(os.path.dirname(file_path))
+        except OSError as exc:
+            if exc.errno != FILE_EXISTS:
+                raise
+        tmp_file_path = file_path + '.tmp'
+        with open(tmp_file_path, 'w') as f:
+            json.dump(checkpoint, f, indent=4)
+        os.rename(tmp_file_path, file_path)
+
+    def _clear_checkpoint(self, set_, window=None, name=None):
+        name = name or self._checkpoint_name(window)
+        try:
+            os.remove(self._checkpoint_file_path(set_, name=name))
+        except OSError as exc:
+            if exc.errno != NO_SUCH_FILE_OR_DIR:
+                raise
+
+    def closed(self, reason):
+        LOGGER.info(
+            "Harvesting completed, harvested %s records.",
+            len(self._crawled_records),
+        )
+        self._crawled_records.close()
+        if self._datestamp_index is not None:
+            self._datestamp_index.close()
 
     def make_file_fingerprint(self, set_):
         return u'metadataPrefix={}&set={}'.format(self.format, set_)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""XML feed spider parsing the feeds incrementally."""
+
+from __future__ import absolute_import, division, print_function
+
+from copy import deepcopy
+from io import BytesIO
+
+from lxml import etree
+from scrapy.selector import Selector
+from scrapy.spiders import XMLFeedSpider
+
+
+def iterparse_nodes(response, itertag, namespaces=()):
+    """Iterate over the nodes of an XML response without building its tree.
+
+    Every node is yielded as soon as its end tag is parsed, as a selector on
+    a standalone copy of it, like the ``iternodes`` iterator of Scrapy does.
+    The parsed node and the preceding ones are then dropped from the tree
+    being built, so that the memory used stays proportional to the size of
+    one node instead of the whole document.
+
+    Args:
+        response (scrapy.http.Response): the XML feed.
+        itertag (str): name of the nodes, with a prefix of ``namespaces`` if
+            they are in a namespace, e.g. ``marc:record``.
+        namespaces (Iterable[Tuple[str, str]]): prefixes and URIs
+            registered on the selectors.
+
+    Yields:
+        scrapy.selector.Selector: a selector on every node.
+    """
+    namespaces = list(namespaces)
+    prefix, _, name = itertag.rpartition(':')
+    if prefix:
+        uris = dict(namespaces)
+        if prefix not in uris:
+            raise ValueError(
+                'Unknown prefix {} in itertag {}'.format(prefix, itertag)
+            )
+        name = '{%s}%s' % (uris[prefix], name)
+
+    elements = etree.iterparse(
+        BytesIO(response.body),
+        events=('end',),
+        tag=name,
+        recover=True,
+        resolve_entities=False,
+    )
+    for _, element in elements:
+        node = deepcopy(element)
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+        selector = Selector(root=node, type='xml')
+        for prefix, uri in namespaces:
+            selector.register_namespace(prefix, uri)
+        yield selector
+
+
+class StreamingXMLFeedSpider(XMLFeedSpider):
+    """XML feed spider with an ``iterparse`` iterator.
+
+    The ``iterparse`` iterator yields the ``itertag`` nodes like
+    ``iternodes`` but with ``lxml.etree.iterparse``: the document is parsed
+    once and never kept entirely in memory, see :func:`iterparse_nodes`. The
+    other iterators of :class:`scrapy.spiders.XMLFeedSpider` are available as
+    well.
+    """
+    iterator = 'iterparse'
+
+    def parse(self, response):
+        if self.iterator != 'iterparse':
+            return super(StreamingXMLFeedSpider, self).parse(response)
+
+        response = self.adapt_response(response)
+        nodes = iterparse_nodes(response, self.itertag, self.namespaces)
+        return self.parse_nodes(response, nodes)
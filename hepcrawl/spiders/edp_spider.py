@@ -17,11 +17,11 @@ from tempfile import mkdtemp
 
 import six
 from scrapy import Request
-from scrapy.spiders import XMLFeedSpider
 
 from six.moves.urllib.parse import urljoin, urlparse, urlsplit
 
 from . import StatefulSpider
+from .common.xml_feed_spider import StreamingXMLFeedSpider
 from ..extractors.jats import Jats
 from ..items import HEPRecord
 from ..loaders import HEPLoader
@@ -38,7 +38,7 @@ from ..utils import (
 )
 
 
-class EDPSpider(StatefulSpider, Jats, XMLFeedSpider):
+class EDPSpider(StatefulSpider, Jats, StreamingXMLFeedSpider):
     """EDP Sciences crawler.
 
     This spider connects to a given FTP hosts and downloads zip files with
@@ -103,7 +103,7 @@ class EDPSpider(StatefulSpider, Jats, XMLFeedSpider):
     name = 'EDP'
     custom_settings = {}
     start_urls = []
-    iterator = 'xml'
+    iterator = 'iterparse'
     itertag = 'article'
     download_delay = 10
     custom_settings = {'MAX_CONCURRENT_REQUESTS_PER_DOMAIN': 2}
@@ -9,17 +9,24 @@
 
 """Spider for Elsevier."""
 
-import glob
+import io
+import json
 import os
+import tempfile
+import time
 import zipfile
-from io import BytesIO
+from errno import ENOENT as NO_SUCH_FILE_OR_DIR
 from os.path import basename
 
 import boto3
 import scrapy
-from backports import tempfile
-from scrapy import Request, Selector
-from six.moves.urllib.parse import urlparse
+import six
+from boto3.s3.transfer import TransferConfig
+from scrapy import Request, Selector, signals
+from scrapy.exceptions import DontCloseSpider
+from scrapy.spidermiddlewares.httperror import HttpError
+from twisted.internet import defer, threads
+from twisted.python.failure import Failure
 
 from . import StatefulSpider
 from ..parsers import ElsevierParser
@@ -71,6 +78,90 @@ class S3Handler():
     def get_s3_client(self):
         return self.s3_client
 
+    def list_keys(self, bucket):
+        """Iterate over the keys of a bucket, a page of up to 1000 keys at a
+        time."""
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket):
+            for s3_object in page.get("Contents", []):
+                yield s3_object["Key"]
+
+    def upload_file(self, file_name, bucket, key, config=None):
+        """Upload a file, in parallel parts if it is larger than the
+        multipart threshold of ``config``."""
+        self.s3_client.upload_file(
+            Filename=file_name, Bucket=bucket, Key=key, Config=config
+        )
+
+
+def read_keys_cache(path, bucket, ttl):
+    """Read the keys of a bucket cached by :func:`write_keys_cache`.
+
+    Args:
+        path (str): the cache file.
+        bucket (str): the name of the bucket.
+        ttl (int): how long (in seconds) after the listing of the bucket the
+            cache is valid.
+
+    Returns:
+        Optional[Tuple[set, float]]: the keys and the time the bucket was
+            listed, ``None`` if the cache is missing, expired or for another
+            bucket.
+    """
+    try:
+        with io.open(path, encoding="utf-8") as cache_file:
+            cache = json.load(cache_file)
+    except (IOError, OSError, ValueError):
+        return None
+    if cache.get("bucket") != bucket:
+        return None
+    listed_at = cache.get("listed_at") or 0
+    if time.time() - listed_at > ttl:
+        return None
+    return set(cache["keys"]), listed_at
+
+
+def write_keys_cache(path, bucket, keys, listed_at):
+    """Cache the keys of a bucket, replacing the cache file atomically.
+
+    Args:
+        path (str): the cache file.
+        bucket (str): the name of the bucket.
+        keys (Iterable[str]): the keys.
+        listed_at (float): the time the bucket was listed, the keys added
+            since then don't extend the validity of the cache.
+    """
+    temporary_path = "{}.tmp".format(path)
+    with io.open(temporary_path, "w", encoding="utf-8") as cache_file:
+        cache_file.write(six.text_type(json.dumps({
+            "bucket": bucket,
+            "listed_at": listed_at,
+            "keys": sorted(keys),
+        })))
+    os.rename(temporary_path, path)
+
+
+def iter_xml_files(zip_package):
+    """Iterate over the XML files of a zip package without extracting it.
+
+    The members are decompressed one at a time, so that the memory used is
+    bounded by the size of the largest XML file. Like a ``*.xml`` glob on
+    the extracted package, the hidden files, e.g. the ``._*.xml`` resource
+    forks of the ``__MACOSX`` folder, are skipped.
+
+    Args:
+        zip_package (zipfile.ZipFile): the package.
+
+    Yields:
+        Tuple[str, str]: the path in the package and the content of every
+            XML file.
+    """
+    for member in zip_package.infolist():
+        file_name = basename(member.filename)
+        if not file_name.endswith('.xml') or file_name.startswith('.'):
+            continue
+        yield member.filename, zip_package.read(member).decode('utf-8')
+
 
 class ElsevierSpider(StatefulSpider):
     name = "elsevier"
@@ -106,12 +197,25 @@ class ElsevierSpider(StatefulSpider):
         self.elsevier_authorization_data_base64_encoded = elsevier_authorization_data_base64_encoded
         self.elsevier_api_key = elsevier_api_key
         self.new_xml_files = set()
+        self.existing_packages = None
+        self.packages_listed_at = None
+        self.uploaded_packages = set()
+        self.pending_uploads = set()
+        self.spooled_packages = set()
         self.s3_handler = S3Handler(
                 access_key_id,
                 secret_access_key,
                 s3_host
             )
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(ElsevierSpider, cls).from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(
+            spider.keep_open_while_uploading, signal=signals.spider_idle
+        )
+        return spider
+
     def _get_package_urls_from_elsevier(self, elsevier_metadata):
         """
         Extracts names and urls of the zip packages from elsevier batch feed
@@ -156,6 +260,47 @@ class ElsevierSpider(StatefulSpider):
             elsevier_batch_download_url, headers=request_headers, callback=self.extract_packages_from_consyn_feed
         )
 
+    def list_existing_packages(self):
+        """Get the names of the packages already in the packages bucket.
+
+        The bucket is listed once, unless its keys were cached on disk
+        by a listing less than ``ELSEVIER_PACKAGES_CACHE_TTL`` seconds ago.
+
+        Returns:
+            set: the names of the packages.
+        """
+        cache_path = self.settings.get("ELSEVIER_PACKAGES_CACHE_PATH")
+        if cache_path:
+            cache = read_keys_cache(
+                cache_path,
+                self.packages_bucket_name,
+                self.settings.getint("ELSEVIER_PACKAGES_CACHE_TTL"),
+            )
+            if cache is not None:
+                self.logger.info("Using the packages cached in %s", cache_path)
+                packages, self.packages_listed_at = cache
+                return packages
+
+        self.packages_listed_at = time.time()
+        packages = set(self.s3_handler.list_keys(self.packages_bucket_name))
+        self.logger.info(
+            "Found %s packages in %s", len(packages), self.packages_bucket_name
+        )
+        if cache_path:
+            write_keys_cache(
+                cache_path,
+                self.packages_bucket_name,
+                packages,
+                self.packages_listed_at,
+            )
+        return packages
+
+    def add_existing_package(self, name):
+        """Register a package uploaded to the packages bucket, the cache is
+        updated once the spider closes."""
+        self.existing_packages.add(name)
+        self.uploaded_packages.add(name)
+
     def extract_packages_from_consyn_feed(self, response):
         """
         Parse batch feed file from elsevier and downloads new zip packages from Elsevier server.
@@ -164,107 +309,245 @@ class ElsevierSpider(StatefulSpider):
         packages_from_consyn_feed = self._get_package_urls_from_elsevier(
             elsevier_metadata
         )
-        for name, url in packages_from_consyn_feed.items():
-            presigned_url = self.s3_handler.create_presigned_url(
-                method="head_object", bucket=self.packages_bucket_name, file=name
-            )
-            yield Request(
-                presigned_url,
-                method="HEAD",
-                errback=self.download_package_if_new,
-                callback=self.package_already_exists,
-                meta={"name": name, "consyn_url": url},
-            )
+        deferred = threads.deferToThread(self.list_existing_packages)
+        deferred.addCallback(self.download_new_packages, packages_from_consyn_feed)
+        return deferred
 
-    def package_already_exists(self, response):
-        self.logger.info(
-            "Package {package} has been already downloaded and processed".format(
-                package=response.request.meta["name"]
-            )
-        )
+    def download_new_packages(self, existing_packages, packages):
+        """Download the packages of the feed not in the packages bucket.
 
-    def download_package_if_new(self, response):
-        if response.request.meta["name"].lower().endswith("zip"):
-            yield Request(
-                response.request.meta["consyn_url"],
-                callback=self.populate_s3_bucket_with_elsevier_package,
-                meta={"name": response.request.meta["name"]},
-            )
+        Args:
+            existing_packages (set): the names of the packages in the bucket.
+            packages (dict): the names and urls of the packages of the feed.
+        """
+        self.existing_packages = existing_packages
+        for name, url in packages.items():
+            if name in existing_packages:
+                self.logger.info(
+                    "Package {package} has been already downloaded and processed".format(
+                        package=name
+                    )
+                )
+            elif name.lower().endswith("zip"):
+                yield Request(
+                    url,
+                    callback=self.populate_s3_bucket_with_elsevier_package,
+                    meta={"name": name},
+                )
+
+    @staticmethod
+    def _spool_package(body):
+        """Write a downloaded package to a temporary file.
+
+        Returns:
+            str: the path of the file.
+        """
+        fd, package_path = tempfile.mkstemp(prefix="elsevier-", suffix=".zip")
+        try:
+            with os.fdopen(fd, "wb") as package_file:
+                package_file.write(body)
+        except Exception:
+            os.remove(package_path)
+            raise
+        return package_path
+
+    def _remove_spooled_package(self, result, package_path):
+        self.spooled_packages.discard(package_path)
+        try:
+            os.remove(package_path)
+        except OSError as exc:
+            # already removed when the spider closed
+            if exc.errno != NO_SUCH_FILE_OR_DIR:
+                raise
+        return result
+
+    def _register_error(self, failure, sender):
+        """Register an error in the spider state, like
+        :class:`hepcrawl.middlewares.ErrorHandlingMiddleware` does, with its
+        traceback."""
+        self.state.setdefault("errors", []).append({
+            "exception": failure.value,
+            "traceback": failure.getTraceback(),
+            "sender": sender,
+        })
+
+    def _track_upload(self, deferred):
+        """Keep the spider open until an upload made outside of the
+        requests of the crawl is done."""
+        self.pending_uploads.add(deferred)
+
+        def untrack(result):
+            self.pending_uploads.discard(deferred)
+            return result
+
+        return deferred.addBoth(untrack)
+
+    def keep_open_while_uploading(self):
+        """Prevent the spider from closing while uploads are pending, it is
+        idle again once they are done."""
+        if self.pending_uploads:
+            raise DontCloseSpider
 
     def populate_s3_bucket_with_elsevier_package(self, response):
         """
         Uploads to s3 bucket new zip packages.
+
+        The package is spooled to disk in a thread and uploaded from there
+        with a multipart upload in a thread, while it is unzipped from the
+        same file right away. The spooled package is removed once both are
+        done, or when the spider closes.
         """
+        deferred = threads.deferToThread(self._spool_package, response.body)
+        deferred.addCallback(self._on_package_spooled, response)
+        return deferred
+
+    def _on_package_spooled(self, package_path, response):
+        self.spooled_packages.add(package_path)
         name = response.meta["name"]
-        url = self.s3_handler.create_presigned_url(
-            method="put_object", bucket=self.packages_bucket_name, file=name
+        transfer_config = TransferConfig(
+            multipart_threshold=self.settings.getint("S3_MULTIPART_CHUNKSIZE"),
+            multipart_chunksize=self.settings.getint("S3_MULTIPART_CHUNKSIZE"),
+            max_concurrency=self.settings.getint("S3_MULTIPART_CONCURRENCY"),
         )
-        yield Request(
-            url,
-            method="PUT",
-            body=response.body,
-            meta={"name": name, "data": response.body},
-            callback=self.unzip_zip_package_to_s3,
+        package_upload = threads.deferToThread(
+            self.s3_handler.upload_file,
+            package_path,
+            self.packages_bucket_name,
+            name,
+            transfer_config,
         )
+        package_upload.addCallbacks(
+            self._on_package_uploaded,
+            self._on_package_upload_failed,
+            callbackArgs=(name,),
+            errbackArgs=(response,),
+        )
+        self._track_upload(package_upload)
+        return self.unzip_zip_package_to_s3(package_path, package_upload)
+
+    def _on_package_uploaded(self, _, name):
+        if self.existing_packages is not None:
+            self.add_existing_package(name)
+        return True
+
+    def _on_package_upload_failed(self, failure, response):
+        self.logger.error(
+            "Upload of package %s failed: %s",
+            response.meta["name"],
+            failure.getErrorMessage(),
+        )
+        self._register_error(failure, response)
+        return False
 
-    @staticmethod
-    def _get_doi_for_xml_file(xml_file):
-        parser = ElsevierParser(xml_file)
-        doi = parser.get_identifier()
-        return doi
-
-    def unzip_zip_package_to_s3(self, response):
+    def unzip_zip_package_to_s3(self, package_path, package_upload=None):
         """
         Extracts the files from zip folders downloaded from elsevier and
         uploads them with a correct name (article doi) to the correct s3 bucket.
+
+        Every file is parsed once, as soon as it is extracted, the documents
+        missing required metadata are skipped and the item of the other ones
+        is passed on with their upload. The items are only released once the
+        package is uploaded as well, see :meth:`_on_record_uploaded`. The
+        spooled package is removed once all its files are extracted and
+        ``package_upload`` is done.
+
+        Args:
+            package_path (str): the spooled package.
+            package_upload (twisted.internet.defer.Deferred): the upload of
+                the package, if any.
         """
-        temporary_dir = tempfile.TemporaryDirectory()
-        with temporary_dir as tempdir:
-            with zipfile.ZipFile(BytesIO(response.meta["data"])) as zip_package:
-                zip_package.extractall(tempdir)
-            for root, dirnames, filenames in os.walk(tempdir):
-                for file in glob.glob(root + "/*.xml"):
-                    with open(file) as f:
-                        elsevier_xml = f.read()
-                    file_doi = self._get_doi_for_xml_file(elsevier_xml)
-                    self.new_xml_files.add("{file_doi}.xml".format(file_doi=file_doi))
+        try:
+            with zipfile.ZipFile(package_path) as zip_package:
+                for file_path, elsevier_xml in iter_xml_files(zip_package):
+                    try:
+                        parser = ElsevierParser(elsevier_xml)
+                        if not parser.should_record_be_harvested():
+                            self.logger.info(
+                                "Document {name} is missing required metadata, skipping item creation.".format(
+                                    name=file_path
+                                )
+                            )
+                            continue
+                        name = "{file_doi}.xml".format(file_doi=parser.get_identifier())
+                        item = self.parse_record(parser, name)
+                    except Exception:
+                        self.logger.exception("Parsing of %s failed", file_path)
+                        self._register_error(Failure(), file_path)
+                        continue
+
+                    self.new_xml_files.add(name)
                     url = self.s3_handler.create_presigned_url(
                         method="put_object",
                         bucket=self.files_bucket_name,
-                        file="{file_doi}.xml".format(file_doi=file_doi),
+                        file=name,
                     )
-
                     yield Request(
                         url,
                         method="PUT",
                         body=elsevier_xml,
                         meta={
-                            "name": "{file_doi}.xml".format(file_doi=file_doi),
-                            "data": elsevier_xml,
+                            "name": name,
+                            "item": item,
+                            "package_upload": package_upload,
                         },
-                        callback=self.parse_record,
+                        callback=self._on_record_uploaded,
+                        errback=self._on_record_upload_failed,
                     )
+        finally:
+            if package_upload is None:
+                self._remove_spooled_package(None, package_path)
+            else:
+                package_upload.addBoth(self._remove_spooled_package, package_path)
+
+    def _on_record_uploaded(self, response):
+        """Pass on the item of an XML uploaded to s3, from which the documents
+        pipeline downloads it.
+
+        The item is only passed on once its package is uploaded too. If the
+        package upload failed, the package is missing from the packages
+        bucket and the next harvest processes it again, the item is dropped
+        so that it is not pushed twice.
+        """
+        item = response.meta["item"]
+        package_upload = response.meta.get("package_upload")
+        if package_upload is None:
+            return item
+
+        released = defer.Deferred()
+
+        def release(package_uploaded):
+            if package_uploaded is True:
+                released.callback(item)
+            else:
+                self.logger.warning(
+                    "Dropping %s, its package will be harvested again.",
+                    response.meta["name"],
+                )
+                released.callback(None)
+            return package_uploaded
 
-    @staticmethod
-    def _file_name_from_url(url):
-        return basename(urlparse(url).path)
+        package_upload.addBoth(release)
+        return released
 
-    def parse_record(self, response):
-        """Parse an elsevier XML downloaded from s3 into a HEP record."""
-        parser = ElsevierParser(response.meta["data"])
-        if not parser.should_record_be_harvested():
-            self.logger.info(
-                "Document {name} is missing required metadata, skipping item creation.".format(
-                    name=response.meta["name"]
-                )
-            )
-            return
-        file_name = self._file_name_from_url(response.url)
-        self.logger.info("Harvesting file: %s", file_name)
+    def _on_record_upload_failed(self, failure):
+        self.logger.error(
+            "Upload of %s failed: %s",
+            failure.request.meta["name"],
+            failure.getErrorMessage(),
+        )
+        # the download errors are already registered by the downloader
+        # middleware, which ignores the error statuses
+        if failure.check(HttpError):
+            self._register_error(failure, failure.request)
+
+    def parse_record(self, parser, name):
+        """Build the HEP record of an elsevier XML uploaded to s3 as
+        ``name``."""
+        self.logger.info("Harvesting file: %s", name)
         document_url = self.s3_handler.create_presigned_url(
-            self.files_bucket_name, response.meta["name"], "get_object"
+            self.files_bucket_name, name, "get_object"
         )
-        parser.attach_fulltext_document(file_name, document_url)
+        parser.attach_fulltext_document(basename(name), document_url)
         parsed_record = parser.parse()
         file_urls = [
             document['url'] for document in parsed_record.get('documents', [])
@@ -274,6 +557,20 @@ class ElsevierSpider(StatefulSpider):
             record=parsed_record, file_urls=file_urls, record_format="hep"
         )
 
+    def closed(self, reason):
+        # the packages whose extraction did not run to the end
+        for package_path in list(self.spooled_packages):
+            self._remove_spooled_package(None, package_path)
+
+        cache_path = self.settings.get("ELSEVIER_PACKAGES_CACHE_PATH")
+        if cache_path and self.uploaded_packages:
+            write_keys_cache(
+                cache_path,
+                self.packages_bucket_name,
+                self.existing_packages,
+                self.packages_listed_at,
+            )
+
 
 class ElsevierSingleSpider(StatefulSpider):
     name = "elsevier-single"
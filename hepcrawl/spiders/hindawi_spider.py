@@ -12,9 +12,9 @@
 from __future__ import absolute_import, division, print_function
 
 from scrapy import Request
-from scrapy.spiders import XMLFeedSpider
 
 from . import StatefulSpider
+from .common.xml_feed_spider import StreamingXMLFeedSpider
 from ..items import HEPRecord
 from ..loaders import HEPLoader
 from ..utils import (
@@ -24,7 +24,7 @@ from ..utils import (
 )
 
 
-class HindawiSpider(StatefulSpider, XMLFeedSpider):
+class HindawiSpider(StatefulSpider, StreamingXMLFeedSpider):
 
     """Hindawi crawler
 
@@ -61,7 +61,7 @@ class HindawiSpider(StatefulSpider, XMLFeedSpider):
 
     name = 'hindawi'
     start_urls = []
-    iterator = 'xml'
+    iterator = 'iterparse'
     itertag = 'marc:record'
 
     namespaces = [
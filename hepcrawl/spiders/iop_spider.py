@@ -16,16 +16,16 @@ import tarfile
 from tempfile import mkdtemp
 
 from scrapy import Request
-from scrapy.spiders import XMLFeedSpider
 
 from . import StatefulSpider
+from .common.xml_feed_spider import StreamingXMLFeedSpider
 from ..extractors.nlm import NLM
 from ..items import HEPRecord
 from ..loaders import HEPLoader
 from ..utils import ParsedItem, strict_kwargs
 
 
-class IOPSpider(StatefulSpider, XMLFeedSpider, NLM):
+class IOPSpider(StatefulSpider, StreamingXMLFeedSpider, NLM):
     """IOPSpider crawler.
 
     This spider should first be able to harvest files from `IOP STACKS`_.
@@ -74,7 +74,7 @@ class IOPSpider(StatefulSpider, XMLFeedSpider, NLM):
 
     name = 'iop'
     start_urls = []
-    iterator = 'xml'
+    iterator = 'iterparse'
     itertag = 'Article'
 
     OPEN_ACCESS_JOURNALS = {
@@ -15,11 +15,11 @@ import os
 import tempfile
 
 from scrapy import Request
-from scrapy.spiders import XMLFeedSpider
 
 from six.moves.urllib.parse import urlsplit
 
 from . import StatefulSpider
+from .common.xml_feed_spider import StreamingXMLFeedSpider
 from ..parsers import JatsParser
 from ..utils import (
     ParsedItem,
@@ -31,7 +31,7 @@ from ..utils import (
 )
 
 
-class WorldScientificSpider(StatefulSpider, XMLFeedSpider):
+class WorldScientificSpider(StatefulSpider, StreamingXMLFeedSpider):
     """World Scientific Proceedings crawler.
 
     This spider connects to a given FTP hosts and downloads zip files with
@@ -76,7 +76,7 @@ class WorldScientificSpider(StatefulSpider, XMLFeedSpider):
     custom_settings = {}
     start_urls = []
     # This is actually unnecessary, since it's the default value
-    iterator = 'iternodes'
+    iterator = 'iterparse'
     itertag = 'article'
 
     allowed_article_types = [
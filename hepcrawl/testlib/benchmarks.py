@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Throughput and memory benchmarks on the unit tests fixtures.
+
+The fixtures are copied as many times as there are rounds, the throughput
+is measured on all the copies and the peak of the memory allocated while
+processing one more copy. The benchmarks need the ``tests`` directory of
+a checkout of the repository.
+
+Example:
+    Run every benchmark on 20 copies of the fixtures and save the results to
+    compare them with another commit::
+
+        $ hepcrawl-bench --rounds 20 --output results.json
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import glob
+import io
+import json
+import os
+import platform
+from copy import deepcopy
+from timeit import default_timer
+
+import six
+from lxml import etree
+
+from hepcrawl import __version__
+from hepcrawl.parsers import (
+    ArxivParser,
+    CrossrefParser,
+    ElsevierParser,
+    JatsParser,
+)
+from hepcrawl.spiders.common.xml_feed_spider import iterparse_nodes
+from hepcrawl.spiders.hindawi_spider import HindawiSpider
+from hepcrawl.spiders.iop_spider import IOPSpider
+from hepcrawl.testlib.fixtures import (
+    fake_response_from_file,
+    get_test_suite_path,
+)
+from hepcrawl.tohep import hepcrawl_to_hep
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+
+OAI_NAMESPACE = 'http://www.openarchives.org/OAI/2.0/'
+ARXIV_NUMBERED_ELEMENTS = [
+    '{http://arxiv.org/OAI/arXiv/}title',
+    '{http://arxiv.org/OAI/arXiv/}abstract',
+]
+ELSEVIER_COLLABORATION_TEMPLATE = ('elsevier', 'j.scib.2020.01.008.xml')
+JATS_COLLABORATION_TEMPLATE = ('aps', 'PhysRevD.102.014505.xml')
+CROSSREF_REFERENCES_TEMPLATE = ('crossref', 'sample_crossref_record.json')
+LOADER_SPIDERS_FIXTURES = [
+    (IOPSpider, 'iop/xml/test_standard.xml'),
+    (HindawiSpider, 'hindawi/test_1.xml'),
+]
+
+
+def _read(path):
+    with io.open(path, encoding='utf-8') as fd:
+        return fd.read()
+
+
+def _fixtures(directory, extension='.xml'):
+    """Paths of the fixtures of a directory having an expected output."""
+    paths = glob.glob(get_test_suite_path('responses', directory, '*' + extension))
+    return sorted(
+        path for path in paths
+        if os.path.exists(path[:-len(extension)] + '_expected.yml')
+    )
+
+
+def arxiv_records(copies=1):
+    """The arXiv records of the OAI-PMH responses fixtures.
+
+    The titles and abstracts of the copies are numbered, so that like in a
+    real harvest they differ from one record to the other while the
+    comments and other short fields repeat.
+    """
+    records = []
+    paths = glob.glob(get_test_suite_path('responses', 'arxiv', '*.xml'))
+    for path in sorted(paths):
+        tree = etree.parse(path)
+        for metadata in tree.iterfind('.//{%s}metadata' % OAI_NAMESPACE):
+            records.extend(metadata)
+
+    batch = []
+    for copy in range(copies):
+        for record in records:
+            if copy:
+                record = deepcopy(record)
+                for element in record.iter(*ARXIV_NUMBERED_ELEMENTS):
+                    element.text = u'{} [{}]'.format(element.text, copy)
+            batch.append(etree.tostring(record, encoding='unicode'))
+    return batch
+
+
+def jats_records(copies=1):
+    """The APS JATS fixtures."""
+    return [_read(path) for path in _fixtures('aps')] * copies
+
+
+def jats_collaboration_records(copies=1, authors=3000, affiliations=300):
+    """A synthetic APS record with the authors of a large collaboration.
+
+    Like :func:`elsevier_collaboration_records`, every author refers to two
+    of the affiliations of the contributors group of a JATS fixture.
+    """
+    tree = etree.parse(get_test_suite_path('responses', *JATS_COLLABORATION_TEMPLATE))
+    group = tree.find('.//contrib-group')
+    author = group.findall('contrib')[-1]
+    affiliation = group.find('aff')
+    for child in group.findall('contrib') + group.findall('aff'):
+        group.remove(child)
+
+    for index in range(affiliations):
+        element = deepcopy(affiliation)
+        element.set('id', 'a{}'.format(index))
+        element.find('institution').text = u'Institute {}'.format(index)
+        group.append(element)
+
+    for index in range(authors):
+        element = deepcopy(author)
+        element.find('name/surname').text = u'Author {}'.format(index)
+        element.find('xref[@ref-type="aff"]').set(
+            'rid',
+            'a{} a{}'.format(index % affiliations, (index + 1) % affiliations),
+        )
+        group.insert(index, element)
+
+    return [etree.tostring(tree, encoding='unicode')] * copies
+
+
+def elsevier_records(copies=1):
+    """The Elsevier fixtures."""
+    return [_read(path) for path in _fixtures('elsevier')] * copies
+
+
+def elsevier_collaboration_records(copies=1, authors=3000, affiliations=300):
+    """A synthetic Elsevier record with the authors of a large collaboration.
+
+    The author group of an Elsevier fixture is filled with ``authors``
+    authors, each referring to two of the ``affiliations`` affiliations of
+    the group, like the papers of the LHC experiments.
+    """
+    tree = etree.parse(get_test_suite_path('responses', *ELSEVIER_COLLABORATION_TEMPLATE))
+    group = tree.find('.//{*}author-group')
+    author = group.find('{*}author')
+    affiliation = group.find('{*}affiliation')
+    for child in group.findall('{*}author') + group.findall('{*}affiliation'):
+        group.remove(child)
+
+    for index in range(affiliations):
+        element = deepcopy(affiliation)
+        element.set('id', 'aff{}'.format(index))
+        element.find('{*}textfn').text = u'Institute {}'.format(index)
+        group.append(element)
+
+    for index in range(authors):
+        element = deepcopy(author)
+        element.find('{*}surname').text = u'Author {}'.format(index)
+        cross_refs = [
+            cross_ref for cross_ref in element.iterfind('{*}cross-ref')
+            if 'af' in cross_ref.get('refid', '')
+        ]
+        for offset, cross_ref in enumerate(cross_refs):
+            cross_ref.set('refid', 'aff{}'.format((index + offset) % affiliations))
+        group.insert(index, element)
+
+    return [etree.tostring(tree, encoding='unicode')] * copies
+
+
+def crossref_records(copies=1):
+    """The Crossref API responses fixtures, decoded for every copy."""
+    responses = [_read(path) for path in _fixtures('crossref', '.json')]
+    return [json.loads(response) for response in responses * copies]
+
+
+def crossref_references_records(copies=1, references=5000):
+    """A synthetic Crossref API response of a review with many references.
+
+    The references of a Crossref fixture are repeated with numbered titles,
+    every fifth reference being a duplicate of the previous one.
+    """
+    template = json.loads(_read(get_test_suite_path('responses', *CROSSREF_REFERENCES_TEMPLATE)))
+    fixture_references = template['message']['reference']
+    reference_list = []
+    for index in range(references):
+        number = index - 1 if index % 5 == 4 else index
+        reference = dict(fixture_references[number % len(fixture_references)])
+        reference['article-title'] = u'Reference {}'.format(number)
+        reference_list.append(reference)
+    template['message']['reference'] = reference_list
+
+    response = json.dumps(template)
+    return [json.loads(response) for _ in range(copies)]
+
+
+def loader_spiders_nodes(copies=1):
+    """The nodes of the feeds of the spiders using the item loader.
+
+    Returns:
+        List[Tuple[scrapy.Spider, scrapy.http.Response, scrapy.selector.Selector]]:
+            the spider, response and node passed to ``parse_node``, the nodes
+            are parsed again for every copy.
+    """
+    records = []
+    for _ in range(copies):
+        for spider_class, fixture in LOADER_SPIDERS_FIXTURES:
+            spider = spider_class()
+            response = fake_response_from_file(fixture)
+            nodes = iterparse_nodes(response, spider.itertag, spider.namespaces)
+            records.extend((spider, response, node) for node in nodes)
+    return records
+
+
+def crawler_records(copies=1):
+    """The input fixtures of :func:`hepcrawl.tohep.hepcrawl_to_hep`."""
+    import yaml
+
+    records = []
+    for path in sorted(glob.glob(get_test_suite_path('responses', 'tohep', 'in_*.yaml'))):
+        with io.open(path, encoding='utf-8') as fd:
+            records.append(yaml.safe_load(fd))
+    return [deepcopy(record) for record in records * copies]
+
+
+def _parse_with(parser_class):
+    def parse(record):
+        return parser_class(record).parse()
+    return parse
+
+
+def _parse_node(record):
+    spider, response, node = record
+    return spider.parse_node(response, node)
+
+
+BENCHMARKS = {
+    'arxiv': (_parse_with(ArxivParser), arxiv_records),
+    'jats': (_parse_with(JatsParser), jats_records),
+    'jats_collaboration': (_parse_with(JatsParser), jats_collaboration_records),
+    'elsevier': (_parse_with(ElsevierParser), elsevier_records),
+    'elsevier_collaboration': (
+        _parse_with(ElsevierParser),
+        elsevier_collaboration_records,
+    ),
+    'crossref': (_parse_with(CrossrefParser), crossref_records),
+    'crossref_references': (
+        _parse_with(CrossrefParser),
+        crossref_references_records,
+    ),
+    'parse_node': (_parse_node, loader_spiders_nodes),
+    'hepcrawl_to_hep': (hepcrawl_to_hep, crawler_records),
+}
+
+
+def benchmark(function, records):
+    """Measure the throughput of a function processing records.
+
+    Args:
+        function (callable): function called with each record.
+        records (list): the records to process.
+
+    Returns:
+        float: the number of records processed per second.
+    """
+    start = default_timer()
+    for record in records:
+        function(record)
+    elapsed = default_timer() - start
+
+    return len(records) / elapsed
+
+
+def peak_memory(function, records):
+    """Measure the peak of the memory allocated while processing records.
+
+    Args:
+        function (callable): function called with each record.
+        records (list): the records to process.
+
+    Returns:
+        Optional[int]: the peak of the allocated memory in bytes, ``None``
+            when ``tracemalloc`` is not available.
+    """
+    if tracemalloc is None:
+        return None
+
+    tracemalloc.start()
+    try:
+        for record in records:
+            function(record)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(name, rounds):
+    """Run a benchmark of :data:`BENCHMARKS`.
+
+    Returns:
+        dict: the results.
+    """
+    function, get_records = BENCHMARKS[name]
+    records = get_records(copies=rounds + 2)
+    fixtures = len(records) // (rounds + 2)
+    # warm up lazy imports on the first copy
+    benchmark(function, records[:fixtures])
+    result = {
+        'records': fixtures * rounds,
+        'records_per_second': benchmark(function, records[fixtures:-fixtures]),
+        'peak_memory': peak_memory(function, records[-fixtures:]),
+    }
+    if name == 'arxiv':
+        result['latex_cache'] = ArxivParser.latex_cache.stats
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        'benchmarks',
+        nargs='*',
+        default=sorted(BENCHMARKS),
+        metavar='benchmark',
+        help='benchmarks to run, among {}'.format(', '.join(sorted(BENCHMARKS))),
+    )
+    parser.add_argument(
+        '--rounds',
+        type=int,
+        default=10,
+        help='number of copies of every fixture processed',
+    )
+    parser.add_argument(
+        '--output',
+        help='JSON file where the results are written',
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error('unknown benchmarks: {}'.format(', '.join(sorted(unknown))))
+
+    results = {}
+    for name in args.benchmarks:
+        result = results[name] = run_benchmark(name, args.rounds)
+        memory = result['peak_memory']
+        print(
+            '{:<16} {:>5} records {:>10.1f} records/s {:>10} peak'.format(
+                name,
+                result['records'],
+                result['records_per_second'],
+                '-' if memory is None else '{:.0f} kB'.format(memory / 2 ** 10),
+            )
+        )
+        if 'latex_cache' in result:
+            print('{:<16} LaTeX cache {}'.format('', result['latex_cache']))
+
+    if args.output:
+        with io.open(args.output, 'w', encoding='utf-8') as fd:
+            fd.write(six.text_type(json.dumps(
+                {
+                    'version': __version__,
+                    'python': platform.python_version(),
+                    'rounds': args.rounds,
+                    'benchmarks': results,
+                },
+                indent=2,
+                sort_keys=True,
+            )))
+
+
+if __name__ == '__main__':
+    main()
@@ -12,11 +12,13 @@ from __future__ import absolute_import, division, print_function
 import datetime
 import inspect
 import fnmatch
+import json
 import os
 import pprint
 import re
+from collections import OrderedDict
 from functools import wraps
-from itertools import groupby
+from itertools import chain, groupby
 from netrc import netrc
 from six.moves.urllib.parse import urlparse
 from zipfile import ZipFile
@@ -217,6 +219,52 @@ def build_dict(seq, key):
     return dict((d[key], dict(d, index=i)) for (i, d) in enumerate(seq))
 
 
+def dedupe_list_of_dicts(dicts):
+    """Remove duplicates from a list of dictionaries preserving the order.
+
+    Like ``inspire_utils.dedupers.dedupe_list_of_dicts``, but the
+    dictionaries are compared through their canonical JSON serialization,
+    which is computed in C instead of freezing them recursively.
+
+    Args:
+        dicts (Iterable[dict]): JSON serializable dictionaries.
+
+    Returns:
+        List[dict]: the first occurrence of every dictionary.
+    """
+    result = []
+    seen = set()
+    for dict_ in dicts:
+        key = json.dumps(dict_, sort_keys=True, separators=(',', ':'))
+        if key not in seen:
+            seen.add(key)
+            result.append(dict_)
+
+    return result
+
+
+def add_references(builder, references):
+    """Add references to the record of a ``LiteratureBuilder``.
+
+    Same as calling ``builder.add_reference`` on every reference, which
+    compares each of them with all the ones already added, but in linear
+    time with :func:`dedupe_list_of_dicts`.
+
+    Args:
+        builder (inspire_schemas.builders.LiteratureBuilder): the builder.
+        references (Iterable[dict]): the references, as built by
+            ``inspire_schemas.builders.ReferenceBuilder``.
+    """
+    references = dedupe_list_of_dicts(
+        chain(
+            builder.record.get('references', []),
+            (reference for reference in references if reference),
+        )
+    )
+    if references:
+        builder.record['references'] = references
+
+
 def parse_domain(url):
     """Parse domain from a given url."""
     parsed_uri = urlparse(url)
@@ -382,6 +430,105 @@ def strict_kwargs(func):
     return wrapper
 
 
+class cached_property(object):
+    """Property computed once per instance.
+
+    The value is stored in the ``__dict__`` of the instance under the name of
+    the property, where it shadows the descriptor on the next accesses. It is
+    used by the parsers, so that each field extracted from a record is only
+    extracted once even if it is needed by several other fields.
+
+    Subclasses changing what a property depends on, e.g. the root node of a
+    parser, must call :func:`invalidate_cached_properties` afterwards.
+
+    Args:
+        func (function): the method computing the value.
+    """
+    def __init__(self, func):
+        self.func = func
+        self.__name__ = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.__name__] = self.func(instance)
+        return value
+
+
+def invalidate_cached_properties(instance, *names):
+    """Forget the values of cached properties of an instance.
+
+    Args:
+        instance: the object with cached properties.
+        *names (str): names of the properties to invalidate, all of them if
+            none is given.
+    """
+    if not names:
+        names = [
+            name for name in dir(type(instance))
+            if isinstance(getattr(type(instance), name), cached_property)
+        ]
+    for name in names:
+        instance.__dict__.pop(name, None)
+
+
+class LRUCache(object):
+    """Mapping keeping only its most recently used items.
+
+    Args:
+        max_size (int): maximum number of items, the least recently used
+            item is dropped when a new one is added to a full cache.
+
+    Attributes:
+        hits (int): number of lookups of a cached key.
+        misses (int): number of lookups of a key not in the cache.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __getitem__(self, key):
+        try:
+            value = self._items.pop(key)
+        except KeyError:
+            self.misses += 1
+            raise
+        self._items[key] = value
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self._items.pop(key, None)
+        self._items[key] = value
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        """Drop all the items and reset the statistics."""
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self):
+        """dict: the number of hits, misses and items of the cache."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._items),
+            'max_size': self.max_size,
+        }
+
+
 class RecordFile(object):
     """Metadata of a file needed for a record.
 
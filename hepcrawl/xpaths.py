@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Registry of compiled XPath expressions shared by the parsers.
+
+``Selector.xpath`` compiles its expression on every call and wraps every
+result, even text, in a new ``Selector``. The helpers of this module evaluate
+expressions compiled once per process, with ``smart_strings=False``, and only
+wrap elements in selectors when they are needed as such.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import sys
+from copy import deepcopy
+
+import six
+from lxml import etree
+from scrapy.selector import Selector, SelectorList
+
+
+class XPathRegistry(object):
+    """Cache of compiled XPath expressions.
+
+    Args:
+        max_size (int): maximum number of compiled expressions kept, the
+            expressions built at runtime are compiled on every call once the
+            registry is full.
+
+    Attributes:
+        evaluations (int): number of XPath evaluations done through the
+            registry, for profiling.
+    """
+
+    def __init__(self, max_size=1000):
+        self._xpaths = {}
+        self.max_size = max_size
+        self.evaluations = 0
+
+    def __len__(self):
+        return len(self._xpaths)
+
+    def get(self, expression, namespaces=None):
+        """Get the compiled version of an expression.
+
+        Args:
+            expression (str): the XPath expression.
+            namespaces (dict): prefixes used in the expression.
+
+        Returns:
+            lxml.etree.XPath: the compiled expression.
+        """
+        key = (expression, frozenset(namespaces.items()) if namespaces else None)
+        try:
+            return self._xpaths[key]
+        except KeyError:
+            xpath = etree.XPath(
+                expression,
+                namespaces=namespaces,
+                smart_strings=False,
+            )
+            if len(self._xpaths) < self.max_size:
+                self._xpaths[key] = xpath
+            return xpath
+
+    def evaluate(self, node, expression, **variables):
+        """Evaluate an expression.
+
+        Args:
+            node (Union[scrapy.selector.Selector, lxml.etree._Element]): the
+                context node, the namespaces registered on a selector are
+                available in the expression.
+            expression (str): the XPath expression.
+            variables: values of the XPath variables of the expression.
+
+        Returns:
+            list: the raw lxml results.
+
+        Raises:
+            ValueError: if the expression is invalid.
+        """
+        self.evaluations += 1
+        if isinstance(node, Selector):
+            namespaces, node = node.namespaces, node.root
+        else:
+            namespaces = None
+        if not etree.iselement(node):
+            # selectors on text or attribute values
+            return []
+        try:
+            result = self.get(expression, namespaces)(node, **variables)
+        except etree.XPathError as exc:
+            msg = u'XPath error: {} in {}'.format(exc, expression)
+            six.reraise(ValueError, ValueError(msg), sys.exc_info()[2])
+        if not isinstance(result, list):
+            result = [result]
+        return result
+
+
+XPATHS = XPathRegistry()
+
+
+def _evaluate(node, expression, variables):
+    """Yield the results along with the selector they come from, the results
+    of all the selectors of a ``SelectorList`` are flattened like
+    ``SelectorList.xpath`` does."""
+    nodes = node if isinstance(node, SelectorList) else [node]
+    for node in nodes:
+        for result in XPATHS.evaluate(node, expression, **variables):
+            yield result, node
+
+
+def _to_text(result, node):
+    if isinstance(result, etree._Element):
+        return Selector(
+            root=result,
+            type=getattr(node, 'type', 'xml'),
+        ).extract()
+    if result is True:
+        return u'1'
+    if result is False:
+        return u'0'
+    return six.text_type(result)
+
+
+def select(node, expression, **variables):
+    """Same as ``node.xpath(expression, **variables)``.
+
+    Args:
+        node (Union[scrapy.selector.Selector,
+            scrapy.selector.SelectorList]): the context node.
+        expression (str): the XPath expression.
+        variables: values of the XPath variables of the expression.
+
+    Returns:
+        scrapy.selector.SelectorList: selectors on the results.
+    """
+    return SelectorList(
+        Selector(
+            root=result,
+            type=selector.type,
+            namespaces=selector.namespaces,
+            _expr=expression,
+        )
+        for result, selector in _evaluate(node, expression, variables)
+    )
+
+
+def extract(node, expression, **variables):
+    """Same as ``node.xpath(expression, **variables).extract()``.
+
+    Args:
+        node (Union[scrapy.selector.Selector,
+            scrapy.selector.SelectorList, lxml.etree._Element]): the context
+            node.
+        expression (str): the XPath expression.
+        variables: values of the XPath variables of the expression.
+
+    Returns:
+        list: the results as text.
+    """
+    return [
+        _to_text(result, selector)
+        for result, selector in _evaluate(node, expression, variables)
+    ]
+
+
+def extract_first(node, expression, default=None, **variables):
+    """Same as ``node.xpath(expression, **variables).extract_first(default)``.
+
+    Args:
+        node (Union[scrapy.selector.Selector,
+            scrapy.selector.SelectorList, lxml.etree._Element]): the context
+            node.
+        expression (str): the XPath expression.
+        default: returned when there is no result.
+        variables: values of the XPath variables of the expression.
+
+    Returns:
+        str: the first result as text.
+    """
+    for result, selector in _evaluate(node, expression, variables):
+        return _to_text(result, selector)
+    return default
+
+
+def register_namespaces(selector, namespaces):
+    """Register the namespaces of a document on a selector.
+
+    The XPaths of the parsers are written against fixed prefixes instead of
+    removing the namespaces of the whole document. The prefixes declared on
+    the root element of the document take precedence over ``namespaces``, so
+    that documents binding the usual prefixes to other URIs are parsed the
+    same way.
+
+    Args:
+        selector (scrapy.selector.Selector): selector on the root of the
+            document.
+        namespaces (dict): default URIs of the prefixes.
+
+    Returns:
+        scrapy.selector.Selector: the selector.
+    """
+    uris = dict(namespaces)
+    uris.update(
+        (prefix, uri) for prefix, uri in selector.root.nsmap.items() if prefix
+    )
+    for prefix, uri in uris.items():
+        selector.register_namespace(prefix, uri)
+    return selector
+
+
+def strip_namespaces(node):
+    """Get a copy of a node without namespaces.
+
+    Like ``Selector.remove_namespaces`` but on a copy, to serialize or clean
+    up a small part of a document the same way without rewriting all of it.
+
+    Args:
+        node (scrapy.selector.Selector): the node.
+
+    Returns:
+        scrapy.selector.Selector: a selector on the copy.
+    """
+    copy = Selector(root=deepcopy(node.root), type=node.type)
+    copy.remove_namespaces()
+    return copy
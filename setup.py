@@ -19,7 +19,6 @@ install_requires = [
     'automat==20.2.0',
     'amqp~=2.0,>2.2.0,!=2.3.0',
     'autosemver~=0.2',
-    "backports.tempfile==1.0",
     'boto3~=1.14',
     'dojson==1.4.0',
     'inspire-schemas~=61.5',
@@ -97,7 +96,10 @@ setup(
     url=URL,
     author="CERN",
     author_email='admin@inspirehep.net',
-    entry_points={'scrapy': ['settings = hepcrawl.settings']},
+    entry_points={
+        'scrapy': ['settings = hepcrawl.settings'],
+        'console_scripts': ['hepcrawl-bench = hepcrawl.testlib.benchmarks:main'],
+    },
     zip_safe=False,
     include_package_data=True,
     platforms='any',
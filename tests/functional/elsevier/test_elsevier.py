@@ -132,8 +132,6 @@ class TestElsevierSpider:
             [
                 "10.1016/j.geomphys.2020.103892.xml",
                 "10.1016/j.geomphys.2020.103898.xml",
-                "10.1016/j.geomphys.2020.103925.xml",
-                "10.1016/j.geomphys.2020.103921.xml",
             ]
         )
         expected_records = get_expected_parser_responses_for_new_articles_in_s3()
@@ -217,7 +215,7 @@ class TestElsevierSpider:
             [article for article in self.articles_bucket.objects.all()]
         )
 
-        assert articles_in_s3 == 4
+        assert articles_in_s3 == 2
         assert not crawl_results
 
     def test_elsevier_spider_doesnt_parse_articles_with_missing_metadata_or_wrong_doctype(
@@ -248,5 +246,5 @@ class TestElsevierSpider:
         )
 
         assert nb_of_packages_in_s3 == 2
-        assert articles_in_s3 == 8
+        assert articles_in_s3 == 2
         assert not crawl_results
@@ -18,3 +18,20 @@ def set_up_clean_up_env_vars():
     env_var_backup = dict(os.environ)
     yield
     os.environ = env_var_backup
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--benchmarks',
+        action='store_true',
+        help='run the benchmarks on the full fixtures',
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmarks'):
+        return
+    skip_benchmark = pytest.mark.skip(reason='needs --benchmarks to run')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip_benchmark)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, division, print_function
+
+import io
+import json
+
+import pytest
+
+from hepcrawl.testlib import benchmarks
+from hepcrawl.testlib.benchmarks import BENCHMARKS, main, run_benchmark
+
+SMALL_RECORDS = {
+    'elsevier_collaboration': {'authors': 20, 'affiliations': 4},
+    'jats_collaboration': {'authors': 20, 'affiliations': 4},
+    'crossref_references': {'references': 20},
+}
+
+
+def check_result(result):
+    assert result['records'] > 0
+    assert result['records_per_second'] > 0
+    if benchmarks.tracemalloc is None:
+        assert result['peak_memory'] is None
+    else:
+        assert result['peak_memory'] > 0
+
+
+@pytest.mark.parametrize('name', sorted(BENCHMARKS))
+def test_run_benchmark_smoke(name, monkeypatch):
+    function, get_records = BENCHMARKS[name]
+
+    def get_one_record(copies):
+        # the first record of every copy, smaller when it is synthetic
+        records = get_records(copies=copies, **SMALL_RECORDS.get(name, {}))
+        return records[::len(records) // copies]
+
+    monkeypatch.setitem(BENCHMARKS, name, (function, get_one_record))
+    result = run_benchmark(name, rounds=1)
+
+    assert result['records'] == 1
+    check_result(result)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('name', sorted(BENCHMARKS))
+def test_run_benchmark(name):
+    check_result(run_benchmark(name, rounds=1))
+
+
+def test_main_writes_json(tmpdir):
+    output = tmpdir.join('results.json')
+    main(['crossref', 'hepcrawl_to_hep', '--rounds', '2', '--output', str(output)])
+
+    with io.open(str(output), encoding='utf-8') as fd:
+        results = json.load(fd)
+
+    assert results['rounds'] == 2
+    assert sorted(results['benchmarks']) == ['crossref', 'hepcrawl_to_hep']
+    assert results['benchmarks']['crossref']['records'] == 2 * 5
+
+
+def test_main_rejects_unknown_benchmarks():
+    with pytest.raises(SystemExit):
+        main(['unknown'])
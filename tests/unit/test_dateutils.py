@@ -96,3 +96,25 @@ def test_date_strftime():
     date_object = dateutils.date.today()
     result = date_object.strftime("%a, %d %b %Y %H:%M:%S +0000")
     assert expected == result
+
+
+def test_split_date_range():
+    expected = [
+        ('2017-01-01', '2017-01-03'),
+        ('2017-01-04', '2017-01-06'),
+        ('2017-01-07', '2017-01-10'),
+    ]
+    assert dateutils.split_date_range('2017-01-01', '2017-01-10', 3) == expected
+
+
+def test_split_date_range_shorter_than_windows():
+    expected = [
+        ('2016-12-31', '2016-12-31'),
+        ('2017-01-01', '2017-01-01'),
+    ]
+    assert dateutils.split_date_range('2016-12-31', '2017-01-01', 4) == expected
+
+
+def test_split_date_range_empty():
+    with pytest.raises(ValueError):
+        dateutils.split_date_range('2017-01-02', '2017-01-01', 2)
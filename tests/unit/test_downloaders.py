@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2017 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import mock
+import pytest
+
+from scrapy.downloadermiddlewares.retry import RetryMiddleware
+from scrapy.http import Request, Response
+from scrapy.spiders import Spider
+from scrapy.utils.project import get_project_settings
+from twisted.internet import defer
+from twisted.internet.task import Clock
+
+from hepcrawl.downloaders import OAIPMHDownloadHandler
+
+
+@pytest.fixture
+def handler():
+    handler = OAIPMHDownloadHandler(get_project_settings(), clock=Clock())
+    handler.http_handler = mock.Mock()
+    return handler
+
+
+def answer(handler, *responses):
+    handler.http_handler.download_request.side_effect = [
+        defer.succeed(
+            Response(
+                'http://0.0.0.0/oai2?verb=Identify',
+                status=status,
+                headers=headers,
+            )
+        )
+        for status, headers in responses
+    ]
+
+
+def test_download_request_strips_scheme_prefix(handler):
+    answer(handler, (200, {}))
+    request = Request('oaipmh+http://0.0.0.0/oai2?verb=Identify')
+
+    result = []
+    handler.download_request(request, spider=None).addCallback(result.append)
+
+    http_request = handler.http_handler.download_request.call_args[0][0]
+    assert http_request.url == 'http://0.0.0.0/oai2?verb=Identify'
+    assert result[0].url == request.url
+    assert result[0].status == 200
+
+
+def test_download_request_honours_retry_after(handler):
+    answer(handler, (503, {'Retry-After': '20'}), (200, {}))
+    request = Request('oaipmh+http://0.0.0.0/oai2?verb=Identify')
+
+    result = []
+    handler.download_request(request, spider=None).addCallback(result.append)
+
+    assert not result
+    handler.clock.advance(19)
+    assert not result
+    handler.clock.advance(1)
+    assert result[0].status == 200
+    assert handler.http_handler.download_request.call_count == 2
+
+
+def test_download_request_gives_up_after_max_retries(handler):
+    handler.max_retries = 1
+    answer(handler, (503, {}), (503, {}))
+    request = Request('oaipmh+http://0.0.0.0/oai2?verb=Identify')
+
+    result = []
+    handler.download_request(request, spider=None).addCallback(result.append)
+    handler.clock.advance(handler.default_retry_after)
+
+    assert result[0].status == 503
+    assert handler.http_handler.download_request.call_count == 2
+
+    # the retry middleware does not retry the 503 again
+    retry_middleware = RetryMiddleware(get_project_settings())
+    response = retry_middleware.process_response(
+        request,
+        result[0],
+        Spider('oaipmh'),
+    )
+    assert response is result[0]
+
+
+def test_download_request_leaves_other_errors_to_retry_middleware(handler):
+    answer(handler, (500, {}))
+    request = Request('oaipmh+http://0.0.0.0/oai2?verb=Identify')
+
+    result = []
+    handler.download_request(request, spider=None).addCallback(result.append)
+
+    assert result[0].status == 500
+    assert 'dont_retry' not in request.meta
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import io
+import os
+import time
+import zipfile
+
+import pytest
+from botocore.stub import Stubber
+from scrapy.crawler import Crawler
+from scrapy.exceptions import DontCloseSpider
+from scrapy.http import Request, Response
+from scrapy.spidermiddlewares.httperror import HttpError
+from scrapy.utils.project import get_project_settings
+from twisted.internet import defer
+from twisted.python.failure import Failure
+
+from hepcrawl.spiders import elsevier_spider
+from hepcrawl.spiders.elsevier_spider import (
+    ElsevierSpider,
+    iter_xml_files,
+    read_keys_cache,
+    write_keys_cache,
+)
+from hepcrawl.testlib.fixtures import get_test_suite_path
+
+ARTICLE = 'j.scib.2020.01.008.xml'
+ARTICLE_DOI = '10.1016/j.scib.2020.01.008'
+REJECTED_ARTICLE = 'record-that-shouldnt-be-harvested.xml'
+
+
+def read_article(file_name):
+    path = get_test_suite_path('responses', 'elsevier', file_name)
+    with io.open(path, encoding='utf-8') as fd:
+        return fd.read()
+
+
+def make_spider(**settings):
+    project_settings = get_project_settings()
+    project_settings.setdict(settings)
+    crawler = Crawler(spidercls=ElsevierSpider, settings=project_settings)
+    return ElsevierSpider.from_crawler(
+        crawler,
+        access_key_id='key',
+        secret_access_key='secret',
+        packages_bucket_name='packages',
+        files_bucket_name='articles',
+        elsevier_authorization_data_base64_encoded='',
+        elsevier_api_key='',
+        elsevier_consyn_url='http://example.org/consyn',
+        s3_host='http://localhost:4566',
+    )
+
+
+@pytest.fixture(autouse=True)
+def synchronous_threads(monkeypatch):
+    # run the S3 calls synchronously, without a reactor
+    monkeypatch.setattr(elsevier_spider.threads, 'deferToThread', defer.maybeDeferred)
+
+
+@pytest.fixture
+def spider():
+    return make_spider()
+
+
+@pytest.fixture
+def package():
+    """A zip package with an article, a document not to harvest, an image
+    and macOS metadata."""
+    article = read_article(ARTICLE)
+
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w', zipfile.ZIP_DEFLATED) as zip_package:
+        zip_package.writestr('package/', b'')
+        zip_package.writestr('package/article/' + ARTICLE, article.encode('utf-8'))
+        zip_package.writestr(
+            'package/rejected/' + REJECTED_ARTICLE,
+            read_article(REJECTED_ARTICLE).encode('utf-8'),
+        )
+        zip_package.writestr('package/article/figure.jpg', b'\xff\xd8')
+        zip_package.writestr('__MACOSX/package/article/._' + ARTICLE, b'\x00\x05')
+    return article, data.getvalue()
+
+
+def test_iter_xml_files(package):
+    article, data = package
+    with zipfile.ZipFile(io.BytesIO(data)) as zip_package:
+        xml_files = list(iter_xml_files(zip_package))
+
+    assert xml_files == [
+        ('package/article/' + ARTICLE, article),
+        ('package/rejected/' + REJECTED_ARTICLE, read_article(REJECTED_ARTICLE)),
+    ]
+
+
+def package_response(data):
+    return Response(
+        'http://example.org/package.zip',
+        body=data,
+        request=Request('http://example.org/package.zip', meta={'name': 'package.zip'}),
+    )
+
+
+def populate(spider, response):
+    results = []
+    spider.populate_s3_bucket_with_elsevier_package(response).addBoth(results.append)
+    return results[0]
+
+
+def test_populate_s3_bucket_with_elsevier_package(spider, package, monkeypatch):
+    article, data = package
+    uploads = []
+
+    def upload_file(file_name, bucket, key, config):
+        with io.open(file_name, 'rb') as fd:
+            uploads.append((fd.read(), bucket, key, config.multipart_chunksize))
+
+    monkeypatch.setattr(spider.s3_handler, 'upload_file', upload_file)
+    spider.existing_packages = set()
+    requests = list(populate(spider, package_response(data)))
+
+    assert uploads == [(data, 'packages', 'package.zip', 16 * 1024 * 1024)]
+    assert spider.existing_packages == {'package.zip'}
+    assert not spider.pending_uploads
+    assert len(requests) == 1
+    assert requests[0].method == 'PUT'
+    assert requests[0].meta['name'] == ARTICLE_DOI + '.xml'
+    assert requests[0].body == article.encode('utf-8')
+    assert spider.new_xml_files == {ARTICLE_DOI + '.xml'}
+
+
+def test_records_are_parsed_before_the_package_is_uploaded(spider, package, monkeypatch):
+    _, data = package
+    upload = defer.Deferred()
+    spooled = []
+
+    def defer_to_thread(function, *args):
+        if function != spider.s3_handler.upload_file:
+            return defer.maybeDeferred(function, *args)
+        spooled.append(args[0])
+        return upload
+
+    monkeypatch.setattr(elsevier_spider.threads, 'deferToThread', defer_to_thread)
+    requests = list(populate(spider, package_response(data)))
+    item = requests[0].meta['item']
+
+    assert item.record['dois'][0]['value'] == ARTICLE_DOI
+    assert spider.pending_uploads == {upload}
+    assert os.path.exists(spooled[0])
+    with pytest.raises(DontCloseSpider):
+        spider.keep_open_while_uploading()
+
+    released = []
+    record_upload = Response(requests[0].url, request=requests[0])
+    requests[0].callback(record_upload).addCallback(released.append)
+
+    assert released == []
+
+    upload.callback(None)
+
+    assert released == [item]
+    assert not spider.pending_uploads
+    assert not os.path.exists(spooled[0])
+    spider.keep_open_while_uploading()
+
+
+def test_record_is_passed_on_once_uploaded(spider, package, tmpdir):
+    _, data = package
+    package_path = tmpdir.join('package.zip')
+    package_path.write_binary(data)
+    upload = next(spider.unzip_zip_package_to_s3(str(package_path)))
+    response = Response(
+        'http://localhost:4566/articles/{}.xml'.format(ARTICLE_DOI),
+        request=upload,
+    )
+
+    item = upload.callback(response)
+
+    assert item is upload.meta['item']
+    assert item.record['dois'][0]['value'] == ARTICLE_DOI
+    assert item.record['documents'][0]['key'] == ARTICLE
+    assert item.file_urls == [item.record['documents'][0]['url']]
+
+
+def test_record_upload_failure(spider, package, tmpdir):
+    _, data = package
+    package_path = tmpdir.join('package.zip')
+    package_path.write_binary(data)
+    upload = next(spider.unzip_zip_package_to_s3(str(package_path)))
+    response = Response(upload.url, status=403, request=upload)
+    failure = Failure(HttpError(response))
+    failure.request = upload
+
+    upload.errback(failure)
+
+    assert spider.state['errors'] == [{
+        'exception': failure.value,
+        'traceback': failure.getTraceback(),
+        'sender': upload,
+    }]
+
+
+def test_populate_s3_bucket_with_elsevier_package_upload_failure(spider, package, monkeypatch):
+    _, data = package
+    spooled = []
+
+    def upload_file(file_name, bucket, key, config):
+        spooled.append(file_name)
+        raise IOError('S3 is down')
+
+    monkeypatch.setattr(spider.s3_handler, 'upload_file', upload_file)
+    spider.existing_packages = set()
+    response = package_response(data)
+    requests = list(populate(spider, response))
+
+    assert len(requests) == 1
+    assert not spider.existing_packages
+    assert not spider.pending_uploads
+    assert not os.path.exists(spooled[0])
+    [error] = spider.state['errors']
+    assert isinstance(error['exception'], IOError)
+    assert 'IOError' in error['traceback']
+    assert error['sender'] is response
+
+    # the package is harvested again next time, with its records
+    released = []
+    record_upload = Response(requests[0].url, request=requests[0])
+    requests[0].callback(record_upload).addCallback(released.append)
+
+    assert released == [None]
+
+
+def test_spooled_packages_are_removed_when_the_spider_closes(spider, package, monkeypatch):
+    _, data = package
+    spooled = []
+    upload = defer.Deferred()
+
+    def upload_file(file_name, bucket, key, config):
+        spooled.append(file_name)
+        return upload
+
+    monkeypatch.setattr(spider.s3_handler, 'upload_file', upload_file)
+    # the extraction never runs, e.g. the spider is closed meanwhile
+    populate(spider, package_response(data))
+
+    assert os.path.exists(spooled[0])
+
+    spider.closed('shutdown')
+
+    assert not os.path.exists(spooled[0])
+    assert not spider.spooled_packages
+
+    upload.callback(None)
+
+
+def test_unzip_zip_package_to_s3_removes_the_package(spider, package, tmpdir):
+    _, data = package
+    package_path = tmpdir.join('package.zip')
+    package_path.write_binary(data)
+
+    requests = list(spider.unzip_zip_package_to_s3(str(package_path)))
+
+    assert len(requests) == 1
+    assert not package_path.exists()
+
+
+def test_unzip_zip_package_to_s3_registers_parsing_errors(spider, package, tmpdir, monkeypatch):
+    _, data = package
+    package_path = tmpdir.join('package.zip')
+    package_path.write_binary(data)
+
+    def parse_record(parser, name):
+        raise ValueError('unexpected structure')
+
+    monkeypatch.setattr(spider, 'parse_record', parse_record)
+    requests = list(spider.unzip_zip_package_to_s3(str(package_path)))
+
+    assert requests == []
+    [error] = spider.state['errors']
+    assert isinstance(error['exception'], ValueError)
+    assert 'ValueError' in error['traceback']
+    assert error['sender'] == 'package/article/' + ARTICLE
+
+
+CONSYN_FEED = b"""<feed>
+<entry><title>old.zip</title><link href="http://example.org/old.zip"/></entry>
+<entry><title>new.ZIP</title><link href="http://example.org/new.ZIP"/></entry>
+<entry><title>notes.txt</title><link href="http://example.org/notes.txt"/></entry>
+</feed>"""
+
+
+def stub_bucket_listing(spider, pages):
+    stubber = Stubber(spider.s3_handler.s3_client)
+    for index, keys in enumerate(pages):
+        expected_params = {'Bucket': 'packages'}
+        response = {'Contents': [{'Key': key} for key in keys], 'KeyCount': len(keys)}
+        if index:
+            expected_params['ContinuationToken'] = str(index)
+        if index < len(pages) - 1:
+            response.update(IsTruncated=True, NextContinuationToken=str(index + 1))
+        stubber.add_response('list_objects_v2', response, expected_params)
+    stubber.activate()
+    return stubber
+
+
+def test_extract_packages_from_consyn_feed(spider):
+    stubber = stub_bucket_listing(spider, [['other.zip'], ['old.zip']])
+    results = []
+    spider.extract_packages_from_consyn_feed(
+        Response('http://example.org/consyn', body=CONSYN_FEED)
+    ).addBoth(results.append)
+    requests = list(results[0])
+
+    stubber.assert_no_pending_responses()
+    assert [request.url for request in requests] == ['http://example.org/new.ZIP']
+    assert requests[0].meta == {'name': 'new.ZIP'}
+    assert spider.existing_packages == {'other.zip', 'old.zip'}
+
+
+def test_list_existing_packages_uses_the_cache(tmpdir):
+    cache_path = str(tmpdir.join('packages.json'))
+    spider = make_spider(ELSEVIER_PACKAGES_CACHE_PATH=cache_path)
+    stubber = stub_bucket_listing(spider, [['old.zip']])
+
+    assert spider.list_existing_packages() == {'old.zip'}
+    # the second call would fail on an unexpected request to the bucket
+    assert spider.list_existing_packages() == {'old.zip'}
+    stubber.assert_no_pending_responses()
+
+    listed_at = spider.packages_listed_at
+    spider.existing_packages = {'old.zip'}
+    spider.add_existing_package('new.zip')
+
+    assert read_keys_cache(cache_path, 'packages', ttl=60) == ({'old.zip'}, listed_at)
+
+    spider.closed('finished')
+
+    assert read_keys_cache(cache_path, 'packages', ttl=60) == (
+        {'old.zip', 'new.zip'},
+        listed_at,
+    )
+
+
+def test_keys_cache_expires(tmpdir):
+    cache_path = str(tmpdir.join('packages.json'))
+    now = time.time()
+    write_keys_cache(cache_path, 'packages', {'old.zip'}, listed_at=now)
+
+    assert read_keys_cache(cache_path, 'packages', ttl=60) == ({'old.zip'}, now)
+    assert read_keys_cache(cache_path, 'other', ttl=60) is None
+    assert read_keys_cache(str(tmpdir.join('missing.json')), 'packages', ttl=60) is None
+
+    # updating the keys does not extend the validity of the listing
+    write_keys_cache(cache_path, 'packages', {'old.zip', 'new.zip'}, listed_at=now - 61)
+
+    assert read_keys_cache(cache_path, 'packages', ttl=60) is None
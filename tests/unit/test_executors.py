@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, division, print_function
+
+import json
+import os
+import time
+
+import pytest
+from lxml import etree
+from scrapy.crawler import Crawler
+from scrapy.http import Request, XmlResponse
+from scrapy.selector import Selector
+from scrapy.utils.project import get_project_settings
+from twisted.internet import defer
+from twisted.internet.task import Clock
+
+from hepcrawl import executors
+from hepcrawl.executors import ParsingExecutor, gather_results, parse_in_worker
+from hepcrawl.spiders.arxiv_spider import ArxivSpider
+from hepcrawl.spiders.common.oaipmh_spider import OAIRecord
+from hepcrawl.testlib.fixtures import get_test_suite_path
+
+
+def wait_for(deferred, timeout=60):
+    """Result of a deferred fired from the threads of the pool."""
+    results = []
+    deferred.addBoth(results.append)
+    deadline = time.time() + timeout
+    while not results:
+        assert time.time() < deadline, 'the pool did not answer'
+        time.sleep(0.01)
+    return results[0]
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    # without a running reactor, fire the deferreds from the pool threads
+    monkeypatch.setattr(
+        executors.reactor,
+        'callFromThread',
+        lambda func, *args: func(*args),
+    )
+    executor = ParsingExecutor(processes=1)
+    yield executor
+    executor.close()
+
+
+@pytest.fixture
+def arxiv_record():
+    tree = etree.parse(get_test_suite_path('responses', 'arxiv', 'sample_arxiv_record0.xml'))
+    return OAIRecord(tree.find('.//{http://www.openarchives.org/OAI/2.0/}record'))
+
+
+def arxiv_spider(processes, last_runs_path=None):
+    settings = get_project_settings()
+    settings.set('PARSING_PROCESSES', processes)
+    if last_runs_path:
+        settings.set('LAST_RUNS_PATH', last_runs_path)
+    crawler = Crawler(spidercls=ArxivSpider, settings=settings)
+    return ArxivSpider.from_crawler(crawler)
+
+
+def test_parse_in_worker_captures_errors():
+    item = parse_in_worker(int, 'record', 'hep', 'record.json', {})
+
+    assert item.record_format == 'hep'
+    assert item.file_name == 'record.json'
+    assert item.source_data == 'record'
+    assert item.exception.startswith('ValueError(')
+    assert 'invalid literal for int()' in item.exception
+    assert 'Traceback' in item.traceback
+
+
+def test_executor_without_processes_parses_inline():
+    executor = ParsingExecutor()
+
+    assert not executor
+    assert executor.parse(json.loads, '{"a": 1}') == {'a': 1}
+    assert executor._pool is None
+
+
+def test_executor_returns_deferred_items(executor):
+    deferred = executor.parse(json.loads, '{"a": 1}')
+
+    assert isinstance(deferred, defer.Deferred)
+    assert wait_for(deferred) == {'a': 1}
+
+
+def test_executor_captures_errors(executor):
+    item = wait_for(executor.parse(int, 'record', file_name='record.json'))
+
+    assert item.file_name == 'record.json'
+    assert item.exception.startswith('ValueError(')
+
+
+def test_executor_captures_unpicklable_items(executor):
+    item = wait_for(executor.parse(memoryview, b'record', file_name='record.xml'))
+
+    assert item.file_name == 'record.xml'
+    assert item.exception.startswith('TypeError(')
+    assert 'memoryview' in item.exception
+
+
+def test_executor_captures_unpicklable_records(executor):
+    item = executor.parse(json.loads, memoryview(b'{}')).result
+
+    assert item.exception.startswith('TypeError(')
+
+
+def test_executor_times_out_records_of_killed_workers(executor, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(executors.reactor, 'callLater', clock.callLater)
+    executor.timeout = 10
+    worker, = executor.pool._pool
+
+    deferred = executor.parse(os._exit, 1, file_name='record.xml')
+    deadline = time.time() + 60
+    while worker.is_alive():
+        assert time.time() < deadline, 'the worker was not killed'
+        time.sleep(0.01)
+
+    assert not deferred.called
+
+    clock.advance(10)
+    item = deferred.result
+
+    assert item.file_name == 'record.xml'
+    assert item.exception.startswith('ParsingTimeout(')
+    assert executor._pending == {}
+    assert wait_for(executor.parse(json.loads, '{"a": 1}')) == {'a': 1}
+    assert not clock.getDelayedCalls()
+
+
+def test_executor_fails_records_left_when_closed(executor):
+    executor.pool
+    deferred = defer.Deferred()
+    executor._pending[deferred] = (None, ('record', 'hep', 'record.xml'))
+
+    executor.close()
+
+    assert deferred.result.exception.startswith('ParsingTimeout(')
+
+
+def test_spider_parses_records_in_pool(executor, arxiv_record):
+    inline = arxiv_spider(processes=0)
+    pooled = arxiv_spider(processes=1)
+    pooled._parsing_executor = executor
+
+    expected = inline._parse_record(arxiv_record)
+    deferred = pooled._parse_record(arxiv_record)
+
+    assert isinstance(deferred, defer.Deferred)
+    assert wait_for(deferred) == expected
+
+
+def test_spider_without_processes_parses_inline(arxiv_record):
+    spider = arxiv_spider(processes=0)
+    item = spider._parse_record(arxiv_record)
+
+    assert item == spider.parse_record(Selector(root=arxiv_record.xml, type='xml'))
+    assert spider.parsing_executor.processes == 0
+
+
+def test_gather_results():
+    request = Request('http://example.org')
+    crawled = []
+
+    def results():
+        yield defer.succeed(1)
+        yield request
+        yield 2
+
+    deferred = gather_results(results(), crawl=crawled.append)
+
+    assert crawled == [request]
+    assert list(wait_for(deferred)) == [1, 2]
+
+
+def test_gather_results_without_crawl_returns_requests():
+    request = Request('http://example.org')
+
+    def results():
+        yield defer.succeed(1)
+        yield request
+
+    outputs = list(wait_for(gather_results(results())))
+
+    assert outputs == [1, request]
+
+
+def test_pooled_oaipmh_requests_skip_the_spider_middlewares(
+    executor, monkeypatch, tmpdir
+):
+    spider = arxiv_spider(processes=1, last_runs_path=str(tmpdir))
+    spider._parsing_executor = executor
+    crawled = []
+    monkeypatch.setattr(spider, '_crawl', crawled.append)
+    spider._start_harvest('physics:hep-th', set_='physics:hep-th')
+    request = spider._list_request(
+        params={'metadataPrefix': 'arXiv', 'set': 'physics:hep-th'},
+        set_='physics:hep-th',
+    )
+    spider._schedule(request)
+    with open(get_test_suite_path('responses', 'arxiv', 'sample_arxiv_record0.xml')) as f:
+        body = f.read().replace('<GetRecord>', '<ListRecords>').replace(
+            '</GetRecord>',
+            '<resumptionToken>token-2</resumptionToken></ListRecords>',
+        )
+    response = XmlResponse(request.url, request=request, body=body.encode('utf-8'))
+
+    outputs = list(wait_for(spider.parse(response)))
+
+    assert [next_request.meta['page'] for next_request in crawled] == [1]
+    assert outputs
+    assert not any(isinstance(output, Request) for output in outputs)
+
+
+def test_gather_results_reraises_errors_after_outputs():
+    def results():
+        yield 1
+        raise ValueError('failed')
+
+    outputs = wait_for(gather_results(results()))
+
+    assert next(outputs) == 1
+    with pytest.raises(ValueError):
+        next(outputs)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, division, print_function
+
+import os
+
+import pytest
+from scrapy.settings import Settings
+
+from hepcrawl.spiders.common.identifier_index import (
+    BloomFilterIndex,
+    DatestampIndex,
+    IdentifierSet,
+    make_identifier_index,
+)
+
+
+def test_identifier_set():
+    index = IdentifierSet()
+    index.add('oai:arXiv.org:1801.00001')
+
+    assert 'oai:arXiv.org:1801.00001' in index
+    assert 'oai:arXiv.org:1801.00002' not in index
+    assert len(index) == 1
+
+
+@pytest.mark.parametrize('false_positives', ['skip', 'verify'])
+def test_bloom_filter_index(false_positives):
+    index = BloomFilterIndex(
+        capacity=1000,
+        error_rate=0.01,
+        false_positives=false_positives,
+    )
+    identifiers = ['oai:arXiv.org:1801.%05d' % number for number in range(1000)]
+    for identifier in identifiers:
+        index.add(identifier)
+
+    assert all(identifier in index for identifier in identifiers)
+    assert len(index) == 1000
+    assert len(index._filter) <= 1000 * 2
+    index.close()
+
+
+def test_bloom_filter_index_verifies_false_positives():
+    index = BloomFilterIndex(capacity=10, error_rate=0.5)
+    index.add('oai:arXiv.org:1801.00001')
+    index._filter[:] = b'\xff' * len(index._filter)
+    path = index._path
+
+    assert 'oai:arXiv.org:1801.00001' in index
+    assert 'oai:arXiv.org:1801.00002' not in index
+
+    index.close()
+    assert not os.path.exists(path)
+
+
+def test_make_identifier_index():
+    assert isinstance(make_identifier_index(Settings()), IdentifierSet)
+
+    index = make_identifier_index(
+        Settings({
+            'OAIPMH_IDENTIFIER_INDEX': 'bloom',
+            'OAIPMH_IDENTIFIER_INDEX_CAPACITY': 100,
+            'OAIPMH_IDENTIFIER_INDEX_FALSE_POSITIVES': 'skip',
+        })
+    )
+    assert isinstance(index, BloomFilterIndex)
+    assert index.false_positives == 'skip'
+
+    with pytest.raises(ValueError):
+        make_identifier_index(Settings({'OAIPMH_IDENTIFIER_INDEX': 'dict'}))
+
+
+def test_datestamp_index_is_persistent(tmpdir):
+    path = str(tmpdir.join('last_runs', 'datestamps.sqlite'))
+    index = DatestampIndex(path)
+    index['oai:arXiv.org:1801.00001'] = '2018-01-01'
+    index.close()
+
+    index = DatestampIndex(path)
+
+    assert len(index) == 1
+    assert not index.changed('oai:arXiv.org:1801.00001', '2018-01-01')
+    assert index.changed('oai:arXiv.org:1801.00001', '2018-01-02')
+    assert index.changed('oai:arXiv.org:1801.00002', '2018-01-01')
+    index.close()
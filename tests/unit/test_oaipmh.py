@@ -7,13 +7,20 @@
 # under the terms of the Revised BSD License; see LICENSE file for
 # more details.
 
+import os
 from datetime import datetime
-from mock import patch
+from mock import Mock, patch
 import pytest
 
+from hepcrawl.signals import results_checkpoint
 from hepcrawl.spiders.common.oaipmh_spider import OAIPMHSpider
 from hepcrawl.spiders.common.lastrunstore_spider import NoLastRunToLoad
 from hepcrawl.testlib.fixtures import clean_dir
+from scrapy import signals
+from scrapy.crawler import Crawler
+from scrapy.http import XmlResponse
+from twisted.internet import defer
+from twisted.python.failure import Failure
 from scrapy.utils.project import get_project_settings
 
 
@@ -76,6 +83,7 @@ def test_load_last_run(spider, cleanup):
         'until_date': None,
         'last_run_started_at': now.isoformat(),
         'last_run_finished_at': '2017-12-08T13:55:00.000000',
+        'last_record_datestamp': None,
     })
 
     result = override_dynamic_fields(spider._load_last_run('physics:hep-th'))
@@ -91,3 +99,780 @@ def test_load_last_run_nonexistent(spider):
 def test_resume_from_nonexistent_no_error(spider):
     resume_from = spider.resume_from('physics:hep-th')
     assert resume_from is None
+
+
+def oai_page(identifiers, resumption_token=None):
+    records = ''.join(
+        '<record><header><identifier>{}</identifier>'
+        '<datestamp>2017-12-08</datestamp></header>'
+        '<metadata><dc/></metadata></record>'.format(identifier)
+        for identifier in identifiers
+    )
+    token = ''
+    if resumption_token is not None:
+        token = '<resumptionToken>{}</resumptionToken>'.format(
+            resumption_token
+        )
+    return (
+        '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">'
+        '<ListRecords>{}{}</ListRecords></OAI-PMH>'.format(records, token)
+    )
+
+
+@pytest.fixture
+def list_spider(spider):
+    spider.parse_record = lambda selector: selector.xpath(
+        './/*[local-name()="identifier"]/text()'
+    ).extract_first()
+    spider.get_record_identifier = lambda record: record.header.identifier
+    yield spider
+
+
+def list_response(request, body):
+    return XmlResponse(request.url, request=request, body=body.encode("utf-8"))
+
+
+def first_list_request(spider, oai_set='physics:hep-th'):
+    params = {
+        'metadataPrefix': 'marcxml',
+        'set': oai_set,
+        'from': '2017-12-08',
+        'until': None,
+    }
+    spider._start_harvest(oai_set, set_=oai_set, started_at=datetime.utcnow())
+    request = spider._resumed_list_request(params=params, set_=oai_set)
+    spider._schedule(request)
+    return request
+
+
+def test_save_and_load_checkpoint(spider, cleanup):
+    params = {'set': 'physics:hep-th', 'from': '2017-12-08'}
+    spider._save_checkpoint(
+        set_='physics:hep-th',
+        params=params,
+        resumption_token='token-2',
+        page=1,
+    )
+
+    result = spider._load_checkpoint('physics:hep-th', params)
+
+    assert result['resumption_token'] == 'token-2'
+    assert result['page'] == 1
+
+
+def test_load_checkpoint_ignores_other_params(spider, cleanup):
+    spider._save_checkpoint(
+        set_='physics:hep-th',
+        params={'set': 'physics:hep-th', 'from': '2017-12-08'},
+        resumption_token='token-2',
+        page=1,
+    )
+
+    result = spider._load_checkpoint(
+        'physics:hep-th',
+        {'set': 'physics:hep-th', 'from': '2017-12-09'},
+    )
+
+    assert result is None
+
+
+def test_list_request(list_spider):
+    request = first_list_request(list_spider)
+
+    assert request.url == (
+        'oaipmh+http://0.0.0.0/oai2?from=2017-12-08&metadataPrefix=marcxml'
+        '&set=physics%3Ahep-th&verb=ListRecords'
+    )
+    assert request.meta['page'] == 0
+    assert not request.meta['crawl_once']
+
+
+def test_parse_list_follows_resumption_token(list_spider, cleanup):
+    request = first_list_request(list_spider)
+    response = list_response(request, oai_page(['oai:1', 'oai:2'], 'token-2'))
+
+    result = list(list_spider.parse(response))
+
+    next_request = result[0]
+    assert result[1:] == ['oai:1', 'oai:2']
+    assert next_request.url == (
+        'oaipmh+http://0.0.0.0/oai2?resumptionToken=token-2&verb=ListRecords'
+    )
+    assert next_request.meta['page'] == 1
+    checkpoint = list_spider._load_checkpoint(
+        'physics:hep-th',
+        request.meta['params'],
+    )
+    assert checkpoint['resumption_token'] == 'token-2'
+    assert checkpoint['page'] == 1
+    with pytest.raises(NoLastRunToLoad):
+        list_spider._load_last_run('physics:hep-th')
+
+    response = list_response(next_request, oai_page(['oai:3']))
+    result = list(list_spider.parse(response))
+
+    assert result == ['oai:3']
+    assert not os.path.exists(
+        list_spider._checkpoint_file_path('physics:hep-th')
+    )
+    assert list_spider._load_last_run('physics:hep-th')
+
+
+def test_parse_list_no_records_match(list_spider, cleanup):
+    request = first_list_request(list_spider)
+    response = list_response(
+        request,
+        '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">'
+        '<error code="noRecordsMatch">No records</error></OAI-PMH>',
+    )
+
+    result = list(list_spider.parse(response))
+
+    assert result == []
+    assert list_spider._load_last_run('physics:hep-th')
+
+
+def test_resumed_list_request_from_checkpoint(list_spider, cleanup):
+    params = first_list_request(list_spider).meta['params']
+    list_spider._save_checkpoint(
+        set_='physics:hep-th',
+        params=params,
+        resumption_token='token-2',
+        page=1,
+    )
+
+    request = first_list_request(list_spider)
+
+    assert 'resumptionToken=token-2' in request.url
+    assert request.meta['page'] == 1
+    assert request.meta['resumed']
+
+
+def test_parse_list_restarts_on_expired_checkpoint(list_spider, cleanup):
+    params = first_list_request(list_spider).meta['params']
+    list_spider._save_checkpoint(
+        set_='physics:hep-th',
+        params=params,
+        resumption_token='token-2',
+        page=1,
+    )
+    request = first_list_request(list_spider)
+    response = list_response(
+        request,
+        '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">'
+        '<error code="badResumptionToken">Expired</error></OAI-PMH>',
+    )
+
+    result = list(list_spider.parse(response))
+
+    assert len(result) == 1
+    assert 'resumptionToken' not in result[0].url
+    assert result[0].meta['page'] == 0
+    assert list_spider._load_checkpoint('physics:hep-th', params) is None
+
+
+def test_start_requests_limits_concurrent_requests(list_spider, cleanup):
+    list_spider.sets = ['set-%s' % number for number in range(6)]
+
+    result = list(list_spider.start_requests())
+
+    assert [request.meta['set'] for request in result] == [
+        'set-0', 'set-1', 'set-2', 'set-3',
+    ]
+    assert len(list_spider._queued_requests) == 2
+
+    response = list_response(result[0], oai_page(['oai:1'], 'token-2'))
+    result = list(list_spider.parse(response))
+
+    assert result[0].meta['set'] == 'set-4'
+    assert result[1] == 'oai:1'
+    assert [request.meta['set'] for request in list_spider._queued_requests] == [
+        'set-5', 'set-0',
+    ]
+
+
+def test_sets_save_their_own_last_run(list_spider, cleanup):
+    list_spider.sets = ['physics:hep-th', 'physics:hep-ex']
+    hep_th, hep_ex = list(list_spider.start_requests())
+
+    list(list_spider.parse(list_response(hep_ex, oai_page(['oai:1', 'oai:2']))))
+
+    assert list_spider._load_last_run('physics:hep-ex')
+    with pytest.raises(NoLastRunToLoad):
+        list_spider._load_last_run('physics:hep-th')
+
+    result = list(
+        list_spider.parse(list_response(hep_th, oai_page(['oai:2', 'oai:3'])))
+    )
+
+    assert result == ['oai:3']
+    assert list_spider._load_last_run('physics:hep-th')
+
+
+def test_failed_request_does_not_save_last_run(list_spider, cleanup):
+    list_spider.sets = ['physics:hep-th']
+    request = list(list_spider.start_requests())[0]
+    failure = Failure(IOError('Connection lost'))
+    failure.request = request
+
+    with pytest.raises(IOError):
+        list(list_spider.harvest_failed(failure))
+
+    assert list_spider._active_requests == 0
+    assert list_spider._harvests == {}
+    with pytest.raises(NoLastRunToLoad):
+        list_spider._load_last_run('physics:hep-th')
+
+
+def test_dropped_request_frees_its_slot(list_spider, cleanup, settings):
+    settings.set('OAIPMH_CONCURRENT_REQUESTS', 1)
+    list_spider.sets = ['physics:hep-th', 'physics:hep-ex']
+    crawled = []
+    list_spider._crawl = crawled.append
+    request = list(list_spider.start_requests())[0]
+
+    assert request.dont_filter
+
+    list_spider.request_dropped(request, list_spider)
+
+    assert [queued.meta['set'] for queued in crawled] == ['physics:hep-ex']
+    assert list_spider._active_requests == 1
+    assert 'physics:hep-th' not in list_spider._harvests
+    with pytest.raises(NoLastRunToLoad):
+        list_spider._load_last_run('physics:hep-th')
+
+
+def test_sharded_harvest_saves_last_run_after_all_windows(list_spider, cleanup):
+    list_spider.sets = ['physics:hep-th']
+    list_spider.from_date = '2017-12-01'
+    list_spider.until_date = '2017-12-09'
+    list_spider.shards = 3
+
+    result = list(list_spider.start_requests())
+
+    assert [request.meta['window'] for request in result] == [
+        ('2017-12-01', '2017-12-03'),
+        ('2017-12-04', '2017-12-06'),
+        ('2017-12-07', '2017-12-09'),
+    ]
+    assert 'from=2017-12-04&' in result[1].url
+    assert 'until=2017-12-06&' in result[1].url
+
+    for request in result[:2]:
+        list(list_spider.parse(list_response(request, oai_page(['oai:1']))))
+
+    with pytest.raises(NoLastRunToLoad):
+        list_spider._load_last_run('physics:hep-th')
+
+    list(list_spider.parse(list_response(result[2], oai_page(['oai:2']))))
+
+    assert list_spider._load_last_run('physics:hep-th')
+    assert not any(
+        list_spider._window_harvested('physics:hep-th', request.meta['window'])
+        for request in result
+    )
+
+
+def test_shard_harvests_one_window(list_spider, cleanup):
+    list_spider.sets = ['physics:hep-th']
+    list_spider.from_date = '2017-12-01'
+    list_spider.until_date = '2017-12-09'
+    list_spider.shards = 3
+    list_spider.shard = 1
+    list_spider._save_window_harvested(
+        'physics:hep-th',
+        ('2017-12-01', '2017-12-03'),
+    )
+
+    result = list(list_spider.start_requests())
+
+    assert len(result) == 1
+    assert result[0].meta['window'] == ('2017-12-04', '2017-12-06')
+
+    list(list_spider.parse(list_response(result[0], oai_page(['oai:1']))))
+
+    assert list_spider._window_harvested(
+        'physics:hep-th',
+        ('2017-12-04', '2017-12-06'),
+    )
+    with pytest.raises(NoLastRunToLoad):
+        list_spider._load_last_run('physics:hep-th')
+
+    list_spider.shard = 2
+    request = list(list_spider.start_requests())[0]
+    list(list_spider.parse(list_response(request, oai_page(['oai:2']))))
+
+    assert list_spider._load_last_run('physics:hep-th')
+
+
+def test_shard_requires_until_date(spider, settings):
+    with pytest.raises(ValueError):
+        type(spider)('http://0.0.0.0/oai2', shards=3, shard=1, settings=settings)
+
+
+def oai_identifiers_page(headers, resumption_token=None, deleted=()):
+    token = ''
+    if resumption_token is not None:
+        token = '<resumptionToken>{}</resumptionToken>'.format(
+            resumption_token
+        )
+    return (
+        '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">'
+        '<ListIdentifiers>{}{}</ListIdentifiers></OAI-PMH>'.format(
+            ''.join(
+                '<header{}><identifier>{}</identifier>'
+                '<datestamp>{}</datestamp></header>'.format(
+                    ' status="deleted"' if header[0] in deleted else '',
+                    *header
+                )
+                for header in headers
+            ),
+            token,
+        )
+    )
+
+
+def oai_get_record(identifier):
+    return (
+        '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">'
+        '<GetRecord><record><header><identifier>{}</identifier>'
+        '<datestamp>2017-12-09</datestamp></header>'
+        '<metadata><dc/></metadata></record></GetRecord>'
+        '</OAI-PMH>'.format(identifier)
+    )
+
+
+def test_changed_only_fetches_new_and_changed_records(list_spider, cleanup):
+    list_spider.changed_only = True
+    list_spider._datestamps['oai:1'] = '2017-12-01'
+    list_spider._datestamps['oai:2'] = '2017-12-01'
+    request = first_list_request(list_spider)
+
+    assert 'verb=ListIdentifiers' in request.url
+
+    response = list_response(
+        request,
+        oai_identifiers_page([
+            ('oai:1', '2017-12-01'),
+            ('oai:2', '2017-12-09'),
+            ('oai:3', '2017-12-09'),
+            ('oai:4', '2017-12-09'),
+        ], deleted=['oai:4']),
+    )
+    result = list(list_spider.parse(response))
+
+    assert [request.meta['identifier'] for request in result] == [
+        'oai:2', 'oai:3',
+    ]
+    assert 'verb=GetRecord' in result[0].url
+    with pytest.raises(NoLastRunToLoad):
+        list_spider._load_last_run('physics:hep-th')
+
+    for get_record in result:
+        identifier = get_record.meta['identifier']
+        response = list_response(get_record, oai_get_record(identifier))
+        assert list(list_spider.parse(response)) == [identifier]
+
+    assert list_spider._datestamps.get('oai:3') == '2017-12-09'
+    assert list_spider._load_last_run('physics:hep-th')
+
+
+def test_list_records_fills_the_datestamps_index(list_spider, cleanup, settings):
+    settings.set('OAIPMH_DATESTAMPS_INDEX', True)
+    request = first_list_request(list_spider)
+
+    list(list_spider.parse(list_response(request, oai_page(['oai:1']))))
+
+    assert list_spider._datestamps.get('oai:1') == '2017-12-08'
+
+
+def test_list_records_without_datestamps_index(list_spider, cleanup):
+    request = first_list_request(list_spider)
+
+    list(list_spider.parse(list_response(request, oai_page(['oai:1']))))
+
+    assert list_spider._datestamp_index is None
+
+
+def test_records_failing_to_parse_are_harvested_again(
+    list_spider, cleanup, settings
+):
+    def parse_record(selector):
+        raise ValueError('Cannot parse')
+
+    list_spider.changed_only = True
+    list_spider._datestamps['oai:1'] = '2017-12-01'
+    list_spider.parse_record = parse_record
+    request = first_list_request(list_spider)
+    get_record, = list(list_spider.parse(list_response(
+        request,
+        oai_identifiers_page([('oai:1', '2017-12-09')]),
+    )))
+
+    result = list(list_spider.parse(
+        list_response(get_record, oai_get_record('oai:1'))
+    ))
+
+    assert result == []
+    assert list_spider._datestamps.get('oai:1') == '2017-12-01'
+    list_spider.closed('finished')
+
+    next_spider = type(list_spider)('http://0.0.0.0/oai2', settings=settings)
+    next_spider.format = list_spider.format
+    next_spider.from_date = list_spider.from_date
+    next_spider.changed_only = True
+    next_spider.get_record_identifier = list_spider.get_record_identifier
+    request = first_list_request(next_spider)
+    get_record, = list(next_spider.parse(list_response(
+        request,
+        oai_identifiers_page([('oai:1', '2017-12-09')]),
+    )))
+
+    assert get_record.meta['identifier'] == 'oai:1'
+    next_spider.closed('finished')
+
+
+def test_changed_only_lists_records_without_datestamps(list_spider, cleanup):
+    list_spider.sets = ['physics:hep-th']
+    list_spider.changed_only = True
+
+    request = list(list_spider.start_requests())[0]
+
+    assert 'verb=ListRecords' in request.url
+    assert not list_spider.changed_only
+
+
+def test_get_identifiers(tmpdir):
+    identifiers_file = tmpdir.join('identifiers.txt')
+    identifiers_file.write('oai:2\n\noai:3\noai:1\n')
+
+    result = OAIPMHSpider._get_identifiers(
+        'oai:1,oai:2',
+        str(identifiers_file),
+    )
+
+    assert result == ['oai:1', 'oai:2', 'oai:3']
+
+
+def test_start_requests_single_fetches_records_concurrently(list_spider):
+    list_spider.identifiers = ['oai:%s' % number for number in range(6)]
+
+    result = list(list_spider.start_requests())
+
+    assert [request.meta['identifier'] for request in result] == [
+        'oai:0', 'oai:1', 'oai:2', 'oai:3',
+    ]
+    assert 'verb=GetRecord' in result[0].url
+
+    response = list_response(result[0], oai_get_record('oai:0'))
+    result = list(list_spider.parse(response))
+
+    assert result[0] == 'oai:0'
+    assert result[1].meta['identifier'] == 'oai:4'
+    assert set(list_spider._harvests) == {
+        'oai:1', 'oai:2', 'oai:3', 'oai:4', 'oai:5',
+    }
+
+
+def test_resume_from_last_record_datestamp(spider, cleanup):
+    spider.save_run(
+        started_at=datetime.utcnow(),
+        set_='physics:hep-th',
+        last_datestamp='2017-12-08T10:20:30Z',
+    )
+
+    assert spider.resume_from('physics:hep-th', precise=True) == (
+        '2017-12-08T10:20:30Z'
+    )
+    assert spider.resume_from('physics:hep-th') == (
+        datetime.utcnow().strftime('%Y-%m-%d')
+    )
+
+
+def test_last_run_stores_last_record_datestamp(list_spider, cleanup):
+    request = first_list_request(list_spider)
+    body = oai_page(['oai:1', 'oai:2']).replace(
+        '2017-12-08</datestamp></header><metadata><dc/></metadata></record>'
+        '</ListRecords>',
+        '2017-12-08T10:20:30Z</datestamp></header>'
+        '<metadata><dc/></metadata></record></ListRecords>',
+    )
+
+    list(list_spider.parse(list_response(request, body)))
+
+    assert list_spider.last_record_datestamp('physics:hep-th') == (
+        '2017-12-08T10:20:30Z'
+    )
+
+
+def test_resume_with_identify_granularity(list_spider, cleanup):
+    list_spider.save_run(
+        started_at=datetime.utcnow(),
+        set_='physics:hep-th',
+        last_datestamp='2017-12-08T10:20:30Z',
+    )
+    list_spider.from_date = None
+    list_spider.until_date = '2017-12-09'
+    list_spider.sets = ['physics:hep-th']
+
+    identify, = list(list_spider.start_requests())
+
+    assert identify.url == 'oaipmh+http://0.0.0.0/oai2?verb=Identify'
+
+    response = list_response(
+        identify,
+        '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/"><Identify>'
+        '<granularity>YYYY-MM-DDThh:mm:ssZ</granularity>'
+        '</Identify></OAI-PMH>',
+    )
+    request, = list(list_spider.parse_identify(response))
+
+    assert request.meta['params']['from'] == '2017-12-08T10:20:30Z'
+    assert request.meta['params']['until'] == '2017-12-09T23:59:59Z'
+
+
+def test_resume_from_day_if_identify_fails(list_spider, cleanup):
+    list_spider.save_run(
+        started_at=datetime.utcnow(),
+        set_='physics:hep-th',
+        last_datestamp='2017-12-08T10:20:30Z',
+    )
+    list_spider.from_date = None
+    list_spider.sets = ['physics:hep-th']
+    identify, = list(list_spider.start_requests())
+    failure = Failure(IOError('Connection lost'))
+    failure.request = identify
+
+    request, = list(list_spider.identify_failed(failure))
+
+    assert request.meta['params']['from'] == datetime.utcnow().strftime(
+        '%Y-%m-%d'
+    )
+
+
+def test_parse_record_gets_the_parsed_record_element(list_spider, cleanup):
+    list_spider.parse_record = lambda selector: selector.root
+    request = first_list_request(list_spider)
+
+    record, = list(list_spider.parse(list_response(request, oai_page(['oai:1']))))
+
+    assert record.tag == '{http://www.openarchives.org/OAI/2.0/}record'
+    assert record.getparent().tag == (
+        '{http://www.openarchives.org/OAI/2.0/}ListRecords'
+    )
+
+
+class PendingParsingExecutor(object):
+    """Parsing executor whose parses are finished by the tests."""
+    processes = 1
+
+    def __init__(self):
+        self.parses = []
+
+    def __bool__(self):
+        return True
+
+    __nonzero__ = __bool__
+
+    def parse(self, func, raw_record, **kwargs):
+        deferred = defer.Deferred()
+        self.parses.append(deferred)
+        return deferred
+
+    def finish(self):
+        parses, self.parses = self.parses, []
+        for deferred in parses:
+            deferred.callback('parsed')
+
+
+def test_pooled_parses_hold_the_checkpoint_and_last_run(list_spider, cleanup):
+    list_spider.sets = ['physics:hep-th']
+    executor = list_spider._parsing_executor = PendingParsingExecutor()
+    list_spider.get_record_parser = lambda: (None, {})
+    crawled = []
+    list_spider._crawl = crawled.append
+    request = list(list_spider.start_requests())[0]
+    params = request.meta['params']
+
+    list_spider.parse(list_response(request, oai_page(['oai:1'], 'token-2')))
+
+    assert [next_request.meta['page'] for next_request in crawled] == [1]
+    assert list_spider._load_checkpoint('physics:hep-th', params) is None
+
+    executor.finish()
+
+    assert list_spider._load_checkpoint('physics:hep-th', params)['page'] == 1
+
+    list_spider.parse(list_response(crawled[0], oai_page(['oai:2'])))
+
+    assert list_spider._load_checkpoint('physics:hep-th', params)
+    with pytest.raises(NoLastRunToLoad):
+        list_spider._load_last_run('physics:hep-th')
+
+    executor.finish()
+
+    assert list_spider._load_checkpoint('physics:hep-th', params) is None
+    assert list_spider._load_last_run('physics:hep-th')
+    assert list_spider._harvests == {}
+
+
+def test_parse_list_prefetches_one_page(list_spider, cleanup):
+    request = first_list_request(list_spider)
+    first_page = list_spider.parse(
+        list_response(request, oai_page(['oai:1', 'oai:2'], 'token-2'))
+    )
+
+    second_request = next(first_page)
+    assert 'resumptionToken=token-2' in second_request.url
+    assert next(first_page) == 'oai:1'
+
+    # the first page is still being parsed, the third page is only
+    # requested once the records of the second one are parsed
+    second_page = list(list_spider.parse(
+        list_response(second_request, oai_page(['oai:3'], 'token-3'))
+    ))
+    assert second_page[0] == 'oai:3'
+    assert 'resumptionToken=token-3' in second_page[1].url
+    assert list_spider._load_checkpoint(
+        'physics:hep-th',
+        request.meta['params'],
+    ) is None
+
+    assert list(first_page) == ['oai:2']
+    checkpoint = list_spider._load_checkpoint(
+        'physics:hep-th',
+        request.meta['params'],
+    )
+    assert checkpoint['resumption_token'] == 'token-3'
+    assert checkpoint['page'] == 2
+
+
+def test_parse_list_records_progress_stats(list_spider, cleanup):
+    list_spider.crawler = Crawler(type(list_spider), list_spider.settings)
+    list_spider.crawler.stats.open_spider(list_spider)
+    request = first_list_request(list_spider)
+    body = oai_page(['oai:1'], 'token-2').replace(
+        '<resumptionToken>',
+        '<resumptionToken completeListSize="3" cursor="0">',
+    )
+
+    list(list_spider.parse(list_response(request, body)))
+
+    stats = list_spider.crawler.stats
+    assert stats.get_value(
+        'oaipmh/complete_list_size/physics:hep-th'
+    ) == 3
+    assert stats.get_value('oaipmh/cursor/physics:hep-th') == 0
+
+
+def crawling_spider(list_spider):
+    """Spider of a running crawl, whose items are only delivered when the
+    tests send the ``item_*`` signals."""
+    crawler = Crawler(type(list_spider), list_spider.settings)
+    crawler.engine = Mock()
+    spider = type(list_spider).from_crawler(crawler, 'http://0.0.0.0/oai2')
+    spider.from_date = list_spider.from_date
+    spider.format = list_spider.format
+    spider.sets = ['physics:hep-th']
+    spider.parse_record = lambda selector: {
+        'identifier': list_spider.parse_record(selector),
+    }
+    spider.get_record_identifier = list_spider.get_record_identifier
+    spider._crawl = Mock()
+    return spider
+
+
+def deliver(spider, item, response, signal=signals.item_scraped, **kwargs):
+    spider.crawler.signals.send_catch_log(
+        signal,
+        item=item,
+        response=response,
+        spider=spider,
+        **kwargs
+    )
+
+
+def test_checkpoint_and_last_run_wait_for_the_pipelines(list_spider, cleanup):
+    spider = crawling_spider(list_spider)
+    pushes = []
+
+    def push(spider):
+        pushes.append(spider)
+
+    spider.crawler.signals.connect(push, signal=results_checkpoint)
+    request = list(spider.start_requests())[0]
+    params = request.meta['params']
+    first_response = list_response(request, oai_page(['oai:1'], 'token-2'))
+
+    next_request, item = list(spider.parse(first_response))
+
+    assert spider._load_checkpoint('physics:hep-th', params) is None
+
+    deliver(spider, item, first_response)
+
+    assert pushes == [spider]
+    assert spider._load_checkpoint('physics:hep-th', params)['page'] == 1
+
+    last_response = list_response(next_request, oai_page(['oai:2']))
+    item, = list(spider.parse(last_response))
+
+    with pytest.raises(NoLastRunToLoad):
+        spider._load_last_run('physics:hep-th')
+
+    deliver(spider, item, last_response)
+
+    assert pushes == [spider, spider]
+    assert spider._load_last_run('physics:hep-th')
+    assert spider._load_checkpoint('physics:hep-th', params) is None
+    assert spider._harvests == {}
+
+
+def test_failed_items_hold_the_checkpoint_and_last_run(list_spider, cleanup):
+    spider = crawling_spider(list_spider)
+    request = list(spider.start_requests())[0]
+    params = request.meta['params']
+    first_response = list_response(request, oai_page(['oai:1'], 'token-2'))
+
+    next_request, item = list(spider.parse(first_response))
+    deliver(
+        spider,
+        item,
+        first_response,
+        signal=signals.item_error,
+        failure=Failure(IOError('Connection lost')),
+    )
+
+    assert spider._load_checkpoint('physics:hep-th', params) is None
+
+    last_response = list_response(next_request, oai_page(['oai:2']))
+    item, = list(spider.parse(last_response))
+    deliver(spider, item, last_response)
+
+    assert spider._harvests == {}
+    with pytest.raises(NoLastRunToLoad):
+        spider._load_last_run('physics:hep-th')
+
+
+def test_failed_push_holds_the_checkpoint(list_spider, cleanup):
+    spider = crawling_spider(list_spider)
+
+    def failed_push(spider):
+        raise IOError('Connection lost')
+
+    spider.crawler.signals.connect(failed_push, signal=results_checkpoint)
+    request = list(spider.start_requests())[0]
+    params = request.meta['params']
+    first_response = list_response(request, oai_page(['oai:1'], 'token-2'))
+
+    next_request, item = list(spider.parse(first_response))
+    deliver(spider, item, first_response)
+
+    assert spider._load_checkpoint('physics:hep-th', params) is None
+
+    spider.crawler.signals.disconnect(failed_push, signal=results_checkpoint)
+    last_response = list_response(next_request, oai_page(['oai:2']))
+    item, = list(spider.parse(last_response))
+    deliver(spider, item, last_response)
+
+    with pytest.raises(NoLastRunToLoad):
+        spider._load_last_run('physics:hep-th')
@@ -7,7 +7,14 @@
 # under the terms of the Revised BSD License; see LICENSE file for
 # more details.
 
+from lxml import etree
+from scrapy.selector import Selector
+
 from hepcrawl.parsers.arxiv import ArxivParser
+from hepcrawl.testlib.fixtures import (
+    fake_response_from_file,
+    get_test_suite_path,
+)
 
 
 def test_latex_to_unicode_handles_arxiv_escape_sequences():
@@ -64,3 +71,40 @@ def test_latex_to_unicode_preserves_spacing_after_macros():
     result = ArxivParser.latex_to_unicode(u"and D\\O Experiments")
 
     assert result == expected
+
+
+def test_latex_to_unicode_skips_strings_without_latex():
+    misses = ArxivParser.latex_cache.misses
+
+    assert ArxivParser.latex_to_unicode(u"10 pages,  5 figures") == u"10 pages, 5 figures"
+    assert ArxivParser.latex_to_unicode(u" \n") == u""
+    assert ArxivParser.latex_cache.misses == misses
+
+
+def test_latex_to_unicode_caches_conversions():
+    latex = u"Search for $\\tau$ decays in D\\O"
+    ArxivParser.latex_to_unicode(latex)
+    hits = ArxivParser.latex_cache.hits
+
+    assert ArxivParser.latex_to_unicode(latex) == u"Search for $\\tau$ decays in DØ"
+    assert ArxivParser.latex_cache.hits == hits + 1
+
+
+def test_parse_namespaced_record_without_modifying_it():
+    record_file = get_test_suite_path(
+        'responses',
+        'arxiv',
+        'sample_arxiv_record10.xml',
+        test_suite='unit',
+    )
+    with open(record_file, 'rb') as f:
+        tree = etree.fromstring(f.read())
+    record = tree.find('.//{http://www.openarchives.org/OAI/2.0/}record')
+    html_record = fake_response_from_file(
+        'arxiv/sample_arxiv_record10.xml'
+    ).xpath('.//record')[0]
+
+    result = ArxivParser(Selector(root=record, type='xml')).parse()
+
+    assert result == ArxivParser(html_record).parse()
+    assert record.find('.//{http://arxiv.org/OAI/arXiv/}title') is not None
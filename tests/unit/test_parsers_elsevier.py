@@ -21,6 +21,7 @@ import six
 
 from deepdiff import DeepDiff
 from inspire_schemas.utils import validate
+from hepcrawl.testlib.benchmarks import elsevier_collaboration_records
 from hepcrawl.testlib.fixtures import get_test_suite_path
 from hepcrawl.parsers.elsevier import ElsevierParser
 
@@ -208,3 +209,17 @@ def test_dois_should_be_taken_from_simple_article_too():
         }
     ]
     assert result['dois'] == expected_dois
+
+
+def test_authors_affiliations_of_large_collaboration():
+    record = elsevier_collaboration_records(authors=30, affiliations=20)[0]
+    parser = ElsevierParser(record)
+    authors = parser.parse()['authors']
+
+    assert len(authors) == 30
+    assert authors[25]['full_name'] == 'Author 25, Yingkang'
+    assert [aff['value'] for aff in authors[25]['raw_affiliations']] == [
+        'Institute 5',
+        'Institute 6',
+    ]
+    assert len(parser.get_affiliations_by_id(parser.root)) == 20
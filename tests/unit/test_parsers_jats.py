@@ -145,3 +145,16 @@ def test_journal_title_physcis_is_converted_to_aps_physics():
     result = parser.parse()
     assert result['publication_info'][0]['journal_title'] == "APS Physics"
 
+
+
+def test_author_affiliations_keep_the_order_of_the_references():
+    parser = get_parser_by_file("PhysRevD.102.014505.xml")
+    result = parser.parse()
+    affiliations = [
+        affiliation['value'] for affiliation in result['authors'][1]['raw_affiliations']
+    ]
+
+    assert affiliations == [
+        'Department of Physics, University of Turin and INFN, Turin, Via Pietro Giuria 1, I-10125 Turin, Italy',
+        'SISSA and INFN, Sezione di Trieste, Via Bonomea 265, 34136 Trieste, Italy',
+    ]
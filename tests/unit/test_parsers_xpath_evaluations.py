@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+"""Count the XPath evaluations needed to parse a record."""
+
+from __future__ import absolute_import, division, print_function
+
+import pytest
+
+from hepcrawl.parsers import ArxivParser, ElsevierParser, JatsParser
+from hepcrawl.testlib.benchmarks import (
+    arxiv_records,
+    elsevier_collaboration_records,
+    elsevier_records,
+    jats_collaboration_records,
+    jats_records,
+)
+from hepcrawl.utils import cached_property
+from hepcrawl.xpaths import XPATHS
+
+
+def cached_properties(parser):
+    return [
+        name for name in dir(type(parser))
+        if isinstance(getattr(type(parser), name), cached_property)
+    ]
+
+
+def count_evaluations(func, *args):
+    evaluations = XPATHS.evaluations
+    func(*args)
+    return XPATHS.evaluations - evaluations
+
+
+@pytest.fixture(scope='module', params=[
+    (ArxivParser, arxiv_records),
+    (JatsParser, jats_records),
+    (ElsevierParser, elsevier_records),
+], ids=['arxiv', 'jats', 'elsevier'])
+def parser_and_records(request):
+    parser_class, get_records = request.param
+    return parser_class, get_records()
+
+
+def test_properties_are_evaluated_once_per_record(parser_and_records):
+    parser_class, records = parser_and_records
+    for record in records:
+        parser = parser_class(record)
+        parse_evaluations = count_evaluations(parser.parse)
+
+        assert parse_evaluations > 0
+        for name in cached_properties(parser):
+            assert count_evaluations(getattr, parser, name) == 0, name
+
+
+def test_harvest_check_is_shared_with_parse():
+    for record in elsevier_records():
+        parse_evaluations = count_evaluations(ElsevierParser(record).parse)
+        parser = ElsevierParser(record)
+        parser.should_record_be_harvested()
+
+        assert count_evaluations(parser.parse) < parse_evaluations
+
+
+def document_wide_evaluations(monkeypatch, parser_class, record):
+    """Number of evaluations of absolute expressions while parsing."""
+    evaluate = XPATHS.evaluate
+    expressions = []
+
+    def spy(node, expression, **variables):
+        expressions.append(expression)
+        return evaluate(node, expression, **variables)
+
+    monkeypatch.setattr(XPATHS, 'evaluate', spy)
+    parser_class(record).parse()
+    monkeypatch.undo()
+
+    return len([
+        expression for expression in expressions
+        if expression.lstrip().startswith('/')
+    ])
+
+
+@pytest.mark.parametrize('parser_class,get_records', [
+    (JatsParser, jats_collaboration_records),
+    (ElsevierParser, elsevier_collaboration_records),
+], ids=['jats', 'elsevier'])
+def test_authors_are_parsed_in_linear_time(monkeypatch, parser_class, get_records):
+    records = [
+        get_records(authors=authors, affiliations=10)[0]
+        for authors in (0, 40, 80)
+    ]
+    evaluations = [
+        count_evaluations(parser_class(record).parse) for record in records
+    ]
+
+    # every author costs the same number of evaluations relative to its node
+    assert evaluations[2] - evaluations[1] == evaluations[1] - evaluations[0]
+    # and none of the whole document
+    assert len(set(
+        document_wide_evaluations(monkeypatch, parser_class, record)
+        for record in records
+    )) == 1
@@ -97,3 +97,40 @@ def test_prepare_payload(
 
         assert sorted(result) == sorted(response)
     freezer.stop()
+
+
+def test_push_results(json_spider_record, spider, monkeypatch):
+    """Test that the results are pushed and forgotten at a checkpoint."""
+    _, json_record = json_spider_record
+    monkeypatch.setenv('SCRAPY_JOB', 'scrapy_job')
+    monkeypatch.setenv('SCRAPY_FEED_URI', 'scrapy_feed_uri')
+    spider.settings = {
+        'API_PIPELINE_URL': 'http://localhost:5555/api/task/async-apply',
+        'API_PIPELINE_TASK_ENDPOINT_DEFAULT': 'hepcrawl.submit_results',
+        'API_PIPELINE_TASK_ENDPOINT_MAPPING': {},
+    }
+    pipeline = InspireAPIPushPipeline()
+    pipeline.open_spider(spider)
+    pipeline.process_item(json_record, spider)
+
+    with mock.patch('hepcrawl.pipelines.requests.post') as post:
+        pipeline.push_results(spider)
+
+        assert post.call_count == 1
+        payload = post.call_args[1]['json']['kwargs']
+        assert len(payload['results_data']) == 1
+        assert pipeline.results_data == []
+
+        spider.state = {'errors': [
+            {'exception': 'Error', 'sender': 'sender'},
+            {'exception': 'Error', 'traceback': 'Traceback', 'sender': 'sender'},
+        ]}
+        pipeline.close_spider(spider)
+
+        assert post.call_count == 2
+        payload = post.call_args[1]['json']['kwargs']
+        assert payload['results_data'] == []
+        assert payload['errors'] == [
+            {'exception': 'Error', 'sender': 'sender'},
+            {'exception': 'Error', 'traceback': 'Traceback', 'sender': 'sender'},
+        ]
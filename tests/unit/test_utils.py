@@ -14,15 +14,22 @@ import os
 import pytest
 import six
 
+from inspire_schemas.api import LiteratureBuilder
+
 from hepcrawl.utils import (
+    add_references,
     build_dict,
+    cached_property,
     coll_cleanforthe,
     collapse_initials,
+    dedupe_list_of_dicts,
     ftp_connection_info,
     get_first,
     get_journal_and_section,
     get_node,
     has_numbers,
+    invalidate_cached_properties,
+    LRUCache,
     parse_domain,
     ParsedItem,
     range_as_string,
@@ -277,3 +284,93 @@ def test_parsed_item_from_exception():
         assert type(item['exception']) is KeyError
         assert item['source_data'] == 'some XML'
         assert item['file_name'] == 'broken.xml'
+
+
+def test_cached_property():
+    class Parser(object):
+        calls = 0
+
+        @cached_property
+        def title(self):
+            self.calls += 1
+            return 'title %d' % self.calls
+
+        @cached_property
+        def abstract(self):
+            return 'abstract of %s' % self.title
+
+    parser = Parser()
+
+    assert parser.title == 'title 1'
+    assert parser.abstract == 'abstract of title 1'
+    assert parser.calls == 1
+
+    invalidate_cached_properties(parser, 'title')
+
+    assert parser.title == 'title 2'
+    assert parser.abstract == 'abstract of title 1'
+
+    invalidate_cached_properties(parser)
+
+    assert parser.abstract == 'abstract of title 3'
+    assert isinstance(Parser.title, cached_property)
+
+
+def test_lru_cache():
+    cache = LRUCache(max_size=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    assert cache['a'] == 1
+    cache['c'] = 3
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    with pytest.raises(KeyError):
+        cache['b']
+    assert cache.stats == {'hits': 1, 'misses': 1, 'size': 2, 'max_size': 2}
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.hits == cache.misses == 0
+
+
+def test_dedupe_list_of_dicts():
+    dicts = [
+        {'a': 1, 'b': [1, 2]},
+        {'c': {'d': 3}},
+        {'b': [1, 2], 'a': 1},
+        {'a': 1, 'b': [2, 1]},
+        {'c': {'d': 3}},
+    ]
+
+    assert dedupe_list_of_dicts(dicts) == [
+        {'a': 1, 'b': [1, 2]},
+        {'c': {'d': 3}},
+        {'a': 1, 'b': [2, 1]},
+    ]
+
+
+def test_add_references_is_same_as_add_reference():
+    references = [
+        {'reference': {'title': {'title': 'One'}}},
+        {},
+        {'reference': {'title': {'title': 'Two'}}},
+        {'reference': {'title': {'title': 'One'}}},
+    ]
+    expected = LiteratureBuilder('source')
+    for reference in references:
+        expected.add_reference(reference)
+
+    builder = LiteratureBuilder('source')
+    add_references(builder, references[:2])
+    add_references(builder, references[2:])
+
+    assert builder.record == expected.record
+
+
+def test_add_references_without_references():
+    builder = LiteratureBuilder('source')
+    add_references(builder, [{}])
+
+    assert 'references' not in builder.record
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, division, print_function
+
+import pytest
+from lxml import etree
+from scrapy.http import XmlResponse
+from scrapy.selector import Selector
+
+from hepcrawl.spiders import hindawi_spider
+from hepcrawl.spiders.common.xml_feed_spider import iterparse_nodes
+from hepcrawl.testlib.fixtures import fake_response_from_file
+
+
+NAMESPACES = [('m', 'http://example.org/m')]
+
+
+def feed_response(records):
+    body = (
+        u'<feed xmlns:m="http://example.org/m"><title>Feed</title>' +
+        u''.join(
+            u'<m:record><title>Record {}</title></m:record>'.format(number)
+            for number in range(records)
+        ) +
+        u'</feed>'
+    )
+    return XmlResponse(
+        url='http://example.org/feed.xml',
+        body=body.encode('utf-8'),
+    )
+
+
+def canonical(selector):
+    return etree.tostring(selector.root, method='c14n', exclusive=True)
+
+
+def test_iterparse_nodes_yields_standalone_nodes():
+    nodes = iterparse_nodes(feed_response(1000), 'm:record', NAMESPACES)
+
+    for number, node in enumerate(nodes):
+        assert node.root.getparent() is None
+        assert node.xpath('//title/text()').extract() == [
+            u'Record {}'.format(number)
+        ]
+        assert node.xpath('self::m:record')
+    assert number == 999
+
+
+def test_iterparse_nodes_unknown_prefix():
+    with pytest.raises(ValueError):
+        next(iterparse_nodes(feed_response(1), 'x:record', NAMESPACES))
+
+
+def test_iterparse_nodes_match_xml_iterator():
+    response = fake_response_from_file('hindawi/test_1.xml')
+    namespaces = hindawi_spider.HindawiSpider.namespaces
+    selector = Selector(response, type='xml')
+    for prefix, uri in namespaces:
+        selector.register_namespace(prefix, uri)
+
+    nodes = iterparse_nodes(response, 'marc:record', namespaces)
+
+    assert [canonical(node) for node in nodes] == \
+        [canonical(node) for node in selector.xpath('//marc:record')]
+
+
+@pytest.mark.parametrize('iterator', ['xml', 'iterparse'])
+def test_spider_parse_iterators(iterator):
+    spider = hindawi_spider.HindawiSpider()
+    response = fake_response_from_file('hindawi/test_1.xml')
+    spider.iterator = 'xml'
+    expected = [item.record for item in spider.parse(response)]
+    spider.iterator = iterator
+
+    assert [item.record for item in spider.parse(response)] == expected
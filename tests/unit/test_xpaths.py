@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of hepcrawl.
+# Copyright (C) 2019 CERN.
+#
+# hepcrawl is a free software; you can redistribute it and/or modify it
+# under the terms of the Revised BSD License; see LICENSE file for
+# more details.
+
+from __future__ import absolute_import, division, print_function
+
+import pytest
+from scrapy.selector import Selector
+
+from hepcrawl.xpaths import (
+    XPATHS,
+    XPathRegistry,
+    extract,
+    extract_first,
+    register_namespaces,
+    select,
+    strip_namespaces,
+)
+
+
+@pytest.fixture
+def selector():
+    node = Selector(
+        text=(
+            '<article xmlns:x="http://example.org/x">'
+            '<title>Title <i>one</i></title>'
+            '<aff id="a1">CERN</aff><aff id="a2">DESY</aff>'
+            '<x:note>Note</x:note>'
+            '</article>'
+        ),
+        type='xml',
+    )
+    node.register_namespace('x', 'http://example.org/x')
+    return node
+
+
+@pytest.mark.parametrize('expression', [
+    './title',
+    './title/text()',
+    'string(./title)',
+    './aff/@id',
+    './x:note/text()',
+    'count(./aff)',
+    'boolean(./aff)',
+    './missing/text()',
+])
+def test_helpers_match_selector_xpath(selector, expression):
+    expected = selector.xpath(expression)
+
+    assert extract(selector, expression) == expected.extract()
+    assert extract_first(selector, expression) == expected.extract_first()
+    assert select(selector, expression).extract() == expected.extract()
+
+
+def test_helpers_support_variables_and_selector_lists(selector):
+    affiliations = select(selector, './aff')
+
+    assert extract(affiliations, './text()') == [u'CERN', u'DESY']
+    assert extract_first(selector, './aff[@id=$id_]/text()', id_='a2') == u'DESY'
+    assert extract_first(selector, './aff[@id=$id_]', default=u'', id_='a3') == u''
+
+
+def test_registry_compiles_expressions_once(selector):
+    evaluations = XPATHS.evaluations
+    extract(selector, './aff/text()')
+    compiled = len(XPATHS)
+    extract(selector, './aff/text()')
+
+    assert len(XPATHS) == compiled
+    assert XPATHS.evaluations == evaluations + 2
+
+
+def test_registry_max_size():
+    registry = XPathRegistry(max_size=1)
+    registry.get('./a')
+    registry.get('./b')
+
+    assert len(registry) == 1
+    assert registry.get('./a') is registry.get('./a')
+
+
+def test_registry_invalid_expression(selector):
+    with pytest.raises(ValueError):
+        extract(selector, './aff[')
+
+
+def test_register_namespaces_prefers_document_prefixes():
+    node = Selector(
+        text=(
+            '<doc xmlns:x="http://example.org/other">'
+            '<x:a>declared</x:a><y:b xmlns:y="http://example.org/y">default</y:b>'
+            '</doc>'
+        ),
+        type='xml',
+    )
+    register_namespaces(
+        node,
+        {'x': 'http://example.org/x', 'y': 'http://example.org/y'},
+    )
+
+    assert extract(node, './x:a/text()') == [u'declared']
+    assert extract(node, './y:b/text()') == [u'default']
+
+
+def test_strip_namespaces_leaves_the_document_unchanged(selector):
+    note = select(selector, './x:note')[0]
+    stripped = strip_namespaces(note)
+
+    assert stripped.extract() == u'<note>Note</note>'
+    assert extract(selector, './x:note/text()') == [u'Note']